@@ -0,0 +1,14 @@
+from sys import argv, exit
+
+from airdrop.cli import run_command
+
+
+if __name__ == "__main__":
+    '''
+    Example:
+        python aggregate.py
+            --accounts_list_file=accounts.csv
+            --output_file=accounts_merged.csv
+    '''
+
+    exit(run_command('aggregate', argv[1:]))
@@ -0,0 +1,48 @@
+from importlib import import_module
+
+
+# The public API is imported on first use (PEP 562), so importing the package, or running a command's
+# `--help`, does not load the Stellar SDK.
+_EXPORTS = {
+    'AccountsAggregator': 'aggregate',
+    'AccountsValidator': 'validator',
+    'AirdropGenerator': 'generator',
+    'CheckpointError': 'generator',
+    'ClaimPlan': 'collect',
+    'ClaimResult': 'collect',
+    'Collector': 'collect',
+    'EnvelopeEntry': 'container',
+    'EnvelopeReader': 'container',
+    'HorizonClient': 'horizon',
+    'MergeError': 'merge',
+    'Metrics': 'metrics',
+    'Reconciler': 'reconcile',
+    'SecuredWallet': 'wallets',
+    'ShardMerger': 'merge',
+    'Signer': 'signer',
+    'SubmissionJournal': 'journal',
+    'SubmissionResult': 'submitter',
+    'Submitter': 'submitter',
+    'Tier': 'packing',
+    'open_envelope_writer': 'container',
+    'read_accounts': 'validator',
+    'read_campaigns': 'campaigns',
+    'read_channel_accounts': 'wallets',
+    'read_envelopes': 'container',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+
+    value = getattr(import_module('.{0}'.format(module), __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,15 @@
+from sys import exit
+
+from .cli import main
+
+
+if __name__ == "__main__":
+    '''
+    Example:
+        python -m airdrop sign
+            --xdr_list_file=generated_xdrs.aqtx
+            --network=testnet
+            --signer_key=SXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX
+    '''
+
+    exit(main())
@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import tempfile
+
+from itertools import islice
+from typing import Iterable, Iterator
+
+
+def open_database(filename=None, prefix='airdrop_'):
+    # Opens `filename`, or a temporary database that `close_database` removes. Nothing is journaled, the
+    # databases are rebuilt from the input on every run.
+    temporary_filename = None
+    if filename is None:
+        file_descriptor, filename = tempfile.mkstemp(prefix=prefix, suffix='.sqlite')
+        os.close(file_descriptor)
+        temporary_filename = filename
+
+    connection = sqlite3.connect(filename)
+    connection.execute('PRAGMA journal_mode=OFF')
+    connection.execute('PRAGMA synchronous=OFF')
+    return connection, temporary_filename
+
+
+def close_database(connection, temporary_filename):
+    connection.close()
+    if temporary_filename is not None:
+        os.remove(temporary_filename)
+
+
+class AccountsAggregator(object):
+    # Duplicate accounts are merged in an on-disk SQLite index, so inputs with millions of rows
+    # need no more memory than the SQLite page cache.
+    batch_size = 10000
+
+    def __init__(self, page_size=100, filename=None, operations_per_row=1):
+        self.page_size = page_size
+        self.filename = filename
+        # Every recipient gets one operation per asset of the run.
+        self.operations_per_row = operations_per_row
+
+        self.rows_count = 0
+        self.accounts_count = 0
+
+    def _load(self, connection, records: Iterable):
+        connection.execute('DROP TABLE IF EXISTS accounts')
+        connection.execute(
+            'CREATE TABLE accounts ('
+            '    account TEXT PRIMARY KEY,'
+            '    multiplier INTEGER NOT NULL,'
+            '    line INTEGER NOT NULL'
+            ') WITHOUT ROWID'
+        )
+
+        records = iter(records)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+
+            # The first appearance of an account keeps its line, later ones only add their multiplier.
+            connection.executemany(
+                'INSERT INTO accounts (account, multiplier, line) VALUES (?, ?, ?) '
+                'ON CONFLICT(account) DO UPDATE SET multiplier = multiplier + excluded.multiplier',
+                batch,
+            )
+            self.rows_count += len(batch)
+
+        connection.execute('CREATE INDEX accounts_line ON accounts (line)')
+        connection.commit()
+
+    def _get_transactions_count(self, operations_count):
+        return -(-operations_count // self.page_size)
+
+    def get_saved_operations(self):
+        return (self.rows_count - self.accounts_count) * self.operations_per_row
+
+    def get_saved_transactions(self):
+        return self._get_transactions_count(self.rows_count * self.operations_per_row) \
+            - self._get_transactions_count(self.accounts_count * self.operations_per_row)
+
+    def aggregate(self, records: Iterable) -> Iterator:
+        # Yields (account, multiplier, line_number) records in the order accounts first appear.
+        connection, temporary_filename = open_database(self.filename, 'airdrop_accounts_')
+
+        try:
+            self._load(connection, records)
+            self.accounts_count = connection.execute('SELECT COUNT(*) FROM accounts').fetchone()[0]
+            print("Merged {0} rows into {1} accounts: {2} operations and {3} transactions saved.".format(
+                self.rows_count, self.accounts_count, self.get_saved_operations(), self.get_saved_transactions(),
+            ))
+
+            for record in connection.execute('SELECT account, multiplier, line FROM accounts ORDER BY line'):
+                yield record
+        finally:
+            close_database(connection, temporary_filename)
@@ -0,0 +1,66 @@
+import json
+
+from decimal import Decimal
+from typing import List
+
+from dateutil.parser import parse
+from stellar_sdk import Asset
+
+from .packing import Tier
+
+
+CAMPAIGN_FIELDS = {'asset', 'base_amount', 'start_date', 'end_date'}
+
+NATIVE_ASSETS = ('native', 'XLM')
+
+
+def _get_timestamp(spec, field):
+    if spec.get(field) is None:
+        return None
+
+    return int(parse(spec[field]).timestamp())
+
+
+def _get_asset(value) -> Asset:
+    if value in NATIVE_ASSETS:
+        return Asset.native()
+
+    parts = value.split(':') if isinstance(value, str) else []
+    if len(parts) != 2:
+        raise ValueError('invalid asset {0!r}, expected CODE:ISSUER or native'.format(value))
+
+    return Asset(code=parts[0], issuer=parts[1])
+
+
+def read_campaigns(path_to_file) -> List[Tier]:
+    # A JSON list of campaigns, for example
+    # [{"asset": "AQUA:GBNZ...", "base_amount": "1.01", "start_date": "2021-08-16T00:00:00Z", "end_date": "..."}].
+    # Campaigns without dates are claimable in the window given to the generator. XLM is given as "native".
+    with open(path_to_file) as campaigns_file:
+        specs = json.load(campaigns_file)
+
+    if not isinstance(specs, list) or not specs:
+        raise ValueError('Expected a list of campaigns')
+
+    campaigns = []
+    for number, spec in enumerate(specs, 1):
+        try:
+            unknown_fields = set(spec) - CAMPAIGN_FIELDS
+            if unknown_fields:
+                raise ValueError('unknown fields {0}'.format(', '.join(sorted(unknown_fields))))
+
+            asset = _get_asset(spec['asset'])
+            base_amount = Decimal(str(spec['base_amount']))
+            if base_amount <= 0:
+                raise ValueError('base_amount must be positive')
+
+            campaigns.append(Tier(
+                asset=asset,
+                base_amount=base_amount,
+                claim_allowed_after=_get_timestamp(spec, 'start_date'),
+                claim_allowed_before=_get_timestamp(spec, 'end_date'),
+            ))
+        except Exception as exc:
+            raise ValueError('Invalid campaign {0}: {1}'.format(number, exc))
+
+    return campaigns
@@ -0,0 +1,272 @@
+import argparse
+import os
+import sys
+
+from importlib import import_module
+from sys import exit
+
+
+# Subcommand modules only define their arguments at import time. The SDK and the stage modules are imported
+# when a command runs, so `--help` and argument errors never pay for them.
+COMMANDS = ['generate', 'sign', 'submit', 'collect', 'reconcile', 'merge', 'aggregate', 'convert']
+
+NETWORKS = ['testnet', 'public']
+
+
+def add_network_arguments(parser, horizon_url=True):
+    parser.add_argument(
+        '--network', nargs=1, help='Stellar network: ["testnet", "public"].', required=True,
+    )
+    if horizon_url:
+        parser.add_argument(
+            '--horizon_url', nargs=1, required=False,
+            help='Horizon server URL. Defaults to the public one of --network.',
+        )
+        parser.add_argument(
+            '--max_requests_per_second', nargs=1, required=False,
+            help='Client-side limit of Horizon requests per second, to stay under its rate limit. '
+                 'Unlimited by default.',
+        )
+
+
+def add_asset_argument(parser, help='A unique asset to be distributed. The expected format is CODE:ISSUER'):
+    parser.add_argument('--asset', nargs=1, help=help, required=True)
+
+
+def add_metrics_argument(parser):
+    parser.add_argument(
+        '--metrics_file', nargs=1, required=False,
+        help='Path to a metrics file, rewritten during the run. JSON for a .json file, Prometheus text otherwise.',
+    )
+
+
+def get_network(args):
+    network = args.network[0]
+    if network not in NETWORKS:
+        print('Invalid --network')
+        exit(1)
+
+    return network
+
+
+def get_network_passphrase(network):
+    from stellar_sdk import Network
+
+    if network == 'testnet':
+        return Network.testnet_network().network_passphrase
+
+    return Network.public_network().network_passphrase
+
+
+def get_horizon_url(args):
+    return args.horizon_url[0] if args.horizon_url else None
+
+
+def get_server(args, network, metrics=None, **client_options):
+    # Every request of a stage goes through one pooled client, which also records per-endpoint latency in `metrics`.
+    from . import horizon
+
+    max_rate = None
+    if args.max_requests_per_second:
+        max_rate = float(get_decimal(args.max_requests_per_second[0], '--max_requests_per_second'))
+        if max_rate <= 0:
+            print('Invalid --max_requests_per_second')
+            exit(1)
+
+    client = horizon.HorizonClient(max_rate=max_rate, metrics=metrics, **client_options)
+    return horizon.get_server(network, get_horizon_url(args), client)
+
+
+def parse_asset(value, option='--asset'):
+    from stellar_sdk import Asset
+
+    try:
+        asset = value.split(":")
+        return Asset(code=asset[0], issuer=asset[1])
+    except (ValueError, IndexError):
+        print('Invalid {0}'.format(option))
+        exit(1)
+
+
+def get_asset(args):
+    return parse_asset(args.asset[0])
+
+
+def get_public_key(value, option):
+    from stellar_sdk import Keypair
+
+    try:
+        return Keypair.from_public_key(value).public_key
+    except Exception:
+        print('Invalid {0}'.format(option))
+        exit(1)
+
+
+def get_secret(value, option):
+    from stellar_sdk import Keypair
+
+    try:
+        return Keypair.from_secret(value).secret
+    except Exception:
+        print('Invalid {0}'.format(option))
+        exit(1)
+
+
+def get_decimal(value, option):
+    from decimal import Decimal
+
+    try:
+        return Decimal(value)
+    except Exception:
+        print('Invalid {0}'.format(option))
+        exit(1)
+
+
+def get_timestamp(value, option):
+    from dateutil.parser import parse
+
+    try:
+        return int(parse(value).timestamp())
+    except Exception:
+        print('Invalid {0}'.format(option))
+        exit(1)
+
+
+def get_int(values, option, default=None, minimum=1):
+    if not values:
+        return default
+
+    try:
+        value = int(values[0])
+        if value < minimum:
+            raise ValueError
+    except ValueError:
+        print('Invalid {0}'.format(option))
+        exit(1)
+
+    return value
+
+
+def get_channels(args):
+    from .wallets import read_channel_accounts
+
+    if not args.channel_accounts_file:
+        return None
+
+    try:
+        channels = read_channel_accounts(args.channel_accounts_file[0])
+    except Exception:
+        channels = None
+
+    if not channels:
+        print('Invalid --channel_accounts_file')
+        exit(1)
+
+    return channels
+
+
+def get_tiers(args, require_dates=True):
+    # The campaigns of a run, from --campaigns_file or from --asset and --base_amount.
+    from .campaigns import read_campaigns
+    from .packing import Tier
+
+    if args.campaigns_file:
+        if args.asset or args.base_amount:
+            print('--campaigns_file cannot be combined with --asset or --base_amount')
+            exit(1)
+
+        try:
+            tiers = read_campaigns(args.campaigns_file[0])
+        except (OSError, ValueError) as exc:
+            print('Invalid --campaigns_file: {0}'.format(exc))
+            exit(1)
+
+        for option, value, field in [
+            ('--start_date', args.start_date, 'claim_allowed_after'),
+            ('--end_date', args.end_date, 'claim_allowed_before'),
+        ]:
+            if require_dates and value is None and any(getattr(tier, field) is None for tier in tiers):
+                print('{0} is required for campaigns without one'.format(option))
+                exit(1)
+
+        return tiers
+
+    if not args.asset or not args.base_amount:
+        print('--asset and --base_amount are required without --campaigns_file')
+        exit(1)
+
+    if require_dates and (not args.start_date or not args.end_date):
+        print('--start_date and --end_date are required without --campaigns_file')
+        exit(1)
+
+    assets = [parse_asset(value) for value in args.asset]
+    base_amounts = [get_decimal(value, '--base_amount') for value in args.base_amount]
+    if len(base_amounts) == 1:
+        base_amounts = base_amounts * len(assets)
+
+    if len(base_amounts) != len(assets):
+        print('Invalid --base_amount')
+        exit(1)
+
+    return [Tier(asset, base_amount) for asset, base_amount in zip(assets, base_amounts)]
+
+
+def get_metrics(args, stage):
+    from .metrics import Metrics
+
+    return Metrics(stage, filename=args.metrics_file[0] if args.metrics_file else None)
+
+
+def check_file(path_to_file):
+    try:
+        open(path_to_file).close()
+    except OSError:
+        print('Invalid {0} file'.format(path_to_file))
+        exit(1)
+
+
+def get_rejects_file(args, path_to_file):
+    if args.rejects_file:
+        return args.rejects_file[0]
+
+    return '{0}_rejects.csv'.format(os.path.splitext(path_to_file)[0])
+
+
+def _get_command(name):
+    return import_module('.commands.{0}'.format(name), __package__)
+
+
+def _add_command(subparsers, name):
+    command = _get_command(name)
+    parser = subparsers.add_parser(name, help=command.DESCRIPTION, description=command.DESCRIPTION)
+    command.add_arguments(parser)
+    parser.set_defaults(run=command.run)
+
+
+def _parse_args(parser, argv):
+    try:
+        return parser.parse_args(argv)
+    except argparse.ArgumentError:
+        print('Invalid arguments')
+        exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m airdrop', description='Aquarius airdrop tools.')
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    for name in COMMANDS:
+        _add_command(subparsers, name)
+
+    args = _parse_args(parser, argv)
+    return args.run(args)
+
+
+def run_command(name, argv=None):
+    # Entry point of the standalone scripts, which take the arguments of a single subcommand.
+    command = _get_command(name)
+    parser = argparse.ArgumentParser(prog=os.path.basename(sys.argv[0]), description=command.DESCRIPTION)
+    command.add_arguments(parser)
+
+    return command.run(_parse_args(parser, argv))
@@ -0,0 +1,366 @@
+import queue
+import threading
+import time
+
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dateutil.parser import parse
+from typing import Iterator, Sequence
+
+from stellar_sdk import Account, Keypair, Network
+from stellar_sdk.exceptions import BaseHorizonError
+from stellar_sdk.transaction_builder import TransactionBuilder, TransactionEnvelope
+
+from .horizon import HorizonClient, get_server
+from .metrics import Metrics
+from .packing import to_stroops
+from .parallel import chunked
+from .submitter import RETRYABLE_REASONS, SubmissionItem, Submitter, get_error_reason
+from .wallets import SecuredWallet
+
+try:
+    from billiard.exceptions import SoftTimeLimitExceeded
+except ImportError:
+    # Raised only when the collector runs in a Celery task with a soft time limit.
+    class SoftTimeLimitExceeded(Exception):
+        pass
+
+
+ClaimResult = namedtuple('ClaimResult', ['balance_ids', 'transaction_hash', 'reason'])
+
+# Balances a collection would claim now, their total amount in stroops, and the ones not claimable yet.
+ClaimPlan = namedtuple('ClaimPlan', ['balances_count', 'amount', 'transactions_count', 'pending_count'])
+
+
+def is_predicate_true(predicate, now, created_at=None):
+    if predicate.get('unconditional'):
+        return True
+
+    if 'and' in predicate:
+        return all(is_predicate_true(item, now, created_at) for item in predicate['and'])
+
+    if 'or' in predicate:
+        return any(is_predicate_true(item, now, created_at) for item in predicate['or'])
+
+    if 'not' in predicate:
+        return not is_predicate_true(predicate['not'], now, created_at)
+
+    if 'abs_before_epoch' in predicate:
+        return now < int(predicate['abs_before_epoch'])
+
+    if 'abs_before' in predicate:
+        return now < parse(predicate['abs_before']).timestamp()
+
+    if 'rel_before' in predicate:
+        # Relative predicates count from the ledger that created the balance.
+        if created_at is None:
+            return False
+        return now < created_at + int(predicate['rel_before'])
+
+    return False
+
+
+class ClaimBatch(object):
+    def __init__(self, balances, attempts=0):
+        self.balances = balances
+        self.attempts = attempts
+
+
+class Collector(object):
+    def __init__(
+        self, asset, network, collector_public, collector_secret, channels=None, pipeline_depth=1,
+        prefetch_pages=10, max_attempts=5, horizon_url=None, metrics=None, server=None,
+    ):
+        self.asset = asset
+        self.collector_public = Keypair.from_public_key(collector_public)
+        self.collector_secret = Keypair.from_secret(collector_secret)
+        self.metrics = metrics or Metrics('collect')
+
+        # Scanning, sequence numbers and submission all share one pooled client.
+        self.server, self.network_passphrase = self.get_stellar_network_accessors(network, horizon_url, server)
+
+        # Claim transactions may be sourced from channel accounts, each with its own sequence chain,
+        # while the collector stays the source of every claim operation.
+        self.channels = channels or []
+        self.pipeline_depth = pipeline_depth
+        self.prefetch_pages = prefetch_pages
+        self.max_attempts = max_attempts
+
+        self.submitter = Submitter(
+            self.server, self.network_passphrase, max_attempts=max_attempts, metrics=self.metrics,
+        )
+
+        self.collected_count = 0
+        self.failed_count = 0
+
+    def get_stellar_network_accessors(self, network, horizon_url=None, server=None):
+        if network == 'testnet':
+            network_passphrase = Network.testnet_network().network_passphrase
+        elif network == 'public':
+            network_passphrase = Network.public_network().network_passphrase
+
+        if server is None:
+            # Claims are retried by the submitter, the client must not resend them.
+            server = get_server(network, horizon_url, HorizonClient(num_retries=0, metrics=self.metrics))
+
+        return server, network_passphrase
+
+    page_size = 100
+    scan_page_size = 200
+
+    def get_page(self, cursor=None):
+        call_builder = self.server.claimable_balances().for_claimant(
+            self.collector_public.public_key
+        ).for_asset(self.asset).limit(self.scan_page_size)
+
+        if cursor is not None:
+            call_builder = call_builder.cursor(cursor)
+
+        records = call_builder.call()['_embedded']['records']
+        self.metrics.increment('scanned_balances', len(records))
+
+        return records
+
+    def is_claimable(self, balance, now):
+        created_at = None
+        if balance.get('last_modified_time'):
+            created_at = parse(balance['last_modified_time']).timestamp()
+
+        for claimant in balance['claimants']:
+            if claimant['destination'] == self.collector_public.public_key:
+                return is_predicate_true(claimant['predicate'], now, created_at)
+
+        return False
+
+    def iter_claimable_balances(self) -> Iterator:
+        # Horizon is paged with a cursor, so a balance that fails to be claimed is not fetched again in this run.
+        cursor = None
+
+        while True:
+            page = self.get_page(cursor)
+            if not page:
+                return
+
+            now = time.time()
+            for balance in page:
+                if self.is_claimable(balance, now):
+                    yield balance
+
+            cursor = page[-1]['paging_token']
+
+    def plan(self) -> ClaimPlan:
+        # Pages the claimable balances like a collection, without claiming anything.
+        balances_count = 0
+        amount = 0
+        pending_count = 0
+        cursor = None
+
+        while True:
+            page = self.get_page(cursor)
+            if not page:
+                break
+
+            now = time.time()
+            for balance in page:
+                if self.is_claimable(balance, now):
+                    balances_count += 1
+                    amount += to_stroops(balance['amount'])
+                else:
+                    pending_count += 1
+
+            cursor = page[-1]['paging_token']
+
+        transactions_count = -(-balances_count // self.page_size)
+        return ClaimPlan(balances_count, amount, transactions_count, pending_count)
+
+    def _get_source_wallets(self):
+        if self.channels:
+            return self.channels
+
+        return [SecuredWallet(self.collector_public.public_key, self.collector_secret.secret)]
+
+    def _get_builder(self, source_wallet, sequence_number):
+        source_account = Account(source_wallet.public_key, sequence_number)
+
+        memo = '{0} claimback'.format(self.asset.code)
+
+        builder = TransactionBuilder(
+            source_account=source_account,
+            network_passphrase=self.network_passphrase,
+            base_fee=self.base_fee,
+        ).add_text_memo(memo)
+        return builder
+
+    def _build_transaction(
+        self, page: Sequence, source_wallet, sequence_number,
+    ) -> TransactionEnvelope:
+        builder = self._get_builder(source_wallet, sequence_number)
+
+        for balance in page:
+            builder.append_claim_claimable_balance_op(
+                source=self.collector_public.public_key,
+                balance_id=balance['id'],
+            )
+
+        transaction_envelope = builder.build()
+        if source_wallet.public_key != self.collector_public.public_key:
+            transaction_envelope.sign(source_wallet.secret)
+        transaction_envelope.sign(self.collector_secret.secret)
+
+        return transaction_envelope
+
+    def _scan(self, batches: queue.Queue):
+        try:
+            for page in chunked(self.iter_claimable_balances(), self.page_size):
+                batches.put(ClaimBatch(page))
+        except Exception as exc:
+            batches.put(exc)
+        finally:
+            batches.put(None)
+
+    def _print_error(self, exc):
+        if isinstance(exc, SoftTimeLimitExceeded):
+            print("Timeout")
+        elif isinstance(exc, BaseHorizonError):
+            if hasattr(exc, 'status') and exc.status in [503, 504]:
+                print('Timeout')
+            else:
+                operation_fail_reasons = exc.extras.get('result_codes', {}).get('operations', [])
+
+                if operation_fail_reasons:
+                    print(
+                        "One or several operations returned an error: {}".format(
+                            ', '.join(operation_fail_reasons)
+                        )
+                    )
+                else:
+                    operation_fail_reasons = exc.extras.get('result_codes', {}).get('transaction', 'unknown_reason')
+                    print('Transaction returned an error: {}'.format(operation_fail_reasons))
+        else:
+            print('Unexpected error')
+
+    def _get_retry_balances(self, batch: ClaimBatch, exc):
+        # Returns the balances worth claiming again and whether the transaction consumed its sequence number.
+        if get_error_reason(exc) in RETRYABLE_REASONS:
+            return batch.balances, False
+
+        if isinstance(exc, BaseHorizonError):
+            result_codes = (exc.extras or {}).get('result_codes', {})
+            operation_codes = result_codes.get('operations', [])
+
+            if result_codes.get('transaction') == 'tx_failed' and len(operation_codes) == len(batch.balances):
+                # The whole transaction failed because of some operations, e.g. a balance claimed meanwhile.
+                return [
+                    balance for balance, code in zip(batch.balances, operation_codes) if code == 'op_success'
+                ], True
+
+        return [], False
+
+    def collect(self):
+        try:
+            for _ in self.iter_claims():
+                pass
+        except KeyboardInterrupt:
+            print("Interrupted")
+
+        print("Collected {0} balances.".format(self.collected_count))
+        if self.failed_count:
+            print("{0} balances were not collected, run the collector again to retry them.".format(self.failed_count))
+
+    def iter_claims(self) -> Iterator[ClaimResult]:
+        # Yields the outcome of every claim transaction, balances that are retried are reported once, when final.
+        self.base_fee = self.server.fetch_base_fee()
+
+        batches = queue.Queue(maxsize=self.prefetch_pages)
+        scanner = threading.Thread(target=self._scan, args=(batches,), daemon=True)
+        scanner.start()
+
+        source_wallets = self._get_source_wallets()
+        sequences = {}
+        in_flight = {wallet.public_key: 0 for wallet in source_wallets}
+        retries = deque()
+        futures = {}
+        scanned = False
+
+        page_number = 1
+        self.collected_count = 0
+        self.failed_count = 0
+
+        with ThreadPoolExecutor(max_workers=len(source_wallets) * self.pipeline_depth) as executor:
+            while True:
+                for wallet in source_wallets:
+                    while in_flight[wallet.public_key] < self.pipeline_depth:
+                        # The sequence number is tracked locally and only reloaded, once the source has
+                        # no transactions in flight, after a transaction failed without consuming it.
+                        if wallet.public_key not in sequences:
+                            if in_flight[wallet.public_key]:
+                                break
+                            sequences[wallet.public_key] = self.server.load_account(wallet.public_key).sequence
+
+                        if retries:
+                            batch = retries.popleft()
+                        elif scanned:
+                            break
+                        else:
+                            try:
+                                batch = batches.get(block=not futures)
+                            except queue.Empty:
+                                break
+
+                            if batch is None:
+                                scanned = True
+                                break
+                            if isinstance(batch, Exception):
+                                raise batch
+
+                        transaction_envelope = self._build_transaction(
+                            batch.balances, wallet, sequences[wallet.public_key],
+                        )
+                        sequences[wallet.public_key] += 1
+                        batch.attempts += 1
+
+                        item = SubmissionItem(
+                            page_number, transaction_envelope.to_xdr(), transaction_envelope.hash_hex(),
+                            wallet.public_key, sequences[wallet.public_key],
+                        )
+                        page_number += 1
+                        in_flight[wallet.public_key] += 1
+                        futures[executor.submit(self.submitter.submit_item, item)] = item, batch
+
+                if not futures:
+                    if scanned and not retries:
+                        break
+                    continue
+
+                done, _ = wait(futures, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item, batch = futures.pop(future)
+                    in_flight[item.source] -= 1
+
+                    try:
+                        future.result()
+                    except Exception as exc:
+                        self._print_error(exc)
+
+                        balances, consumed = self._get_retry_balances(batch, exc)
+                        if not consumed:
+                            sequences.pop(item.source, None)
+
+                        if batch.attempts >= self.max_attempts:
+                            balances = []
+                        if balances:
+                            retries.append(ClaimBatch(balances, batch.attempts))
+
+                        retried_ids = set(balance['id'] for balance in balances)
+                        failed_ids = [balance['id'] for balance in batch.balances if balance['id'] not in retried_ids]
+                        if failed_ids:
+                            self.failed_count += len(failed_ids)
+                            self.metrics.increment('failed_balances', len(failed_ids))
+                            yield ClaimResult(failed_ids, item.transaction_hash, get_error_reason(exc))
+                    else:
+                        self.collected_count += len(batch.balances)
+                        self.metrics.increment('collected_balances', len(batch.balances))
+                        yield ClaimResult([balance['id'] for balance in batch.balances], item.transaction_hash, None)
+
+                self.metrics.report("Collected {0} balances, {1} failed.", self.collected_count, self.failed_count)
@@ -0,0 +1,37 @@
+import csv
+
+from ..cli import check_file, get_rejects_file
+
+
+DESCRIPTION = 'Merges duplicate accounts of an accounts list by summing their multipliers.'
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--accounts_list_file', nargs=1, help='Path to a CSV file with the list of accounts', required=True,
+    )
+    parser.add_argument(
+        '--output_file', nargs=1, required=True,
+        help='Path to the merged CSV file, with accounts in the order of their first appearance.',
+    )
+    parser.add_argument(
+        '--rejects_file', nargs=1, required=False,
+        help='Path to a CSV file with rejected accounts. Defaults to <accounts_list_file>_rejects.csv.',
+    )
+
+
+def run(args):
+    from ..aggregate import AccountsAggregator
+    from ..validator import AccountsValidator, read_accounts
+
+    path_to_file = args.accounts_list_file[0]
+    check_file(path_to_file)
+
+    validator = AccountsValidator(rejects_filename=get_rejects_file(args, path_to_file), reject_duplicates=False)
+    aggregator = AccountsAggregator()
+
+    with open(args.output_file[0], mode='w', newline='') as output_file:
+        writer = csv.writer(output_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+
+        for account, multiplier, _ in aggregator.aggregate(validator.validate(read_accounts(path_to_file))):
+            writer.writerow([account, multiplier])
@@ -0,0 +1,94 @@
+from ..cli import add_asset_argument, add_metrics_argument, add_network_arguments, get_asset, get_channels, \
+    get_int, get_metrics, get_network, get_public_key, get_secret, get_server
+
+
+DESCRIPTION = 'Collects balances unclaimed by airdrop participants to a specified wallet address.'
+
+
+def add_arguments(parser):
+    add_asset_argument(parser, help='Unique asset to be distributed. The expected format is CODE:ISSUER')
+    add_network_arguments(parser)
+    parser.add_argument(
+        '--collector_secret', nargs=1, required=True,
+        help='Signing key of the wallet that will collect unclaimed balances.',
+    )
+    parser.add_argument(
+        '--collector_public', nargs=1, required=True,
+        help='Public key of the wallet that will collect unclaimed balances.',
+    )
+    parser.add_argument(
+        '--channel_accounts_file', nargs=1, required=False,
+        help='Path to a CSV file with channel accounts in format PUBLIC,SECRET. '
+             'Claim transactions are sourced from these accounts concurrently.',
+    )
+    parser.add_argument(
+        '--pipeline_depth', nargs=1, required=False,
+        help='Maximum number of in-flight transactions per source account. Defaults to 1.',
+    )
+    parser.add_argument(
+        '--dry_run', action='store_true',
+        help='Only report the balances that would be collected, the fees and the collection time.',
+    )
+    add_metrics_argument(parser)
+
+
+def print_plan(collector):
+    from ..packing import format_stroops, get_asset_key, get_available_balances, print_balances, print_estimate
+
+    plan = collector.plan()
+    base_fee = collector.server.fetch_base_fee()
+    fee = base_fee * plan.balances_count
+
+    print("Would collect {0} balances of {1} {2} in {3} transactions: fee {4} XLM.".format(
+        plan.balances_count, format_stroops(plan.amount), collector.asset.code, plan.transactions_count,
+        format_stroops(fee),
+    ))
+    if plan.pending_count:
+        print("{0} more balances cannot be collected yet.".format(plan.pending_count))
+
+    sources_count = len(collector.channels) or 1
+    print_estimate(plan.transactions_count, plan.balances_count, sources_count * collector.pipeline_depth)
+
+    public_key = collector.collector_public.public_key
+    try:
+        available = get_available_balances(collector.server.accounts().account_id(public_key).call())
+    except Exception:
+        print("Could not load the balances of {0}.".format(public_key))
+        return
+
+    if get_asset_key(collector.asset) not in available:
+        print("Collector {0} has no {1} trustline.".format(public_key, collector.asset.code))
+
+    if collector.channels:
+        print("Channel accounts pay the fees, about {0} XLM each.".format(format_stroops(fee // sources_count)))
+    else:
+        print_balances("Collector {0} needs:".format(public_key), {'native': fee}, available)
+
+
+def run(args):
+    from ..collect import Collector
+
+    network = get_network(args)
+    asset = get_asset(args)
+    collector_secret = get_secret(args.collector_secret[0], '--collector_secret')
+    collector_public = get_public_key(args.collector_public[0], '--collector_public')
+    channels = get_channels(args)
+    pipeline_depth = get_int(args.pipeline_depth, '--pipeline_depth', default=1)
+
+    # One connection per claim transaction in flight, and one for the scanner. Claims are retried by the
+    # submitter, which checks for an applied transaction first, so the client itself never resends them.
+    metrics = get_metrics(args, 'collect')
+    server = get_server(
+        args, network, metrics, pool_size=len(channels or [None]) * pipeline_depth + 1, num_retries=0,
+    )
+    collector = Collector(
+        asset=asset, collector_public=collector_public,
+        network=network, collector_secret=collector_secret,
+        channels=[channel for channel, _ in channels] if channels else None, pipeline_depth=pipeline_depth,
+        metrics=metrics, server=server,
+    )
+    if args.dry_run:
+        print_plan(collector)
+    else:
+        collector.collect()
+    collector.metrics.print_summary()
@@ -0,0 +1,45 @@
+from sys import exit
+
+from ..cli import add_network_arguments, get_network, get_network_passphrase
+
+
+DESCRIPTION = 'Converts transaction files between the binary envelope container and CSV.'
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--input_file', nargs=1, help='Path to a binary container or a CSV file with transactions.', required=True,
+    )
+    parser.add_argument(
+        '--output_file', nargs=1, required=True,
+        help='Path to the converted file. A binary container is exported to CSV and a CSV file is imported '
+             'into a binary container.',
+    )
+    add_network_arguments(parser, horizon_url=False)
+
+
+def run(args):
+    from ..container import BINARY_FORMAT, CSV_FORMAT, get_file_format, open_envelope_writer, read_envelopes
+
+    network_passphrase = get_network_passphrase(get_network(args))
+    input_file = args.input_file[0]
+    output_file = args.output_file[0]
+
+    try:
+        input_format = get_file_format(input_file)
+    except OSError:
+        print('Invalid {0} file'.format(input_file))
+        exit(1)
+
+    output_format = CSV_FORMAT if input_format == BINARY_FORMAT else BINARY_FORMAT
+    writer = open_envelope_writer(output_file, output_format)
+    count = 0
+    try:
+        for entry in read_envelopes(input_file, network_passphrase):
+            writer.write(entry)
+            count += 1
+        writer.flush()
+    finally:
+        writer.close()
+
+    print("Converted {0} transactions into {1}".format(count, output_file))
@@ -0,0 +1,265 @@
+import os
+import time
+
+from sys import exit
+
+from ..cli import add_metrics_argument, add_network_arguments, check_file, get_channels, get_int, \
+    get_metrics, get_network, get_public_key, get_rejects_file, get_secret, get_server, get_tiers, get_timestamp
+
+
+DESCRIPTION = 'Generates a file with airdrop transactions based on input parameters.'
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--asset', nargs='+', required=False,
+        help='Assets to be distributed, in format CODE:ISSUER. Every recipient gets a balance of each of them, '
+             'packed into shared transactions.',
+    )
+    parser.add_argument(
+        '--campaigns_file', nargs=1, required=False,
+        help='Path to a JSON file with the campaigns of the run, each with its asset, base amount and optionally '
+             'its own start and end dates. Replaces --asset and --base_amount.',
+    )
+    parser.add_argument(
+        '--distribution_wallet_public', nargs=1, help='Distribution wallet public key', required=True,
+    )
+    parser.add_argument(
+        '--distribution_wallet_secret', nargs=1, help='Distribution wallet signing key', required=True,
+    )
+    add_network_arguments(parser)
+    parser.add_argument(
+        '--accounts_list_file', nargs=1, help='Path to a CSV file with the list of accounts', required=True,
+    )
+    parser.add_argument(
+        '--base_amount', nargs='+', required=False,
+        help='Base token amount a user will receive. Either one for every --asset or one per --asset, in order.',
+    )
+    parser.add_argument(
+        '--collector_public_key', nargs=1, required=True,
+        help='Public key of the wallet that will collect unclaimed balances.',
+    )
+    parser.add_argument(
+        '--start_date', nargs=1, required=False,
+        help='User can claim the balance starting from this date. Required unless every campaign has its own.',
+    )
+    parser.add_argument(
+        '--end_date', nargs=1, required=False,
+        help='Date from which an unclaimed balance can be collected back. Required unless every campaign has its own.',
+    )
+    parser.add_argument(
+        '--rejects_file', nargs=1, required=False,
+        help='Path to a CSV file with rejected accounts. Defaults to <accounts_list_file>_rejects.csv.',
+    )
+    parser.add_argument(
+        '--start_sequence', nargs=1, required=False,
+        help='Current sequence number of the distribution wallet, when it is the transaction source. '
+             'Loaded from Horizon if omitted.',
+    )
+    parser.add_argument(
+        '--base_fee', nargs=1, required=False,
+        help='Base fee per operation in stroops. Fetched from Horizon if omitted.',
+    )
+    parser.add_argument(
+        '--channel_accounts_file', nargs=1, required=False,
+        help='Path to a CSV file with channel accounts in format PUBLIC,SECRET[,SEQUENCE]. '
+             'Transactions are sourced from these accounts in turn.',
+    )
+    parser.add_argument(
+        '--output_file', nargs=1, required=False,
+        help='Path to the generated file. Defaults to generated_xdrs_<timestamp>.aqtx.',
+    )
+    parser.add_argument(
+        '--output_format', nargs=1, required=False,
+        help='Format of the generated file: ["binary", "csv"]. Defaults to binary.',
+    )
+    parser.add_argument(
+        '--workers', nargs=1, required=False,
+        help='Number of processes that build and sign transactions in parallel. Defaults to 1.',
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help='Continue an interrupted run from the checkpoint stored next to --output_file.',
+    )
+    add_metrics_argument(parser)
+    parser.add_argument(
+        '--merge_duplicates', action='store_true',
+        help='Merge repeated accounts into one claimable balance with the sum of their multipliers '
+             'instead of rejecting them.',
+    )
+    parser.add_argument(
+        '--max_operations', nargs=1, required=False,
+        help='Maximum number of operations per transaction, from 1 to 100. Defaults to 100.',
+    )
+    parser.add_argument(
+        '--max_transaction_size', nargs=1, required=False,
+        help='Maximum transaction envelope size in bytes, with room for the maximum of 20 signatures.',
+    )
+    parser.add_argument(
+        '--dry_run', action='store_true',
+        help='Only report the projected transactions, fees, required balances and submission time, without '
+             'building or signing anything.',
+    )
+    parser.add_argument(
+        '--max_in_flight', nargs=1, required=False,
+        help='With --dry_run, the --max_in_flight of the planned submission. Defaults to 10.',
+    )
+    parser.add_argument(
+        '--pipeline_depth', nargs=1, required=False,
+        help='With --dry_run, the --pipeline_depth of the planned submission. Defaults to 1.',
+    )
+    parser.add_argument(
+        '--shard', nargs=1, required=False,
+        help='Generate only shard I of N in format I/N, I starting from 0. Requires --base_fee and the sequence '
+             'numbers of every source account.',
+    )
+
+
+def get_shard(args):
+    if not args.shard:
+        return None
+
+    try:
+        shard = tuple(int(value) for value in args.shard[0].split('/'))
+        if len(shard) != 2 or not 0 <= shard[0] < shard[1]:
+            raise ValueError
+    except ValueError:
+        print('Invalid --shard')
+        exit(1)
+
+    return shard
+
+
+def print_plan(payer, accounts, shard, concurrency):
+    from ..packing import format_stroops, get_available_balances, print_balances, print_estimate
+
+    report = payer.plan(accounts, shard=shard)
+    base_fee = payer.base_fee or payer.server.fetch_base_fee()
+    report.print_report(base_fee, title='Would pack')
+    print_estimate(report.transactions_count, report.operations_count, concurrency)
+
+    if payer.channels:
+        print("Channel accounts pay {0} XLM in fees, about {1} XLM each.".format(
+            format_stroops(report.get_fee(base_fee)),
+            format_stroops(report.get_fee(base_fee) // len(payer.channels)),
+        ))
+
+    public_key = payer.distribution_wallet.public_key
+    try:
+        available = get_available_balances(payer.server.accounts().account_id(public_key).call())
+    except Exception:
+        print("Could not load the balances of {0}.".format(public_key))
+        available = None
+
+    print_balances(
+        "Distribution wallet {0} needs:".format(public_key),
+        report.get_required_balances(base_fee, pays_fees=not payer.channels), available,
+    )
+
+
+def run(args):
+    from ..aggregate import AccountsAggregator
+    from ..container import BINARY_EXTENSION, BINARY_FORMAT, CSV_FORMAT
+    from ..generator import AirdropGenerator, CheckpointError
+    from ..packing import MAX_OPERATIONS
+    from ..validator import AccountsValidator, read_accounts
+    from ..wallets import SecuredWallet
+
+    network = get_network(args)
+    tiers = get_tiers(args)
+    distribution_wallet_public = get_public_key(args.distribution_wallet_public[0], '--distribution_wallet_public')
+    distribution_wallet_secret = get_secret(args.distribution_wallet_secret[0], '--distribution_wallet_secret')
+    path_to_file = args.accounts_list_file[0]
+    collector_public_key = get_public_key(args.collector_public_key[0], '--collector_public_key')
+    start_date = get_timestamp(args.start_date[0], '--start_date') if args.start_date else None
+    end_date = get_timestamp(args.end_date[0], '--end_date') if args.end_date else None
+    start_sequence = get_int(args.start_sequence, '--start_sequence', minimum=0)
+    base_fee = get_int(args.base_fee, '--base_fee', minimum=100)
+    workers = get_int(args.workers, '--workers', default=1)
+    max_operations = get_int(args.max_operations, '--max_operations', default=MAX_OPERATIONS)
+    if max_operations > MAX_OPERATIONS:
+        print('Invalid --max_operations')
+        exit(1)
+    max_transaction_size = get_int(args.max_transaction_size, '--max_transaction_size')
+    max_in_flight = get_int(args.max_in_flight, '--max_in_flight', default=10)
+    pipeline_depth = get_int(args.pipeline_depth, '--pipeline_depth', default=1)
+    shard = get_shard(args)
+
+    output_format = args.output_format[0] if args.output_format else BINARY_FORMAT
+    if output_format not in [BINARY_FORMAT, CSV_FORMAT]:
+        print('Invalid --output_format')
+        exit(1)
+
+    if args.output_file:
+        output_file = args.output_file[0]
+    elif args.resume:
+        print('--resume requires --output_file')
+        exit(1)
+    else:
+        output_file = 'generated_xdrs_{0}{1}{2}'.format(
+            int(time.time()), '_shard{0}'.format(shard[0]) if shard else '',
+            BINARY_EXTENSION if output_format == BINARY_FORMAT else '.csv',
+        )
+
+    if args.resume and args.dry_run:
+        print('--resume cannot be combined with --dry_run')
+        exit(1)
+
+    if args.resume and not os.path.exists('{0}.checkpoint'.format(output_file)):
+        print('No checkpoint found for {0}'.format(output_file))
+        exit(1)
+
+    channels = get_channels(args)
+
+    # Shards run on different hosts, so all of them must start from the same sequence numbers and fee
+    # instead of whatever Horizon returns at the time.
+    if shard is not None and not args.resume:
+        if channels:
+            sequences_known = all(sequence_number is not None for _, sequence_number in channels)
+        else:
+            sequences_known = start_sequence is not None
+
+        if base_fee is None or not sequences_known:
+            print('--shard requires --base_fee and --start_sequence, or sequence numbers in --channel_accounts_file')
+            exit(1)
+
+    distribution_wallet = SecuredWallet(distribution_wallet_public, distribution_wallet_secret)
+    check_file(path_to_file)
+
+    metrics = get_metrics(args, 'generate')
+    validator = AccountsValidator(
+        rejects_filename=get_rejects_file(args, path_to_file), reject_duplicates=not args.merge_duplicates,
+        metrics=metrics,
+    )
+    accounts = validator.validate(read_accounts(path_to_file))
+    if args.merge_duplicates:
+        accounts = AccountsAggregator(page_size=max_operations, operations_per_row=len(tiers)).aggregate(accounts)
+
+    payer = AirdropGenerator(
+        asset=tiers[0].asset, distribution_wallet=distribution_wallet, network=network,
+        collector_public_key=collector_public_key, claim_allowed_after=start_date,
+        claim_allowed_before=end_date, start_sequence=start_sequence, base_fee=base_fee, channels=channels,
+        metrics=metrics, tiers=tiers, max_operations=max_operations, max_transaction_size=max_transaction_size,
+        server=get_server(args, network, metrics),
+    )
+
+    try:
+        payer.get_packer()
+    except ValueError as exc:
+        print('Invalid --max_transaction_size: {0}'.format(exc))
+        exit(1)
+
+    if args.dry_run:
+        print_plan(payer, accounts, shard, min(max_in_flight, len(channels or [None]) * pipeline_depth))
+        metrics.print_summary()
+        return
+
+    try:
+        payer.generate_payments(
+            accounts, None, output_file, resume=args.resume, workers=workers, output_format=output_format,
+            shard=shard,
+        )
+    except CheckpointError as exc:
+        print('Cannot resume {0}: {1}'.format(output_file, exc))
+        exit(1)
+    metrics.print_summary()
@@ -0,0 +1,61 @@
+import os
+
+from sys import exit
+
+from ..cli import add_network_arguments, check_file, get_network, get_network_passphrase
+
+
+DESCRIPTION = 'Merges the outputs of a sharded airdrop generation into one file and checks that every source ' \
+              'account has a gap-free sequence of transactions.'
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--input_files', nargs='+', help='Shard outputs, ordered by shard number.', required=True,
+    )
+    parser.add_argument(
+        '--output_file', nargs=1, help='Path to the merged file.', required=True,
+    )
+    add_network_arguments(parser, horizon_url=False)
+    parser.add_argument(
+        '--output_format', nargs=1, required=False,
+        help='Format of the merged file: ["binary", "csv"]. Defaults to binary.',
+    )
+
+
+def run(args):
+    from ..container import BINARY_FORMAT, CSV_FORMAT, open_envelope_writer, read_envelopes
+    from ..merge import MergeError, ShardMerger
+
+    network_passphrase = get_network_passphrase(get_network(args))
+
+    output_format = args.output_format[0] if args.output_format else BINARY_FORMAT
+    if output_format not in [BINARY_FORMAT, CSV_FORMAT]:
+        print('Invalid --output_format')
+        exit(1)
+
+    for path_to_file in args.input_files:
+        check_file(path_to_file)
+
+    output_file = args.output_file[0]
+    merger = ShardMerger(network_passphrase)
+    writer = open_envelope_writer(output_file, output_format)
+    merged = False
+
+    try:
+        for entry in merger.merge([read_envelopes(path_to_file) for path_to_file in args.input_files]):
+            writer.write(entry)
+        writer.flush()
+        merged = True
+    except MergeError as exc:
+        print('Shards cannot be merged: {0}'.format(exc))
+        exit(1)
+    finally:
+        writer.close()
+        # A partial merge is a valid file, it must not be signed or submitted by mistake.
+        if not merged:
+            os.remove(output_file)
+
+    print("Merged {0} transactions of {1} shards into {2}".format(
+        merger.merged_count, len(args.input_files), output_file,
+    ))
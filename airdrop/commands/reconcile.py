@@ -0,0 +1,139 @@
+import csv
+import os
+
+from sys import exit
+
+from ..cli import add_metrics_argument, add_network_arguments, check_file, get_int, get_metrics, get_network, \
+    get_network_passphrase, get_public_key, get_server, get_tiers, get_timestamp
+
+
+DESCRIPTION = 'Checks that every recipient of an airdrop received exactly one claimable balance of the expected ' \
+              'amount of every asset.'
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--asset', nargs='+', required=False,
+        help='Distributed assets, in format CODE:ISSUER, as passed to the generator.',
+    )
+    parser.add_argument(
+        '--campaigns_file', nargs=1, required=False,
+        help='Path to the JSON campaigns file passed to the generator. Replaces --asset and --base_amount.',
+    )
+    add_network_arguments(parser)
+    parser.add_argument(
+        '--accounts_list_file', nargs=1, help='Path to a CSV file with the list of accounts', required=True,
+    )
+    parser.add_argument(
+        '--base_amount', nargs='+', required=False,
+        help='Base token amount a user will receive. Either one for every --asset or one per --asset, in order.',
+    )
+    parser.add_argument(
+        '--start_date', nargs=1, required=False,
+        help='--start_date of the generator. With --end_date, the claim window of every balance is checked too.',
+    )
+    parser.add_argument(
+        '--end_date', nargs=1, required=False,
+        help='--end_date of the generator.',
+    )
+    parser.add_argument(
+        '--xdr_list_file', nargs=1, required=False,
+        help='Path to the submitted transactions. Their operations are fetched from Horizon by hash.',
+    )
+    parser.add_argument(
+        '--distribution_wallet_public', nargs=1, required=False,
+        help='Distribution wallet public key. Without --xdr_list_file, the claimable balances it sponsors are '
+             'fetched from Horizon instead.',
+    )
+    parser.add_argument(
+        '--merge_duplicates', action='store_true',
+        help='Expect repeated accounts to be merged, as with the --merge_duplicates option of the generator.',
+    )
+    parser.add_argument(
+        '--concurrency', nargs=1, required=False,
+        help='Number of concurrent Horizon requests with --xdr_list_file. Defaults to 10.',
+    )
+    parser.add_argument(
+        '--report_file', nargs=1, required=False,
+        help='Path to the CSV report of problems. Defaults to <accounts_list_file>_reconciliation.csv.',
+    )
+    add_metrics_argument(parser)
+
+
+def run(args):
+    from ..container import read_envelopes
+    from ..packing import format_stroops
+    from ..reconcile import Reconciler
+    from ..validator import AccountsValidator, read_accounts
+
+    network = get_network(args)
+    tiers = get_tiers(args, require_dates=False)
+    start_date = get_timestamp(args.start_date[0], '--start_date') if args.start_date else None
+    end_date = get_timestamp(args.end_date[0], '--end_date') if args.end_date else None
+
+    distribution_wallet_public = None
+    if args.distribution_wallet_public:
+        distribution_wallet_public = get_public_key(
+            args.distribution_wallet_public[0], '--distribution_wallet_public',
+        )
+
+    if not args.xdr_list_file and distribution_wallet_public is None:
+        print('Either --xdr_list_file or --distribution_wallet_public is required')
+        exit(1)
+
+    concurrency = get_int(args.concurrency, '--concurrency', default=10)
+
+    path_to_file = args.accounts_list_file[0]
+    for path in [path_to_file] + (args.xdr_list_file or []):
+        check_file(path)
+
+    if args.report_file:
+        report_file = args.report_file[0]
+    else:
+        report_file = '{0}_reconciliation.csv'.format(os.path.splitext(path_to_file)[0])
+
+    metrics = get_metrics(args, 'reconcile')
+    server = get_server(args, network, metrics, pool_size=concurrency)
+    network_passphrase = get_network_passphrase(network)
+
+    reconciler = Reconciler(
+        server, tiers, merge_duplicates=args.merge_duplicates, concurrency=concurrency, metrics=metrics,
+        claim_allowed_after=start_date, claim_allowed_before=end_date,
+    )
+    issues = {}
+
+    try:
+        validator = AccountsValidator(reject_duplicates=False, metrics=metrics)
+        reconciler.load_recipients(validator.validate(read_accounts(path_to_file)))
+
+        if args.xdr_list_file:
+            reconciler.load_transactions(
+                entry.transaction_hash for entry in read_envelopes(args.xdr_list_file[0], network_passphrase)
+            )
+        else:
+            reconciler.load_claimable_balances(distribution_wallet_public)
+
+        with open(report_file, mode='w', newline='') as output_file:
+            writer = csv.writer(output_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(['account', 'line', 'asset', 'expected_amount', 'actual_amount', 'balances', 'issue'])
+
+            for account, line, asset, expected_amount, actual_amount, count, issue in reconciler.get_issues():
+                writer.writerow([
+                    account, '' if line is None else line, asset,
+                    '' if expected_amount is None else format_stroops(expected_amount),
+                    '' if actual_amount is None else format_stroops(actual_amount), count, issue,
+                ])
+                issues[issue] = issues.get(issue, 0) + 1
+    finally:
+        reconciler.close()
+
+    print("Reconciled {0} recipients against {1} balances.".format(reconciler.expected_count, reconciler.actual_count))
+    metrics.print_summary()
+
+    if issues:
+        print("Found {0}, see {1}".format(
+            ', '.join('{0} {1}'.format(count, issue) for issue, count in sorted(issues.items())), report_file,
+        ))
+        exit(1)
+
+    print("Every recipient received the expected balance.")
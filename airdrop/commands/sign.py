@@ -0,0 +1,71 @@
+from sys import exit
+
+from ..cli import add_metrics_argument, add_network_arguments, get_int, get_metrics, get_network, \
+    get_network_passphrase, get_secret
+
+
+DESCRIPTION = 'Signs airdrop transactions with the specified signing keys and writes a file with signed transactions.'
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--xdr_list_file', nargs=1, required=True,
+        help='Path to a binary container or a CSV file with generated transactions.',
+    )
+    add_network_arguments(parser, horizon_url=False)
+    parser.add_argument(
+        '--signer_key', nargs='+', required=True,
+        help='Additional signing keys of the distribution wallet. All of them are added in one pass.',
+    )
+    parser.add_argument(
+        '--workers', nargs=1, required=False,
+        help='Number of processes that sign transactions in parallel. Defaults to 1.',
+    )
+    parser.add_argument(
+        '--output_format', nargs=1, required=False,
+        help='Format of the signed file: ["binary", "csv"]. Defaults to the format of --xdr_list_file.',
+    )
+    add_metrics_argument(parser)
+
+
+def run(args):
+    from ..container import BINARY_FORMAT, CSV_FORMAT, get_file_format, get_output_filename, open_envelope_writer
+    from ..signer import Signer, read_xdrs
+
+    path_to_file = args.xdr_list_file[0]
+    signer_secrets = [get_secret(signer_key, '--signer_key') for signer_key in args.signer_key]
+    network_passphrase = get_network_passphrase(get_network(args))
+    workers = get_int(args.workers, '--workers', default=1)
+
+    try:
+        input_format = get_file_format(path_to_file)
+    except OSError:
+        print('Invalid {0} file'.format(path_to_file))
+        exit(1)
+
+    output_format = args.output_format[0] if args.output_format else input_format
+    if output_format not in [BINARY_FORMAT, CSV_FORMAT]:
+        print('Invalid --output_format')
+        exit(1)
+
+    output_filename = get_output_filename(
+        path_to_file, '_signed', output_format if output_format != input_format else None,
+    )
+
+    metrics = get_metrics(args, 'sign')
+    signer = Signer(network_passphrase, signer_secrets, metrics=metrics)
+    xdr_writer = open_envelope_writer(output_filename, output_format)
+
+    try:
+        for signed_entry in signer.sign(read_xdrs(path_to_file), workers=workers):
+            with metrics.timer('write'):
+                xdr_writer.write(signed_entry)
+        xdr_writer.flush()
+    except KeyboardInterrupt:
+        print("Signing aborted.")
+        exit(1)
+    finally:
+        xdr_writer.close()
+
+    print("Signed {0} transactions into {1}".format(signer.signed_count, output_filename))
+    metrics.print_summary()
@@ -0,0 +1,99 @@
+from sys import exit
+
+from ..cli import add_metrics_argument, add_network_arguments, check_file, get_int, get_metrics, get_network, \
+    get_network_passphrase, get_server
+
+
+DESCRIPTION = 'Distributes the asset airdrop by submitting signed transactions to the network.'
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--xdr_list_file', nargs=1, required=True,
+        help='Path to a binary container or a CSV file with signed transactions.',
+    )
+    add_network_arguments(parser)
+    parser.add_argument(
+        '--max_in_flight', nargs=1, required=False,
+        help='Maximum number of transactions submitted concurrently. Defaults to 10.',
+    )
+    parser.add_argument(
+        '--pipeline_depth', nargs=1, required=False,
+        help='Maximum number of in-flight transactions per source account. Defaults to 1.',
+    )
+    parser.add_argument(
+        '--max_attempts', nargs=1, required=False,
+        help='Maximum number of submissions of a transaction that times out or fails with tx_bad_seq. Defaults to 5.',
+    )
+    parser.add_argument(
+        '--journal_file', nargs=1, required=False,
+        help='Path to the SQLite submission journal. Defaults to <xdr_list_file>.journal.',
+    )
+    parser.add_argument(
+        '--fee_account_secret', nargs=1, required=False,
+        help='Signing key of an account that pays fee bumps for transactions stalled by surge pricing.',
+    )
+    parser.add_argument(
+        '--max_fee_per_op', nargs=1, required=False,
+        help='Maximum fee bump fee per operation in stroops. Required with --fee_account_secret.',
+    )
+    add_metrics_argument(parser)
+
+
+def run(args):
+    from stellar_sdk import Keypair
+
+    from ..journal import SubmissionJournal
+    from ..submitter import Submitter, read_xdrs
+
+    path_to_file = args.xdr_list_file[0]
+    network = get_network(args)
+    max_in_flight = get_int(args.max_in_flight, '--max_in_flight', default=10)
+    pipeline_depth = get_int(args.pipeline_depth, '--pipeline_depth', default=1)
+    max_attempts = get_int(args.max_attempts, '--max_attempts', default=5)
+
+    fee_account = None
+    max_fee_per_op = None
+    if args.fee_account_secret:
+        try:
+            fee_account = Keypair.from_secret(args.fee_account_secret[0])
+        except Exception:
+            print('Invalid --fee_account_secret')
+            exit(1)
+
+        if not args.max_fee_per_op:
+            print('Invalid --max_fee_per_op')
+            exit(1)
+        max_fee_per_op = get_int(args.max_fee_per_op, '--max_fee_per_op', minimum=100)
+
+    if args.journal_file:
+        journal_file = args.journal_file[0]
+    else:
+        journal_file = '{0}.journal'.format(path_to_file)
+
+    # Timeouts are retried by the submitter, which checks for an applied transaction and may fee bump it first.
+    check_file(path_to_file)
+
+    metrics = get_metrics(args, 'submit')
+    server = get_server(args, network, metrics, pool_size=max_in_flight, num_retries=0)
+    network_passphrase = get_network_passphrase(network)
+    journal = SubmissionJournal(journal_file)
+    submitter = Submitter(
+        server, network_passphrase, max_in_flight=max_in_flight, pipeline_depth=pipeline_depth,
+        journal=journal, max_attempts=max_attempts, fee_account=fee_account, max_fee_per_op=max_fee_per_op,
+        metrics=metrics,
+    )
+    try:
+        submitter.submit(read_xdrs(path_to_file))
+    except KeyboardInterrupt:
+        print("Submission aborted. Rerun the same command to continue.")
+        exit(1)
+    finally:
+        journal.close()
+        metrics.print_summary()
+
+    if submitter.failed_count or submitter.skipped_count:
+        print("{0} transactions were not submitted.".format(submitter.failed_count + submitter.skipped_count))
+        exit(1)
+
+    print("Transactions successfully submitted to the network.")
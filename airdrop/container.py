@@ -0,0 +1,249 @@
+import base64
+import csv
+import mmap
+import os
+import struct
+
+from collections import namedtuple
+from typing import Iterator, Optional
+
+from stellar_sdk import FeeBumpTransactionEnvelope, parse_transaction_envelope_from_xdr
+from stellar_sdk.strkey import StrKey
+
+from .envelope import RawEnvelope, get_network_id
+
+
+# Binary envelope container:
+#
+#   header   MAGIC, version, flags, entries count, index offset
+#   records  length, sequence, source, hash, raw envelope XDR -- one per transaction
+#   index    sequence, source, hash, record offset, length -- one per transaction
+#
+# The index and the header fields pointing to it are written on close. A file that was not closed,
+# e.g. after a crash, has no valid index and is indexed by scanning its records instead.
+MAGIC = b'AQTX'
+VERSION = 1
+HEADER = struct.Struct('>4sHHQQ')
+RECORD_HEADER = struct.Struct('>Iq32s32s')
+INDEX_ENTRY = struct.Struct('>q32s32sQI')
+EMPTY_HASH = bytes(32)
+
+BINARY_FORMAT = 'binary'
+CSV_FORMAT = 'csv'
+BINARY_EXTENSION = '.aqtx'
+
+
+EnvelopeEntry = namedtuple('EnvelopeEntry', ['xdr', 'transaction_hash', 'source', 'sequence'])
+IndexEntry = namedtuple('IndexEntry', ['sequence', 'source', 'transaction_hash', 'offset', 'length'])
+
+
+def get_envelope_entry(xdr, network_passphrase) -> EnvelopeEntry:
+    raw_envelope = RawEnvelope.parse(base64.b64decode(xdr))
+    if raw_envelope is not None:
+        return EnvelopeEntry(
+            xdr, raw_envelope.hash(get_network_id(network_passphrase)).hex(),
+            raw_envelope.source, raw_envelope.sequence,
+        )
+
+    return get_sdk_envelope_entry(xdr, parse_transaction_envelope_from_xdr(xdr, network_passphrase))
+
+
+def get_sdk_envelope_entry(xdr, te) -> EnvelopeEntry:
+    # A fee bump is identified by its own hash, and ordered by the source and sequence of its inner transaction.
+    transaction = te.transaction
+    if isinstance(te, FeeBumpTransactionEnvelope):
+        transaction = transaction.inner_transaction_envelope.transaction
+
+    return EnvelopeEntry(xdr, te.hash_hex(), transaction.source.account_id, transaction.sequence)
+
+
+def get_file_format(filename):
+    with open(filename, mode='rb') as envelopes_file:
+        if envelopes_file.read(len(MAGIC)) == MAGIC:
+            return BINARY_FORMAT
+
+    return CSV_FORMAT
+
+
+def _truncate(envelopes_file, offset):
+    # truncate() would pad a shorter file with zeros up to the offset.
+    envelopes_file.seek(0, os.SEEK_END)
+    if offset > envelopes_file.tell():
+        envelopes_file.close()
+        raise ValueError('{0} is shorter than offset {1}'.format(envelopes_file.name, offset))
+
+    envelopes_file.truncate(offset)
+
+
+class CsvEnvelopeWriter(object):
+    def __init__(self, filename, offset=0):
+        self.envelopes_file = open(filename, mode='a+', newline='')
+        _truncate(self.envelopes_file, offset)
+        self.envelopes_file.seek(offset)
+        self.writer = csv.writer(self.envelopes_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+
+    def write(self, entry: EnvelopeEntry):
+        self.writer.writerow([entry.xdr])
+
+    def flush(self):
+        self.envelopes_file.flush()
+        os.fsync(self.envelopes_file.fileno())
+
+        return self.envelopes_file.tell()
+
+    def close(self):
+        self.envelopes_file.close()
+
+
+class EnvelopeWriter(object):
+    def __init__(self, filename, offset=0):
+        # The header is rewritten in place, which append mode would not allow.
+        self.envelopes_file = open(filename, mode='r+b' if os.path.exists(filename) else 'w+b')
+        _truncate(self.envelopes_file, offset)
+        self.envelopes_file.seek(offset)
+        if not offset:
+            self.envelopes_file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        else:
+            # Appending invalidates the index of a closed file, it is rebuilt on close.
+            self._write_header(0, 0)
+
+        self.index = list(scan_records(self.envelopes_file, self.envelopes_file.tell())) if offset else []
+
+    def _write_header(self, count, index_offset):
+        position = self.envelopes_file.tell()
+        self.envelopes_file.seek(0)
+        self.envelopes_file.write(HEADER.pack(MAGIC, VERSION, 0, count, index_offset))
+        self.envelopes_file.seek(position)
+
+    def write(self, entry: EnvelopeEntry):
+        raw_xdr = base64.b64decode(entry.xdr)
+        source = StrKey.decode_ed25519_public_key(entry.source)
+        transaction_hash = bytes.fromhex(entry.transaction_hash)
+        offset = self.envelopes_file.tell()
+
+        self.envelopes_file.write(RECORD_HEADER.pack(len(raw_xdr), entry.sequence, source, transaction_hash))
+        self.envelopes_file.write(raw_xdr)
+        self.index.append(IndexEntry(entry.sequence, source, transaction_hash, offset, len(raw_xdr)))
+
+    def flush(self):
+        self.envelopes_file.flush()
+        os.fsync(self.envelopes_file.fileno())
+
+        return self.envelopes_file.tell()
+
+    def close(self):
+        index_offset = self.envelopes_file.tell()
+        for entry in self.index:
+            self.envelopes_file.write(INDEX_ENTRY.pack(*entry))
+
+        self._write_header(len(self.index), index_offset)
+        self.envelopes_file.close()
+
+
+def open_envelope_writer(filename, file_format, offset=0):
+    if file_format == BINARY_FORMAT:
+        return EnvelopeWriter(filename, offset)
+
+    return CsvEnvelopeWriter(filename, offset)
+
+
+def scan_records(envelopes_file, end_offset) -> Iterator[IndexEntry]:
+    offset = HEADER.size
+
+    while offset + RECORD_HEADER.size <= end_offset:
+        envelopes_file.seek(offset)
+        length, sequence, source, transaction_hash = RECORD_HEADER.unpack(envelopes_file.read(RECORD_HEADER.size))
+        if offset + RECORD_HEADER.size + length > end_offset:
+            break
+        # Zeros past the last record, e.g. from a file extended before a crash, are not a record.
+        if not length and transaction_hash == EMPTY_HASH:
+            break
+
+        yield IndexEntry(sequence, source, transaction_hash, offset, length)
+        offset += RECORD_HEADER.size + length
+
+    envelopes_file.seek(end_offset)
+
+
+class EnvelopeReader(object):
+    # Entries can be looked up by position without parsing any envelope, so stages can seek, shard and skip.
+
+    def __init__(self, filename, use_mmap=True):
+        self.envelopes_file = open(filename, mode='rb')
+
+        magic, version, _, count, index_offset = HEADER.unpack(self.envelopes_file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{0} is not an envelope container'.format(filename))
+
+        size = os.fstat(self.envelopes_file.fileno()).st_size
+        self.data = None
+        if use_mmap and size:
+            self.data = mmap.mmap(self.envelopes_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if index_offset and index_offset + count * INDEX_ENTRY.size == size:
+            self.envelopes_file.seek(index_offset)
+            index = self.envelopes_file.read(count * INDEX_ENTRY.size)
+            self.index = [IndexEntry(*entry) for entry in INDEX_ENTRY.iter_unpack(index)]
+        else:
+            self.index = list(scan_records(self.envelopes_file, size))
+
+    def __len__(self):
+        return len(self.index)
+
+    def read_raw(self, position) -> bytes:
+        entry = self.index[position]
+        start = entry.offset + RECORD_HEADER.size
+
+        if self.data is not None:
+            return self.data[start:start + entry.length]
+
+        self.envelopes_file.seek(start)
+        return self.envelopes_file.read(entry.length)
+
+    def __getitem__(self, position) -> EnvelopeEntry:
+        entry = self.index[position]
+
+        return EnvelopeEntry(
+            base64.b64encode(self.read_raw(position)).decode(), entry.transaction_hash.hex(),
+            StrKey.encode_ed25519_public_key(entry.source), entry.sequence,
+        )
+
+    def __iter__(self) -> Iterator[EnvelopeEntry]:
+        for position in range(len(self.index)):
+            yield self[position]
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+        self.envelopes_file.close()
+
+
+def read_envelopes(filename, network_passphrase=None) -> Iterator[EnvelopeEntry]:
+    # CSV rows carry only the XDR, the rest of the entry is filled in when a network passphrase is given.
+    if get_file_format(filename) == BINARY_FORMAT:
+        reader = EnvelopeReader(filename)
+        try:
+            for entry in reader:
+                yield entry
+        finally:
+            reader.close()
+        return
+
+    with open(filename) as csv_file:
+        csv_reader = csv.reader(csv_file, delimiter=',')
+
+        for row in csv_reader:
+            if network_passphrase is None:
+                yield EnvelopeEntry(row[0], None, None, None)
+            else:
+                yield get_envelope_entry(row[0], network_passphrase)
+
+
+def get_output_filename(filename, suffix, file_format: Optional[str] = None):
+    root, extension = os.path.splitext(filename)
+    if file_format == BINARY_FORMAT:
+        extension = BINARY_EXTENSION
+    elif file_format == CSV_FORMAT:
+        extension = '.csv'
+
+    return '{0}{1}{2}'.format(root, suffix, extension)
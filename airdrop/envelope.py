@@ -0,0 +1,108 @@
+import hashlib
+import struct
+
+from functools import lru_cache
+from typing import List, Optional
+
+from stellar_sdk import Keypair
+from stellar_sdk.exceptions import SignatureExistError
+from stellar_sdk.strkey import StrKey
+
+
+# Raw layout of a v1 transaction envelope:
+#
+#   int32    envelope type (ENVELOPE_TYPE_TX)
+#   ...      transaction: source, fee, sequence, preconditions, memo, operations, ext
+#   uint32   signatures count
+#   ...      signatures: 4 byte hint, uint32 length, 64 byte ed25519 signature
+#
+# Only the fixed header and the signatures at the end are decoded, the operations are never touched.
+ENVELOPE_TYPE_TX = 2
+KEY_TYPE_ED25519 = 0
+MAX_SIGNATURES = 20
+SIGNATURE_LENGTH = 64
+
+INT32 = struct.Struct('>i')
+UINT32 = struct.Struct('>I')
+HEADER = struct.Struct('>ii32sIq')
+SIGNATURE_HEADER = struct.Struct('>4sI')
+SIGNATURE_SIZE = SIGNATURE_HEADER.size + SIGNATURE_LENGTH
+
+
+@lru_cache(maxsize=None)
+def get_network_id(network_passphrase) -> bytes:
+    return hashlib.sha256(network_passphrase.encode()).digest()
+
+
+class RawEnvelope(object):
+    def __init__(self, raw: bytes, signatures_offset, signatures_count, source, sequence):
+        self.raw = raw
+        self.signatures_offset = signatures_offset
+        self.signatures_count = signatures_count
+        self.source = source
+        self.sequence = sequence
+
+    @classmethod
+    def parse(cls, raw: bytes) -> Optional['RawEnvelope']:
+        # Returns None for anything but a plain ed25519-signed v1 envelope, callers then fall back to the SDK.
+        if len(raw) < HEADER.size:
+            return None
+
+        envelope_type, key_type, source, _, sequence = HEADER.unpack_from(raw)
+        if envelope_type != ENVELOPE_TYPE_TX or key_type != KEY_TYPE_ED25519:
+            return None
+
+        # Walk back over the signatures. Several counts could fit the same bytes, such an envelope is
+        # left to the SDK rather than guessed.
+        found = None
+        for signatures_count in range(MAX_SIGNATURES + 1):
+            signatures_offset = len(raw) - signatures_count * SIGNATURE_SIZE - UINT32.size
+            if signatures_offset - INT32.size < HEADER.size:
+                break
+
+            if UINT32.unpack_from(raw, signatures_offset)[0] != signatures_count:
+                continue
+            if INT32.unpack_from(raw, signatures_offset - INT32.size)[0] != 0:
+                continue
+            if any(
+                SIGNATURE_HEADER.unpack_from(raw, offset)[1] != SIGNATURE_LENGTH
+                for offset in range(signatures_offset + UINT32.size, len(raw), SIGNATURE_SIZE)
+            ):
+                continue
+
+            if found is not None:
+                return None
+            found = signatures_offset, signatures_count
+
+        if found is None:
+            return None
+
+        return cls(raw, found[0], found[1], StrKey.encode_ed25519_public_key(source), sequence)
+
+    def get_transaction_bytes(self) -> bytes:
+        return self.raw[INT32.size:self.signatures_offset]
+
+    def get_signatures(self) -> List[bytes]:
+        return [
+            self.raw[offset:offset + SIGNATURE_SIZE]
+            for offset in range(self.signatures_offset + UINT32.size, len(self.raw), SIGNATURE_SIZE)
+        ]
+
+    def hash(self, network_id: bytes) -> bytes:
+        return hashlib.sha256(network_id + INT32.pack(ENVELOPE_TYPE_TX) + self.get_transaction_bytes()).digest()
+
+    def sign(self, network_id: bytes, signer_keys: List[Keypair]) -> bytes:
+        transaction_hash = self.hash(network_id)
+        signatures = self.get_signatures()
+
+        for signer_key in signer_keys:
+            signature = SIGNATURE_HEADER.pack(signer_key.signature_hint(), SIGNATURE_LENGTH) \
+                + signer_key.sign(transaction_hash)
+            if signature in signatures:
+                raise SignatureExistError("The keypair has already signed.")
+            signatures.append(signature)
+
+        if len(signatures) > MAX_SIGNATURES:
+            raise ValueError('A transaction envelope holds at most {0} signatures'.format(MAX_SIGNATURES))
+
+        return b''.join([self.raw[:self.signatures_offset], UINT32.pack(len(signatures))] + signatures)
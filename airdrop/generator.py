@@ -0,0 +1,494 @@
+import json
+import multiprocessing
+import os
+import signal
+import time
+
+from itertools import chain, dropwhile
+from decimal import Decimal, ROUND_DOWN
+from typing import Iterable, Iterator, List, Sequence
+
+from stellar_sdk import Account, Asset, Claimant, ClaimPredicate, Network
+from stellar_sdk.transaction_builder import TransactionBuilder, TransactionEnvelope
+
+from .container import BINARY_FORMAT, CSV_FORMAT, EnvelopeEntry, open_envelope_writer
+from .horizon import HorizonClient, get_server
+from .metrics import Metrics
+from .packing import MAX_OPERATIONS, MAX_SIGNATURES, MIN_BASE_FEE, SIGNATURE_SIZE, STROOPS_PER_UNIT, PackingReport, \
+    Tier, TransactionPacker, format_stroops, get_asset_key, get_operations
+from .parallel import ordered_imap
+
+
+class CheckpointError(Exception):
+    pass
+
+
+class PrecompiledClaimant(Claimant):
+    def to_xdr_object(self):
+        # The claimant is encoded once, then reused when the transaction is hashed and serialized.
+        xdr_object = self.__dict__.get('_xdr_object')
+        if xdr_object is None:
+            xdr_object = self._xdr_object = super(PrecompiledClaimant, self).to_xdr_object()
+        return xdr_object
+
+
+class PrecompiledAsset(Asset):
+    def to_xdr_object(self):
+        xdr_object = self.__dict__.get('_xdr_object')
+        if xdr_object is None:
+            xdr_object = self._xdr_object = super(PrecompiledAsset, self).to_xdr_object()
+        return xdr_object
+
+
+class AirdropGenerator(object):
+    def __init__(
+        self, asset, distribution_wallet, network,collector_public_key, claim_allowed_after, claim_allowed_before,
+        start_sequence=None, base_fee=None, channels=None, horizon_url=None, metrics=None, tiers=None,
+        max_operations=MAX_OPERATIONS, max_transaction_size=None, server=None,
+    ):
+        self.asset = asset
+        self.tiers = tiers
+        self.distribution_wallet = distribution_wallet
+        self.collector = collector_public_key
+
+        self.claim_allowed_after = claim_allowed_after
+        self.claim_allowed_before = claim_allowed_before
+
+        self.base_fee = base_fee
+        self.metrics = metrics or Metrics('generate')
+
+        # Transactions are sourced from channel accounts in turn, so every channel gets its own sequence chain
+        # and the distribution wallet is only the source of the operations.
+        self.channels = [channel for channel, _ in channels or []]
+        self.start_sequences = {self.distribution_wallet.public_key: start_sequence}
+        for channel, sequence_number in channels or []:
+            self.start_sequences[channel.public_key] = sequence_number
+
+        # Transactions are filled up to `max_operations`, and with `max_transaction_size` to that many bytes
+        # once every signature is added.
+        self.max_operations = max_operations
+        self.max_transaction_size = max_transaction_size
+
+        # Everything except the destination, the asset and the amount is the same for every operation
+        # of a claim window.
+        self._assets = {}
+        self._claim_windows = {}
+        self._amounts = {}
+        self._stroops = {}
+
+        if network == 'testnet':
+            self.network_passphrase = Network.testnet_network().network_passphrase
+        elif network == 'public':
+            self.network_passphrase = Network.public_network().network_passphrase
+
+        self.server = server or get_server(network, horizon_url, HorizonClient(metrics=self.metrics))
+
+    page_size = MAX_OPERATIONS
+
+    def _get_tiers(self, base_amount: Decimal) -> List[Tier]:
+        if self.tiers:
+            return self.tiers
+
+        return [Tier(self.asset, base_amount)]
+
+    def _get_asset(self, asset: Asset) -> Asset:
+        precompiled_asset = self._assets.get((asset.code, asset.issuer))
+        if precompiled_asset is None:
+            precompiled_asset = self._assets[(asset.code, asset.issuer)] = PrecompiledAsset(asset.code, asset.issuer)
+        return precompiled_asset
+
+    def _get_claim_bounds(self, tier: Tier):
+        # A tier without its own window is claimable in the window of the generator, 0 is a valid timestamp.
+        claim_allowed_after = tier.claim_allowed_after
+        if claim_allowed_after is None:
+            claim_allowed_after = self.claim_allowed_after
+
+        claim_allowed_before = tier.claim_allowed_before
+        if claim_allowed_before is None:
+            claim_allowed_before = self.claim_allowed_before
+
+        return claim_allowed_after, claim_allowed_before
+
+    def _get_claim_window(self, tier: Tier):
+        claim_allowed_after, claim_allowed_before = self._get_claim_bounds(tier)
+
+        claim_window = self._claim_windows.get((claim_allowed_after, claim_allowed_before))
+        if claim_window is None:
+            account_predicate = ClaimPredicate.predicate_and(
+                ClaimPredicate.predicate_not(
+                    ClaimPredicate.predicate_before_absolute_time(claim_allowed_after)
+                ),
+                ClaimPredicate.predicate_before_absolute_time(claim_allowed_before)
+            )
+            collector_claimant = PrecompiledClaimant(
+                destination=self.collector,
+                predicate=ClaimPredicate.predicate_not(
+                    ClaimPredicate.predicate_before_absolute_time(claim_allowed_before)
+                ),
+            )
+            claim_window = self._claim_windows[(claim_allowed_after, claim_allowed_before)] = (
+                account_predicate, collector_claimant,
+            )
+
+        return claim_window
+
+    def _get_transaction_size(self, operations: List) -> int:
+        # The fee field has a fixed size, the base fee may not be known yet.
+        transaction_envelope, _ = self._build_transaction(
+            operations, 0, self._get_source_wallets()[0], base_fee=MIN_BASE_FEE,
+        )
+        return len(transaction_envelope.to_xdr_object().to_xdr_bytes())
+
+    def get_packer(self) -> TransactionPacker:
+        if self.max_transaction_size is None:
+            return TransactionPacker(self.max_operations)
+
+        # Operations of a tier all have the same size, only the destination and the amount differ.
+        operation_sizes = []
+        for tier in range(len(self.tiers)):
+            operation = (self.distribution_wallet.public_key, 1, 0, tier)
+            single_size = self._get_transaction_size([operation])
+            operation_sizes.append(self._get_transaction_size([operation, operation]) - single_size)
+
+        envelope_size = single_size - operation_sizes[-1] + MAX_SIGNATURES * SIGNATURE_SIZE
+        return TransactionPacker(self.max_operations, self.max_transaction_size, envelope_size, operation_sizes)
+
+    def _get_operation_pages(self, accounts: Iterable, position=None) -> Iterator[List]:
+        operations = get_operations(accounts, len(self.tiers))
+        if position is not None:
+            # Operations up to the checkpoint position were already written.
+            operations = dropwhile(lambda operation: (operation[2], operation[3]) <= position, operations)
+
+        return self.get_packer().pack(operations)
+
+    def get_report(self) -> PackingReport:
+        return PackingReport(self.tiers, self._get_stroops, self.max_operations)
+
+    def _get_source_wallets(self):
+        return self.channels or [self.distribution_wallet]
+
+    def _load_source_state(self):
+        # Horizon is queried at most once per source account, and not at all when every value is given.
+        for wallet in self._get_source_wallets():
+            if self.start_sequences.get(wallet.public_key) is None:
+                server_account = self.server.load_account(wallet.public_key)
+                self.start_sequences[wallet.public_key] = server_account.sequence
+
+        if self.base_fee is None:
+            self.base_fee = self.server.fetch_base_fee()
+
+    def _get_stroops(self, base_amount: Decimal, multiplier: int) -> int:
+        stroops = self._stroops.get((base_amount, multiplier))
+        if stroops is None:
+            base_stroops = base_amount * STROOPS_PER_UNIT
+            if base_stroops == base_stroops.to_integral_value():
+                stroops = int(base_stroops) * multiplier
+            else:
+                stroops = int((base_stroops * multiplier).to_integral_value(rounding=ROUND_DOWN))
+            self._stroops[(base_amount, multiplier)] = stroops
+
+        return stroops
+
+    def _get_amount(self, base_amount: Decimal, multiplier: int) -> str:
+        amount = self._amounts.get((base_amount, multiplier))
+        if amount is None:
+            amount = self._amounts[(base_amount, multiplier)] = format_stroops(
+                self._get_stroops(base_amount, multiplier),
+            )
+
+        return amount
+
+    def _get_page_source(self, page_index):
+        source_wallets = self._get_source_wallets()
+        source_wallet = source_wallets[page_index % len(source_wallets)]
+        sequence_number = self.start_sequences[source_wallet.public_key] + page_index // len(source_wallets)
+
+        return source_wallet, sequence_number
+
+    def _get_builder(self, sequence_number, source_wallet=None, base_fee=None):
+        source_wallet = source_wallet or self.distribution_wallet
+        source_account = Account(source_wallet.public_key, sequence_number)
+
+        memo = '{0} airdrop'.format(self.asset.code)
+
+        builder = TransactionBuilder(
+            source_account=source_account,
+            network_passphrase=self.network_passphrase,
+            base_fee=base_fee or self.base_fee,
+        ).add_text_memo(memo)
+        return builder, sequence_number
+
+    def _build_transaction(
+        self, operations: Sequence, sequence_number, source_wallet=None, base_fee=None,
+    ) -> TransactionEnvelope:
+        builder, sequence_number = self._get_builder(sequence_number, source_wallet, base_fee)
+
+        operation_source = None
+        if source_wallet is not None and source_wallet.public_key != self.distribution_wallet.public_key:
+            operation_source = self.distribution_wallet.public_key
+
+        for account, multiplier, _, tier in operations:
+            tier = self.tiers[tier]
+            account_predicate, collector_claimant = self._get_claim_window(tier)
+            account_claimant = PrecompiledClaimant(
+                destination=account, predicate=account_predicate,
+            )
+            builder.append_create_claimable_balance_op(
+                claimants=[account_claimant, collector_claimant],
+                asset=self._get_asset(tier.asset),
+                amount=self._get_amount(tier.base_amount, multiplier),
+                source=operation_source,
+            )
+
+        return builder.build(), sequence_number
+
+    def _process_page(self, operations_page: List, page_index, timings=None):
+        started_at = time.perf_counter()
+        source_wallet, sequence_number = self._get_page_source(page_index)
+
+        transaction_envelope, sequence_number= self._build_transaction(
+            operations_page, sequence_number, source_wallet,
+        )
+        built_at = time.perf_counter()
+        if source_wallet is not self.distribution_wallet:
+            transaction_envelope.sign(source_wallet.secret)
+        transaction_envelope.sign(self.distribution_wallet.secret)
+
+        if timings is not None:
+            timings['build'] = built_at - started_at
+            timings['sign'] = time.perf_counter() - built_at
+
+        return transaction_envelope, sequence_number
+
+    def _get_tier_specs(self) -> List[dict]:
+        # The campaigns of a run as recorded in its checkpoint, with the claim window each of them ends up with.
+        tier_specs = []
+        for tier in self.tiers:
+            claim_allowed_after, claim_allowed_before = self._get_claim_bounds(tier)
+            tier_specs.append({
+                'asset': get_asset_key(tier.asset),
+                'base_amount': '{0:f}'.format(tier.base_amount.normalize()),
+                'claim_allowed_after': claim_allowed_after,
+                'claim_allowed_before': claim_allowed_before,
+            })
+
+        return tier_specs
+
+    def _check_checkpoint_tiers(self, checkpoint):
+        # Resuming with other campaigns would mix two airdrops in one output file.
+        if 'tiers' in checkpoint:
+            if checkpoint['tiers'] != self._get_tier_specs():
+                raise CheckpointError('The checkpoint was written for other assets, amounts or claim windows')
+        elif 'rows' in checkpoint and len(self.tiers) != 1:
+            # Checkpoints counting rows predate multi-asset runs.
+            raise CheckpointError('The checkpoint was written for a single asset run')
+
+    def _get_checkpoint_filename(self, filename):
+        return '{0}.checkpoint'.format(filename)
+
+    def _load_checkpoint(self, filename):
+        with open(self._get_checkpoint_filename(filename)) as checkpoint_file:
+            return json.load(checkpoint_file)
+
+    def _remove_checkpoint(self, filename):
+        checkpoint_filename = self._get_checkpoint_filename(filename)
+        if os.path.exists(checkpoint_filename):
+            os.remove(checkpoint_filename)
+
+    def _save_checkpoint(self, filename, checkpoint):
+        checkpoint_filename = self._get_checkpoint_filename(filename)
+        temporary_filename = '{0}.tmp'.format(checkpoint_filename)
+
+        with open(temporary_filename, mode='w') as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+
+        os.replace(temporary_filename, checkpoint_filename)
+
+    def _get_page_tasks(self, pages: Iterable, page_index, shard=None) -> Iterator:
+        # Every shard pages through all valid rows, so page indexes and sequence numbers match an unsharded
+        # run, and only builds the pages it owns.
+        for page in pages:
+            if shard is None or page_index % shard[1] == shard[0]:
+                yield page, page_index
+            page_index += 1
+
+    def _process_task(self, task):
+        # Timings travel back with the result, worker processes have no access to the metrics.
+        timings = {}
+        transaction_envelope, _ = self._process_page(*task, timings=timings)
+        transaction = transaction_envelope.transaction
+
+        started_at = time.perf_counter()
+        entry = EnvelopeEntry(
+            transaction_envelope.to_xdr(), transaction_envelope.hash_hex(),
+            transaction.source.account_id, transaction.sequence,
+        )
+        timings['encode'] = time.perf_counter() - started_at
+
+        return entry, timings
+
+    def _iter_results(self, pages: Iterator[List], page_index, workers=1, shard=None) -> Iterator:
+        # Yields (page, page_index, entry) records in page order.
+        first_page = next(pages, None)
+        if first_page is None:
+            return
+        pages = chain([first_page], pages)
+
+        # Sequence numbers and the base fee are resolved before the pool starts so every worker gets them.
+        self._load_source_state()
+
+        pool = None
+        tasks = self._get_page_tasks(pages, page_index, shard)
+
+        if workers > 1:
+            pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self,))
+            results = ordered_imap(pool, _process_task_worker, tasks, workers * 4)
+        else:
+            results = ((task, self._process_task(task)) for task in tasks)
+
+        try:
+            for (page, page_index), (entry, timings) in results:
+                for name, seconds in timings.items():
+                    self.metrics.add_time(name, seconds)
+
+                yield page, page_index, entry
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+    def generate(
+        self, accounts: Iterable, base_amount: Decimal = None, workers=1, shard=None,
+    ) -> Iterator[EnvelopeEntry]:
+        # Streams the signed transactions, without a file or a checkpoint.
+        self.tiers = self._get_tiers(base_amount)
+        pages = self._get_operation_pages(accounts)
+
+        for page, _, entry in self._iter_results(pages, 0, workers, shard):
+            self.metrics.increment('transactions')
+            self.metrics.increment('operations', len(page))
+            yield entry
+
+    def generate_payments(
+        self, accounts: Iterable, base_amount: Decimal, filename, resume=False, workers=1,
+        output_format=BINARY_FORMAT, shard=None,
+    ):
+        self.tiers = self._get_tiers(base_amount)
+        tier_specs = self._get_tier_specs()
+
+        checkpoint = {
+            'position': None,
+            'pages': 0,
+            'start_sequences': None,
+            'base_fee': None,
+            'output_offset': 0,
+            'output_format': output_format,
+            'shard': shard,
+            'max_operations': self.max_operations,
+            'max_transaction_size': self.max_transaction_size,
+            'tiers': tier_specs,
+        }
+
+        if resume:
+            checkpoint = self._load_checkpoint(filename)
+            self._check_checkpoint_tiers(checkpoint)
+            output_format = checkpoint.get('output_format', CSV_FORMAT)
+            shard = checkpoint.get('shard')
+            self.base_fee = checkpoint['base_fee']
+            self.start_sequences.update(checkpoint['start_sequences'])
+
+            # Pages must be packed the same way as before the interruption.
+            self.max_operations = checkpoint.get('max_operations', self.page_size)
+            self.max_transaction_size = checkpoint.get('max_transaction_size')
+            if 'rows' in checkpoint:
+                checkpoint['position'] = [checkpoint['rows'] - 1, 0]
+
+            output_size = os.path.getsize(filename) if os.path.exists(filename) else 0
+            if checkpoint['output_offset'] > output_size:
+                raise CheckpointError('The output file is shorter than the checkpoint')
+        else:
+            # A checkpoint left by an earlier run would point past the end of the file truncated below.
+            self._remove_checkpoint(filename)
+
+        position = checkpoint['position']
+        if position is not None:
+            position = tuple(position)
+            accounts = dropwhile(lambda account: account[2] < position[0], accounts)
+
+        report = self.get_report()
+        pages = self._get_operation_pages(accounts, position)
+        results = self._iter_results(pages, checkpoint['pages'], workers, shard)
+
+        # Drop a page that was written after the last checkpoint, it is regenerated below.
+        payments = open_envelope_writer(filename, output_format, checkpoint['output_offset'])
+
+        try:
+            for page, page_index, entry in results:
+                started_at = time.perf_counter()
+                payments.write(entry)
+                output_offset = payments.flush()
+                self._save_checkpoint(filename, {
+                    'position': page[-1][2:4],
+                    'pages': page_index + 1,
+                    'start_sequences': {
+                        wallet.public_key: self.start_sequences[wallet.public_key]
+                        for wallet in self._get_source_wallets()
+                    },
+                    'base_fee': self.base_fee,
+                    'output_offset': output_offset,
+                    'output_format': output_format,
+                    'shard': shard,
+                    'max_operations': self.max_operations,
+                    'max_transaction_size': self.max_transaction_size,
+                    'tiers': tier_specs,
+                })
+                self.metrics.add_time('write', time.perf_counter() - started_at)
+
+                report.add(page)
+                self.metrics.increment('transactions')
+                self.metrics.increment('operations', len(page))
+                self.metrics.report(
+                    "Processed {0} pages, {1} operations.", report.transactions_count, report.operations_count,
+                )
+        except KeyboardInterrupt:
+            print("Processing aborted.")
+        else:
+            print("Wallet processing complete. The number of operations is {0}".format(report.operations_count))
+        finally:
+            results.close()
+            payments.close()
+
+        if report.transactions_count:
+            report.print_report(self.base_fee)
+
+    def plan(self, accounts: Iterable, base_amount: Decimal = None, shard=None) -> PackingReport:
+        # Packs the operations without building or signing anything.
+        self.tiers = self._get_tiers(base_amount)
+        report = self.get_report()
+
+        for page, _ in self._get_page_tasks(self._get_operation_pages(accounts), 0, shard):
+            report.add(page)
+
+        return report
+
+    def __getstate__(self):
+        # Worker processes only build and sign transactions, they never talk to Horizon.
+        state = self.__dict__.copy()
+        state.pop('server', None)
+        state.pop('metrics', None)
+        return state
+
+
+_worker_generator = None
+
+
+def _init_worker(generator):
+    global _worker_generator
+    _worker_generator = generator
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _process_task_worker(task):
+    return _worker_generator._process_task(task)
@@ -0,0 +1,126 @@
+import re
+import threading
+import time
+
+from urllib.parse import urlparse
+
+from stellar_sdk import Server
+from stellar_sdk.client.requests_client import DEFAULT_NUM_RETRIES, RequestsClient
+
+from .metrics import Metrics
+
+
+HORIZON_URLS = {
+    'testnet': 'https://horizon-testnet.stellar.org',
+    'public': 'https://horizon.stellar.org',
+}
+
+# Responses of these endpoints are reused for `cache_ttl` seconds: fee stats, and account records until
+# a transaction is submitted. Of the ledgers, only the latest one is cached, which `Server.fetch_base_fee` reads.
+CACHED_ENDPOINTS = {'fee_stats', 'accounts'}
+LATEST_LEDGER_PARAMS = (('limit', '1'), ('order', 'desc'))
+
+RESOURCE_PATTERN = re.compile('^[a-z_]+$')
+
+
+def get_endpoint(method, url):
+    # Names an endpoint after the last resource of its path, e.g. /transactions/<hash>/operations is "operations".
+    if method == 'POST':
+        return 'submit'
+
+    segments = [segment for segment in urlparse(url).path.split('/') if segment]
+    resources = [segment for segment in segments if RESOURCE_PATTERN.match(segment)]
+    return resources[-1] if resources else 'root'
+
+
+def is_cached(endpoint, url, params):
+    if endpoint in CACHED_ENDPOINTS:
+        return True
+
+    return endpoint == 'ledgers' and urlparse(url).path.rstrip('/').endswith('/ledgers') \
+        and tuple(sorted((key, str(value)) for key, value in params.items())) == LATEST_LEDGER_PARAMS
+
+
+class HorizonClient(RequestsClient):
+    # A pooled keep-alive client shared by all the requests of a stage. It caches fee stats and account
+    # records for a short time, spaces requests to at most `max_rate` per second, and records the latency
+    # of every endpoint as `horizon_<endpoint>` in `metrics`.
+
+    def __init__(
+        self, pool_size=10, num_retries=DEFAULT_NUM_RETRIES, cache_ttl=5, max_rate=None, metrics=None, **kwargs
+    ):
+        super(HorizonClient, self).__init__(pool_size=pool_size, num_retries=num_retries, **kwargs)
+        self.cache_ttl = cache_ttl
+        self.max_rate = max_rate
+        self.metrics = metrics or Metrics('horizon')
+
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._next_request_at = 0.0
+        # Bumped around every submission, account records loaded across a bump are not cached.
+        self._accounts_generation = 0
+
+    def _throttle(self):
+        if not self.max_rate:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next_request_at - now)
+            self._next_request_at = max(now, self._next_request_at) + 1.0 / self.max_rate
+
+        if delay:
+            self.metrics.add_time('horizon_throttle', delay)
+            time.sleep(delay)
+
+    def _request(self, method, url, send):
+        self._throttle()
+
+        endpoint = get_endpoint(method, url)
+        started_at = time.perf_counter()
+        try:
+            return send()
+        finally:
+            self.metrics.observe('horizon_{0}'.format(endpoint), time.perf_counter() - started_at)
+
+    def get(self, url, params=None, *args, **kwargs):
+        endpoint = get_endpoint('GET', url)
+        if not self.cache_ttl or not is_cached(endpoint, url, params or {}):
+            return self._request('GET', url, lambda: super(HorizonClient, self).get(url, params, *args, **kwargs))
+
+        key = (url, tuple(sorted((params or {}).items())))
+        with self._lock:
+            cached = self._cache.get(key)
+            generation = self._accounts_generation
+        if cached is not None and cached[0] > time.monotonic():
+            self.metrics.increment('horizon_cache_hits')
+            return cached[1]
+
+        response = self._request('GET', url, lambda: super(HorizonClient, self).get(url, params, *args, **kwargs))
+        if response.status_code == 200:
+            with self._lock:
+                if endpoint != 'accounts' or generation == self._accounts_generation:
+                    self._cache[key] = (time.monotonic() + self.cache_ttl, response)
+
+        return response
+
+    def _invalidate_accounts(self):
+        with self._lock:
+            self._accounts_generation += 1
+            self._cache = {
+                key: value for key, value in self._cache.items() if get_endpoint('GET', key[0]) != 'accounts'
+            }
+
+    def post(self, url, *args, **kwargs):
+        # A submitted transaction changes the sequence number and the balances of its accounts. Accounts are
+        # dropped before the submission and again once it returns, and account records loaded meanwhile
+        # are not cached, they may predate the transaction.
+        self._invalidate_accounts()
+        try:
+            return self._request('POST', url, lambda: super(HorizonClient, self).post(url, *args, **kwargs))
+        finally:
+            self._invalidate_accounts()
+
+
+def get_server(network, horizon_url=None, client=None) -> Server:
+    return Server(horizon_url=horizon_url or HORIZON_URLS[network], client=client or HorizonClient())
@@ -0,0 +1,51 @@
+import sqlite3
+import time
+
+
+class SubmissionJournal(object):
+    PENDING = 'pending'
+    SUCCESS = 'success'
+    FAILED = 'failed'
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS transactions ('
+            '    hash TEXT PRIMARY KEY,'
+            '    line INTEGER NOT NULL,'
+            '    status TEXT NOT NULL,'
+            '    attempts INTEGER NOT NULL DEFAULT 0,'
+            '    error TEXT,'
+            '    updated_at REAL NOT NULL'
+            ')'
+        )
+        self.connection.commit()
+
+    def get(self, transaction_hash):
+        row = self.connection.execute(
+            'SELECT status, attempts FROM transactions WHERE hash = ?', (transaction_hash,),
+        ).fetchone()
+
+        if row is None:
+            return None, 0
+
+        return row
+
+    def mark(self, transaction_hash, line_number, status, attempts, error=None):
+        self.connection.execute(
+            'INSERT INTO transactions (hash, line, status, attempts, error, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT(hash) DO UPDATE SET '
+            '    status = excluded.status, attempts = excluded.attempts,'
+            '    error = excluded.error, updated_at = excluded.updated_at',
+            (transaction_hash, line_number, status, attempts, error, time.time()),
+        )
+        self.connection.commit()
+
+    def get_counts(self):
+        return dict(self.connection.execute('SELECT status, COUNT(*) FROM transactions GROUP BY status'))
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,61 @@
+from typing import Iterable, Iterator, List
+
+from .container import EnvelopeEntry, get_envelope_entry
+
+
+class MergeError(Exception):
+    pass
+
+
+class ShardMerger(object):
+    def __init__(self, network_passphrase):
+        self.network_passphrase = network_passphrase
+
+        self.merged_count = 0
+        self.last_sequences = {}
+        self.transaction_hashes = set()
+
+    def _check(self, entry: EnvelopeEntry, shard_index):
+        if entry.transaction_hash in self.transaction_hashes:
+            raise MergeError('Transaction {0} of shard {1} is duplicated'.format(entry.transaction_hash, shard_index))
+        self.transaction_hashes.add(entry.transaction_hash)
+
+        last_sequence = self.last_sequences.get(entry.source)
+        if last_sequence is not None and entry.sequence != last_sequence + 1:
+            raise MergeError('Transaction {0} of shard {1} has sequence {2} of {3}, expected {4}'.format(
+                entry.transaction_hash, shard_index, entry.sequence, entry.source, last_sequence + 1,
+            ))
+        self.last_sequences[entry.source] = entry.sequence
+
+    def merge(self, shards: List[Iterable[EnvelopeEntry]]) -> Iterator[EnvelopeEntry]:
+        # Page k of a run was generated by shard k % N, so taking one transaction from every shard in turn
+        # restores the order of an unsharded run. Once a shard runs out, every later shard must run out too.
+        shards = [iter(shard) for shard in shards]
+        exhausted_at = None
+
+        while exhausted_at is None:
+            for shard_index, shard in enumerate(shards):
+                entry = next(shard, None)
+
+                if entry is None:
+                    if exhausted_at is None:
+                        exhausted_at = shard_index
+                    continue
+
+                if exhausted_at is not None:
+                    raise MergeError('Shard {0} ended before shard {1}, the shards are incomplete'.format(
+                        exhausted_at, shard_index,
+                    ))
+
+                if entry.transaction_hash is None:
+                    entry = get_envelope_entry(entry.xdr, self.network_passphrase)
+
+                self._check(entry, shard_index)
+                self.merged_count += 1
+                yield entry
+
+        for shard_index, shard in enumerate(shards):
+            if next(shard, None) is not None:
+                raise MergeError('Shard {0} ended before shard {1}, the shards are incomplete'.format(
+                    exhausted_at, shard_index,
+                ))
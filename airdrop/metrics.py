@@ -0,0 +1,164 @@
+import json
+import os
+import random
+import threading
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class Metrics(object):
+    # Counters, gauges, timers and latency samples of one stage. Progress messages are throttled, and every
+    # report also rewrites `filename` (JSON for a .json file, Prometheus text otherwise), so a run can be
+    # watched and alerted on while it is still going.
+    max_samples = 10000
+    percentiles = [0.5, 0.9, 0.99]
+
+    def __init__(self, stage, filename=None, progress_interval=5):
+        self.stage = stage
+        self.filename = filename
+        self.progress_interval = progress_interval
+
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.progress_at = self.started_at
+        self.reported_at = {}
+
+        self.counters = OrderedDict()
+        self.gauges = OrderedDict()
+        self.timers = OrderedDict()
+        self.samples = OrderedDict()
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        self.progress_at = time.time()
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def add_time(self, name, seconds, count=1):
+        with self.lock:
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += count
+            timer[1] += seconds
+
+    @contextmanager
+    def timer(self, name):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started_at)
+
+    def observe(self, name, seconds):
+        # Latencies are kept in a bounded reservoir, percentiles of long runs are estimated from a uniform sample.
+        self.add_time(name, seconds)
+
+        with self.lock:
+            samples = self.samples.setdefault(name, [])
+            count = self.timers[name][0]
+            if len(samples) < self.max_samples:
+                samples.append(seconds)
+            else:
+                position = random.randrange(count)
+                if position < self.max_samples:
+                    samples[position] = seconds
+
+    def get_percentiles(self, name):
+        with self.lock:
+            samples = sorted(self.samples.get(name, []))
+
+        if not samples:
+            return OrderedDict()
+
+        return OrderedDict(
+            (percentile, samples[min(len(samples) - 1, int(percentile * len(samples)))])
+            for percentile in self.percentiles
+        )
+
+    def report(self, message, *args, force=False):
+        now = time.monotonic()
+        if not force and now - self.reported_at.get(message, 0) < self.progress_interval:
+            return
+
+        self.reported_at[message] = now
+        print(message.format(*args))
+        self.save()
+
+    def to_dict(self):
+        with self.lock:
+            counters = OrderedDict(self.counters)
+            timers = OrderedDict((name, list(timer)) for name, timer in self.timers.items())
+
+        return OrderedDict([
+            ('stage', self.stage),
+            ('started_at', self.started_at),
+            ('elapsed_seconds', time.time() - self.started_at),
+            ('last_progress_at', self.progress_at),
+            ('counters', counters),
+            ('gauges', OrderedDict(self.gauges)),
+            ('timers', OrderedDict(
+                (name, OrderedDict([('count', count), ('seconds', seconds)]))
+                for name, (count, seconds) in timers.items()
+            )),
+            ('latencies', OrderedDict(
+                (name, OrderedDict(('p{0:g}'.format(percentile * 100), value)
+                                   for percentile, value in self.get_percentiles(name).items()))
+                for name in list(self.samples)
+            )),
+        ])
+
+    def to_prometheus(self):
+        prefix = 'airdrop_{0}'.format(self.stage)
+        metrics = self.to_dict()
+        lines = [
+            '{0}_elapsed_seconds {1}'.format(prefix, metrics['elapsed_seconds']),
+            '{0}_last_progress_timestamp_seconds {1}'.format(prefix, metrics['last_progress_at']),
+        ]
+
+        for name, value in metrics['counters'].items():
+            lines.append('{0}_{1}_total {2}'.format(prefix, name, value))
+        for name, value in metrics['gauges'].items():
+            lines.append('{0}_{1} {2}'.format(prefix, name, value))
+        for name, timer in metrics['timers'].items():
+            for percentile, value in self.get_percentiles(name).items():
+                lines.append('{0}_{1}_seconds{{quantile="{2:g}"}} {3}'.format(prefix, name, percentile, value))
+            lines.append('{0}_{1}_seconds_sum {2}'.format(prefix, name, timer['seconds']))
+            lines.append('{0}_{1}_seconds_count {2}'.format(prefix, name, timer['count']))
+
+        return '\n'.join(lines) + '\n'
+
+    def save(self):
+        if self.filename is None:
+            return
+
+        if self.filename.endswith('.json'):
+            content = json.dumps(self.to_dict(), indent=2)
+        else:
+            content = self.to_prometheus()
+
+        temporary_filename = '{0}.tmp'.format(self.filename)
+        with open(temporary_filename, mode='w') as metrics_file:
+            metrics_file.write(content)
+        os.replace(temporary_filename, self.filename)
+
+    def print_summary(self):
+        elapsed = time.time() - self.started_at
+        print("Finished in {0:.1f} s.".format(elapsed))
+
+        with self.lock:
+            timers = [(name, count, seconds) for name, (count, seconds) in self.timers.items()]
+
+        width = max([12] + [len(name) + 1 for name, _, _ in timers])
+        for name, count, seconds in timers:
+            percentiles = self.get_percentiles(name)
+            line = "  {0:<{3}}{1:>10.1f} s{2:>8} calls".format(name, seconds, count, width)
+            if percentiles:
+                line += ''.join(
+                    "  p{0:g} {1:.3f} s".format(percentile * 100, value) for percentile, value in percentiles.items()
+                )
+            print(line)
+
+        self.save()
@@ -0,0 +1,198 @@
+import math
+
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal, ROUND_DOWN
+from typing import Iterable, Iterator, List, Sequence
+
+
+STROOPS_PER_UNIT = 10 ** 7
+
+# Protocol limits of a transaction.
+MAX_OPERATIONS = 100
+MAX_SIGNATURES = 20
+SIGNATURE_SIZE = 72
+MIN_BASE_FEE = 100
+
+# Every claimant of a claimable balance locks one base reserve of the sponsor until the balance is claimed.
+BASE_RESERVE = 5000000
+
+# Ledgers close about every 5 seconds and apply at most 1000 operations on the public network.
+LEDGER_CLOSE_TIME = 5
+LEDGER_MAX_OPERATIONS = 1000
+
+
+# One campaign of a run: every recipient gets a balance of `base_amount` times its multiplier of `asset`,
+# claimable in its own window or, without one, in the window of the generator.
+Tier = namedtuple(
+    'Tier', ['asset', 'base_amount', 'claim_allowed_after', 'claim_allowed_before'], defaults=[None, None],
+)
+
+
+def get_operations(accounts: Iterable, tiers_count) -> Iterator:
+    # Expands (account, multiplier, line) records into (account, multiplier, line, tier) operations,
+    # all tiers of a recipient one after another.
+    for account, multiplier, line in accounts:
+        for tier in range(tiers_count):
+            yield account, multiplier, line, tier
+
+
+def to_stroops(amount) -> int:
+    return int((Decimal(amount) * STROOPS_PER_UNIT).to_integral_value(rounding=ROUND_DOWN))
+
+
+def format_stroops(stroops):
+    return '{0}.{1:07d}'.format(*divmod(stroops, STROOPS_PER_UNIT))
+
+
+def get_asset_key(asset):
+    return 'native' if asset.is_native() else '{0}:{1}'.format(asset.code, asset.issuer)
+
+
+def get_available_balances(account) -> dict:
+    # Spendable stroops per asset of a Horizon account record. Selling liabilities are not spendable,
+    # and neither is the minimum balance of the account itself.
+    balances = {}
+    for balance in account['balances']:
+        if balance['asset_type'] == 'native':
+            key = 'native'
+        elif 'asset_code' in balance:
+            key = '{0}:{1}'.format(balance['asset_code'], balance['asset_issuer'])
+        else:
+            continue
+
+        balances[key] = to_stroops(balance['balance']) - to_stroops(balance.get('selling_liabilities', '0'))
+
+    entries_count = 2 + account.get('subentry_count', 0) + account.get('num_sponsoring', 0) \
+        - account.get('num_sponsored', 0)
+    balances['native'] = balances.get('native', 0) - entries_count * BASE_RESERVE
+
+    return balances
+
+
+def get_transactions_per_ledger(
+    transactions_count, operations_count, concurrency, ledger_max_operations=LEDGER_MAX_OPERATIONS,
+):
+    # A submitted transaction is answered once its ledger closes, so at most `concurrency` transactions are
+    # applied per ledger, fewer when their operations do not fit in one ledger.
+    operations_per_transaction = max(1, math.ceil(operations_count / max(1, transactions_count)))
+    return max(1, min(concurrency, ledger_max_operations // operations_per_transaction))
+
+
+def print_estimate(transactions_count, operations_count, concurrency):
+    transactions_per_ledger = get_transactions_per_ledger(transactions_count, operations_count, concurrency)
+    ledgers_count = math.ceil(transactions_count / transactions_per_ledger)
+
+    print("Submission takes at least {0} ledgers, about {1}, at {2} transactions per ledger.".format(
+        ledgers_count, timedelta(seconds=ledgers_count * LEDGER_CLOSE_TIME), transactions_per_ledger,
+    ))
+
+
+def print_balances(title, required, available=None):
+    # Compares the stroops `required` per asset key with the `available` ones, when they are known.
+    print(title)
+    for key, stroops in required.items():
+        code = 'XLM' if key == 'native' else key.split(':')[0]
+        if available is None:
+            print("  {0} {1}".format(format_stroops(stroops), code))
+            continue
+
+        balance = available.get(key)
+        if balance is None:
+            print("  {0} {1}, no trustline".format(format_stroops(stroops), code))
+        elif balance < stroops:
+            balance = max(0, balance)
+            print("  {0} {1}, available {2}, short by {3}".format(
+                format_stroops(stroops), code, format_stroops(balance), format_stroops(stroops - balance),
+            ))
+        else:
+            print("  {0} {1}, available {2}".format(format_stroops(stroops), code, format_stroops(balance)))
+
+
+class TransactionPacker(object):
+    # Operations are packed greedily in input order. A transaction is closed once the next operation would
+    # exceed the operation limit or, with `max_size`, the envelope size limit with room for every signature.
+
+    def __init__(
+        self, max_operations=MAX_OPERATIONS, max_size=None, envelope_size=0, operation_sizes: Sequence = None,
+    ):
+        self.max_operations = max_operations
+        self.max_size = max_size
+        self.envelope_size = envelope_size
+        self.operation_sizes = operation_sizes
+
+        if max_size is not None and envelope_size + max(operation_sizes) > max_size:
+            raise ValueError('A transaction of {0} bytes cannot fit a single operation'.format(max_size))
+
+    def _get_size(self, operation):
+        if self.max_size is None:
+            return 0
+        return self.operation_sizes[operation[3]]
+
+    def pack(self, operations: Iterable) -> Iterator[List]:
+        page = []
+        size = self.envelope_size
+
+        for operation in operations:
+            operation_size = self._get_size(operation)
+            if page and (
+                len(page) >= self.max_operations
+                or self.max_size is not None and size + operation_size > self.max_size
+            ):
+                yield page
+                page = []
+                size = self.envelope_size
+
+            page.append(operation)
+            size += operation_size
+
+        if page:
+            yield page
+
+
+class PackingReport(object):
+    # Projected cost of the packed transactions: fees, the reserve locked by the created balances
+    # and the amount distributed per tier.
+
+    def __init__(self, tiers: Sequence[Tier], get_stroops, max_operations, claimants_count=2):
+        self.tiers = tiers
+        self.get_stroops = get_stroops
+        self.max_operations = max_operations
+        self.claimants_count = claimants_count
+
+        self.transactions_count = 0
+        self.operations_count = 0
+        self.full_count = 0
+        self.amounts = [0] * len(tiers)
+
+    def add(self, page: List):
+        self.transactions_count += 1
+        self.operations_count += len(page)
+        if len(page) == self.max_operations:
+            self.full_count += 1
+
+        for _, multiplier, _, tier in page:
+            self.amounts[tier] += self.get_stroops(self.tiers[tier].base_amount, multiplier)
+
+    def get_fee(self, base_fee):
+        return base_fee * self.operations_count
+
+    def get_reserve(self):
+        return BASE_RESERVE * self.claimants_count * self.operations_count
+
+    def get_required_balances(self, base_fee, pays_fees=True) -> dict:
+        # Stroops the distribution wallet needs per asset key, the fees are paid by channel accounts if any.
+        required = {'native': self.get_reserve() + (self.get_fee(base_fee) if pays_fees else 0)}
+        for tier, amount in zip(self.tiers, self.amounts):
+            key = get_asset_key(tier.asset)
+            required[key] = required.get(key, 0) + amount
+
+        return required
+
+    def print_report(self, base_fee, title='Packed'):
+        print("{0} {1} operations into {2} transactions ({3} full): fee {4} XLM, reserve {5} XLM.".format(
+            title, self.operations_count, self.transactions_count, self.full_count,
+            format_stroops(self.get_fee(base_fee)), format_stroops(self.get_reserve()),
+        ))
+        for tier, amount in zip(self.tiers, self.amounts):
+            print("  {0} {1}".format(format_stroops(amount), tier.asset.code))
@@ -0,0 +1,29 @@
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+
+def ordered_imap(pool, func: Callable, items: Iterable, window: int) -> Iterator:
+    # Unlike Pool.imap, at most `window` items are read ahead of the consumer,
+    # so streaming inputs are never fully loaded into memory.
+    pending = deque()
+
+    for item in items:
+        pending.append((item, pool.apply_async(func, (item,))))
+
+        if len(pending) >= window:
+            item, result = pending.popleft()
+            yield item, result.get()
+
+    while pending:
+        item, result = pending.popleft()
+        yield item, result.get()
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    items = iter(items)
+
+    chunk = list(islice(items, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(items, size))
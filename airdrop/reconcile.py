@@ -0,0 +1,262 @@
+import os
+import sqlite3
+import tempfile
+
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import groupby, islice
+from typing import Iterable, Iterator, Sequence
+
+from dateutil.parser import parse
+from stellar_sdk.exceptions import NotFoundError
+
+from .metrics import Metrics
+from .packing import Tier, get_asset_key, to_stroops
+
+
+def _get_epoch(predicate):
+    if 'abs_before_epoch' in predicate:
+        return int(predicate['abs_before_epoch'])
+    return int(parse(predicate['abs_before']).timestamp())
+
+
+def get_claim_window(predicate):
+    # The window of a recipient predicate built by the generator, and(not(abs_before after), abs_before before),
+    # or (None, None) for any other predicate.
+    try:
+        not_before, before = predicate['and']
+        return _get_epoch(not_before['not']), _get_epoch(before)
+    except (KeyError, TypeError, ValueError):
+        return None, None
+
+
+class Reconciler(object):
+    # Expected and created balances are joined in an on-disk SQLite database, so millions of recipients
+    # are reconciled without holding them in memory. Every recipient expects one balance per tier, matched
+    # by asset, amount and, when every tier has one, claim window.
+    batch_size = 10000
+    page_size = 200
+
+    def __init__(
+        self, server, tiers: Sequence[Tier], merge_duplicates=False, concurrency=10, filename=None, metrics=None,
+        claim_allowed_after=None, claim_allowed_before=None,
+    ):
+        self.server = server
+        self.tiers = tiers
+        self.merge_duplicates = merge_duplicates
+        self.concurrency = concurrency
+        self.metrics = metrics or Metrics('reconcile')
+
+        # Tiers without their own window use the window of the run, like in the generator.
+        self.tier_keys = [
+            (
+                get_asset_key(tier.asset),
+                claim_allowed_after if tier.claim_allowed_after is None else tier.claim_allowed_after,
+                claim_allowed_before if tier.claim_allowed_before is None else tier.claim_allowed_before,
+            )
+            for tier in tiers
+        ]
+        self.check_windows = all(key[1] is not None and key[2] is not None for key in self.tier_keys)
+        if not self.check_windows:
+            self.tier_keys = [(key[0], None, None) for key in self.tier_keys]
+
+        self.assets = {}
+        for tier in tiers:
+            self.assets.setdefault(get_asset_key(tier.asset), tier.asset)
+
+        self.temporary_filename = None
+        if filename is None:
+            file_descriptor, filename = tempfile.mkstemp(prefix='airdrop_reconcile_', suffix='.sqlite')
+            os.close(file_descriptor)
+            self.temporary_filename = filename
+
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute('PRAGMA journal_mode=OFF')
+        self.connection.execute('PRAGMA synchronous=OFF')
+        self.connection.execute('DROP TABLE IF EXISTS expected')
+        self.connection.execute('DROP TABLE IF EXISTS actual')
+        self.connection.execute(
+            'CREATE TABLE expected (account TEXT PRIMARY KEY, line INTEGER NOT NULL, multiplier INTEGER NOT NULL) '
+            'WITHOUT ROWID'
+        )
+        self.connection.execute(
+            'CREATE TABLE actual ('
+            '    id TEXT PRIMARY KEY,'
+            '    account TEXT NOT NULL,'
+            '    asset TEXT NOT NULL,'
+            '    amount INTEGER NOT NULL,'
+            '    claim_allowed_after INTEGER,'
+            '    claim_allowed_before INTEGER'
+            ') WITHOUT ROWID'
+        )
+
+        self.expected_count = 0
+        self.actual_count = 0
+
+    def load_recipients(self, records: Iterable):
+        # Duplicates are either merged or rejected, the same way the generator handled them.
+        if self.merge_duplicates:
+            statement = 'INSERT INTO expected (account, multiplier, line) VALUES (?, ?, ?) ' \
+                        'ON CONFLICT(account) DO UPDATE SET multiplier = multiplier + excluded.multiplier'
+        else:
+            statement = 'INSERT INTO expected (account, multiplier, line) VALUES (?, ?, ?) ' \
+                        'ON CONFLICT(account) DO NOTHING'
+
+        records = iter(records)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+
+            self.connection.executemany(statement, batch)
+
+        self.connection.commit()
+        self.expected_count = self.connection.execute('SELECT COUNT(*) FROM expected').fetchone()[0]
+
+    def _get_balance_row(self, balance):
+        claimant = balance['claimants'][0]
+        claim_allowed_after, claim_allowed_before = None, None
+        if self.check_windows:
+            claim_allowed_after, claim_allowed_before = get_claim_window(claimant['predicate'])
+
+        return (
+            balance['id'], claimant['destination'], balance['asset'], to_stroops(balance['amount']),
+            claim_allowed_after, claim_allowed_before,
+        )
+
+    def _add_balances(self, balances: Iterable):
+        rows = [self._get_balance_row(balance) for balance in balances if balance.get('asset') in self.assets]
+        self.connection.executemany('INSERT OR IGNORE INTO actual VALUES (?, ?, ?, ?, ?, ?)', rows)
+        self.actual_count += len(rows)
+        self.metrics.increment('loaded_balances', len(rows))
+
+    def load_claimable_balances(self, sponsor):
+        # Balances that were already claimed or collected are no longer listed by Horizon.
+        for asset in self.assets.values():
+            cursor = None
+
+            while True:
+                call_builder = self.server.claimable_balances().for_sponsor(sponsor).for_asset(asset) \
+                    .limit(self.page_size)
+                if cursor is not None:
+                    call_builder = call_builder.cursor(cursor)
+
+                records = call_builder.call()['_embedded']['records']
+                if not records:
+                    break
+
+                self._add_balances(records)
+                cursor = records[-1]['paging_token']
+                self.metrics.report("Loaded {0} claimable balances.", self.actual_count)
+
+        self.connection.commit()
+
+    def get_transaction_operations(self, transaction_hash):
+        operations = []
+        cursor = None
+
+        while True:
+            call_builder = self.server.operations().for_transaction(transaction_hash).limit(self.page_size)
+            if cursor is not None:
+                call_builder = call_builder.cursor(cursor)
+
+            try:
+                records = call_builder.call()['_embedded']['records']
+            except NotFoundError:
+                return operations
+
+            operations.extend(records)
+            if len(records) < self.page_size:
+                return operations
+            cursor = records[-1]['paging_token']
+
+    def load_transactions(self, transaction_hashes: Iterator):
+        # Operations of several transactions are fetched concurrently, only the main thread writes to SQLite.
+        transaction_hashes = iter(transaction_hashes)
+        futures = set()
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while True:
+                while not exhausted and len(futures) < self.concurrency * 2:
+                    transaction_hash = next(transaction_hashes, None)
+                    if transaction_hash is None:
+                        exhausted = True
+                        break
+                    futures.add(executor.submit(self.get_transaction_operations, transaction_hash))
+
+                if not futures:
+                    break
+
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    operations = future.result()
+                    # Operations of a failed transaction are listed too, but created nothing.
+                    self._add_balances(
+                        operation for operation in operations
+                        if operation.get('type') == 'create_claimable_balance'
+                        and operation.get('transaction_successful', True)
+                    )
+                    self.metrics.increment('transactions')
+
+                self.metrics.report("Loaded {0} balances.", self.actual_count)
+
+        self.connection.commit()
+
+    def _get_account_issues(self, account, line, multiplier, balances) -> Iterator:
+        # Matches the balances of one recipient with the balance expected for every tier.
+        actual = {}
+        for asset, amount, claim_allowed_after, claim_allowed_before in balances:
+            actual.setdefault((asset, claim_allowed_after, claim_allowed_before), []).append(amount)
+
+        expected = {}
+        for tier, key in zip(self.tiers, self.tier_keys):
+            expected.setdefault(key, []).append(to_stroops(tier.base_amount * multiplier))
+
+        for key, expected_amounts in expected.items():
+            actual_amounts = actual.pop(key, [])
+            remaining = Counter(actual_amounts)
+            unmatched = []
+            for amount in expected_amounts:
+                if remaining[amount]:
+                    remaining[amount] -= 1
+                else:
+                    unmatched.append(amount)
+
+            extra = sorted(remaining.elements())
+            for amount in unmatched:
+                if extra:
+                    yield account, line, key[0], amount, extra.pop(), len(actual_amounts), 'wrong_amount'
+                else:
+                    yield account, line, key[0], amount, None, len(actual_amounts), 'missing'
+            if extra:
+                yield account, line, key[0], max(expected_amounts), max(extra), len(actual_amounts), 'duplicated'
+
+        # Balances of an asset or claim window no tier of the run has.
+        for key, amounts in actual.items():
+            yield account, line, key[0], None, max(amounts), len(amounts), 'unexpected'
+
+    def get_issues(self) -> Iterator:
+        # Yields (account, line, asset, expected amount, actual amount, balances count, issue) ordered by line.
+        self.connection.execute('CREATE INDEX IF NOT EXISTS actual_account ON actual (account)')
+
+        rows = self.connection.execute(
+            'SELECT e.account, e.line, e.multiplier, a.asset, a.amount, a.claim_allowed_after, a.claim_allowed_before '
+            'FROM expected e LEFT JOIN actual a ON a.account = e.account ORDER BY e.line'
+        )
+        for (account, line, multiplier), account_rows in groupby(rows, key=lambda row: row[:3]):
+            balances = [row[3:] for row in account_rows if row[3] is not None]
+            for issue in self._get_account_issues(account, line, multiplier, balances):
+                yield issue
+
+        rows = self.connection.execute(
+            'SELECT a.account, a.asset, MAX(a.amount), COUNT(*) FROM actual a '
+            'LEFT JOIN expected e ON e.account = a.account WHERE e.account IS NULL GROUP BY a.account, a.asset'
+        )
+        for account, asset, amount, count in rows:
+            yield account, None, asset, None, amount, count, 'unexpected'
+
+    def close(self):
+        self.connection.close()
+        if self.temporary_filename is not None:
+            os.remove(self.temporary_filename)
@@ -0,0 +1,106 @@
+import base64
+import multiprocessing
+import signal
+import time
+
+from typing import Iterable, Iterator, List
+
+from stellar_sdk import Keypair, parse_transaction_envelope_from_xdr
+
+from .container import EnvelopeEntry, get_sdk_envelope_entry, read_envelopes
+from .envelope import RawEnvelope, get_network_id
+from .metrics import Metrics
+from .parallel import chunked, ordered_imap
+
+
+def read_xdrs(path_to_file) -> Iterator[EnvelopeEntry]:
+    return read_envelopes(path_to_file)
+
+
+class Signer(object):
+    chunk_size = 50
+
+    def __init__(self, network_passphrase, signer_secrets: List[str], progress_interval=5, metrics=None):
+        self.network_passphrase = network_passphrase
+        self.signer_secrets = signer_secrets
+        self.metrics = metrics or Metrics('sign', progress_interval=progress_interval)
+
+        self.signed_count = 0
+
+    def _get_signer_keys(self):
+        signer_keys = self.__dict__.get('_signer_keys')
+        if signer_keys is None:
+            signer_keys = self._signer_keys = [Keypair.from_secret(secret) for secret in self.signer_secrets]
+        return signer_keys
+
+    def sign_xdr(self, xdr: str) -> EnvelopeEntry:
+        # Signatures are appended to the raw envelope, envelopes the fast path does not recognise
+        # go through a full SDK parse/serialize pass. Either way every key signs in the same pass.
+        raw_envelope = RawEnvelope.parse(base64.b64decode(xdr))
+        if raw_envelope is not None:
+            network_id = get_network_id(self.network_passphrase)
+            signed_xdr = base64.b64encode(raw_envelope.sign(network_id, self._get_signer_keys())).decode()
+
+            return EnvelopeEntry(
+                signed_xdr, raw_envelope.hash(network_id).hex(), raw_envelope.source, raw_envelope.sequence,
+            )
+
+        te = parse_transaction_envelope_from_xdr(xdr, self.network_passphrase)
+        for signer_key in self._get_signer_keys():
+            te.sign(signer_key)
+
+        return get_sdk_envelope_entry(te.to_xdr(), te)
+
+    def sign_chunk(self, entries: List[EnvelopeEntry]) -> List[EnvelopeEntry]:
+        return [self.sign_xdr(entry.xdr) for entry in entries]
+
+    def _sign_chunk_timed(self, entries: List[EnvelopeEntry]):
+        started_at = time.perf_counter()
+        signed_entries = self.sign_chunk(entries)
+
+        return signed_entries, time.perf_counter() - started_at
+
+    def sign(self, entries: Iterable[EnvelopeEntry], workers=1) -> Iterator[EnvelopeEntry]:
+        chunks = chunked(entries, self.chunk_size)
+        pool = None
+
+        if workers > 1:
+            pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self,))
+            results = ordered_imap(pool, _sign_chunk_worker, chunks, workers * 4)
+        else:
+            results = ((chunk, self._sign_chunk_timed(chunk)) for chunk in chunks)
+
+        try:
+            for _, (signed_entries, seconds) in results:
+                self.metrics.add_time('sign', seconds, len(signed_entries))
+
+                for signed_entry in signed_entries:
+                    yield signed_entry
+
+                self.signed_count += len(signed_entries)
+                self.metrics.increment('transactions', len(signed_entries))
+                self.metrics.report("Signed {0} transactions.", self.signed_count)
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_signer_keys', None)
+        state.pop('metrics', None)
+        return state
+
+
+_worker_signer = None
+
+
+def _init_worker(signer):
+    global _worker_signer
+    _worker_signer = signer
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _sign_chunk_worker(entries):
+    return _worker_signer._sign_chunk_timed(entries)
+
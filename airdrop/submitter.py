@@ -0,0 +1,331 @@
+import random
+import time
+
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator
+
+from stellar_sdk import FeeBumpTransactionEnvelope, Keypair, TransactionBuilder, parse_transaction_envelope_from_xdr
+from stellar_sdk.exceptions import BaseHorizonError, ConnectionError, NotFoundError
+
+from .container import EnvelopeEntry, get_envelope_entry, read_envelopes
+from .journal import SubmissionJournal
+from .metrics import Metrics
+
+
+RETRYABLE_REASONS = {'timeout', 'connection_error', 'tx_bad_seq'}
+STALLED_REASONS = {'timeout', 'tx_insufficient_fee'}
+
+# stellar-core only replaces a queued transaction with a fee bump that pays at least 10 times its fee.
+REPLACE_BY_FEE_MULTIPLIER = 10
+
+# Statuses of transactions that were not submitted in this run, besides the journal statuses.
+COMPLETED = 'completed'
+SKIPPED = 'skipped'
+
+SubmissionResult = namedtuple('SubmissionResult', ['line_number', 'transaction_hash', 'status', 'reason'])
+
+
+def read_xdrs(path_to_file) -> Iterator:
+    return enumerate(read_envelopes(path_to_file))
+
+
+def get_error_reason(exc):
+    if isinstance(exc, ConnectionError):
+        return 'connection_error'
+
+    if isinstance(exc, TransactionFailed):
+        return exc.reason
+
+    if isinstance(exc, BaseHorizonError):
+        if hasattr(exc, 'status') and exc.status in [503, 504]:
+            return 'timeout'
+
+        result_codes = (exc.extras or {}).get('result_codes', {})
+        operation_fail_reasons = result_codes.get('operations', [])
+        if operation_fail_reasons:
+            return ', '.join(operation_fail_reasons)
+
+        return result_codes.get('transaction', 'unknown_reason')
+
+    return 'unexpected_error: {0}'.format(exc)
+
+
+class TransactionFailed(Exception):
+    def __init__(self, reason):
+        super(TransactionFailed, self).__init__(reason)
+        self.reason = reason
+
+
+class SubmissionItem(object):
+    def __init__(self, line_number, xdr, transaction_hash, source, sequence, attempts=0):
+        self.line_number = line_number
+        self.xdr = xdr
+        self.transaction_hash = transaction_hash
+        self.source = source
+        self.sequence = sequence
+        self.attempts = attempts
+        self.fee_bumped = False
+
+
+class Submitter(object):
+    def __init__(
+        self, server, network_passphrase, max_in_flight=10, pipeline_depth=1, progress_interval=5,
+        journal=None, max_attempts=5, backoff_base=1, backoff_cap=60,
+        fee_account: Keypair = None, max_fee_per_op=None, fee_stats_interval=5, congestion_threshold=0.9,
+        metrics=None,
+    ):
+        self.server = server
+        self.network_passphrase = network_passphrase
+        self.journal = journal
+
+        # Stalled transactions are wrapped in fee bumps paid by `fee_account`, at most `max_fee_per_op` per operation.
+        if fee_account is not None and max_fee_per_op is None:
+            raise ValueError('max_fee_per_op is required with fee_account')
+        self.fee_account = fee_account
+        self.max_fee_per_op = max_fee_per_op
+
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        # Transactions of one source account must be applied in sequence order, so they are submitted
+        # one after another (or `pipeline_depth` at a time), while different source accounts run concurrently.
+        self.max_in_flight = max_in_flight
+        self.pipeline_depth = pipeline_depth
+        self.metrics = metrics or Metrics('submit', progress_interval=progress_interval)
+
+        # The in-flight window follows ledger capacity usage: it is halved while ledgers are full
+        # and grows by one transaction per fee stats sample otherwise.
+        self.window = max_in_flight
+        self.fee_stats_interval = fee_stats_interval
+        self.congestion_threshold = congestion_threshold
+        self.surge_fee = None
+
+        self.submitted_count = 0
+        self.fee_bumped_count = 0
+        self.completed_count = 0
+        self.failed_count = 0
+        self.skipped_count = 0
+
+    def _parse(self, line_number, entry: EnvelopeEntry) -> SubmissionItem:
+        # Binary containers carry the hash, source and sequence, only CSV rows need to be decoded.
+        if entry.transaction_hash is None:
+            entry = get_envelope_entry(entry.xdr, self.network_passphrase)
+
+        return SubmissionItem(line_number, entry.xdr, entry.transaction_hash, entry.source, entry.sequence)
+
+    def _find_transaction(self, transaction_hash):
+        try:
+            return self.server.transactions().transaction(transaction_hash).call()
+        except NotFoundError:
+            return None
+
+    def _get_backoff(self, attempt):
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    def _sample_fee_stats(self):
+        try:
+            fee_stats = self.server.fee_stats().call()
+            capacity_usage = float(fee_stats['ledger_capacity_usage'])
+            self.surge_fee = int(fee_stats['fee_charged']['p90'])
+        except Exception:
+            # Fee stats only tune the window, submission goes on without them.
+            return
+
+        if capacity_usage >= self.congestion_threshold:
+            self.window = max(1, self.window // 2)
+        else:
+            self.window = min(self.max_in_flight, self.window + 1)
+
+        self.metrics.set_gauge('ledger_capacity_usage', capacity_usage)
+        self.metrics.set_gauge('window', self.window)
+
+    def _bump_fee(self, item: SubmissionItem):
+        if self.fee_account is None or item.fee_bumped:
+            return False
+
+        # A fee bump read from the file cannot be wrapped again.
+        te = parse_transaction_envelope_from_xdr(item.xdr, self.network_passphrase)
+        if isinstance(te, FeeBumpTransactionEnvelope):
+            return False
+
+        inner_fee_per_op = te.transaction.fee // len(te.transaction.operations)
+        fee_per_op = min(self.max_fee_per_op, max(self.surge_fee or 0, inner_fee_per_op * REPLACE_BY_FEE_MULTIPLIER))
+        if fee_per_op <= inner_fee_per_op:
+            return False
+
+        fee_bump = TransactionBuilder.build_fee_bump_transaction(
+            self.fee_account.public_key, fee_per_op, te, self.network_passphrase,
+        )
+        fee_bump.sign(self.fee_account)
+
+        # The inner hash keeps identifying the transaction, Horizon finds the fee bump by it as well.
+        item.xdr = fee_bump.to_xdr()
+        item.fee_bumped = True
+        return True
+
+    def submit_item(self, item: SubmissionItem):
+        attempt = 0
+
+        while True:
+            # A timed out transaction may still have been applied, resubmitting it would only fail with tx_bad_seq.
+            if item.attempts:
+                record = self._find_transaction(item.transaction_hash)
+                if record is not None:
+                    if not record.get('successful', True):
+                        raise TransactionFailed('tx_failed')
+                    return record
+
+            attempt += 1
+            item.attempts += 1
+            if item.attempts > 1:
+                self.metrics.increment('retries')
+
+            try:
+                return self.server.submit_transaction(item.xdr, skip_memo_required_check=True)
+            except Exception as exc:
+                reason = get_error_reason(exc)
+                self.metrics.increment('errors_{0}'.format(reason if reason in RETRYABLE_REASONS else 'other'))
+                if reason in STALLED_REASONS and self._bump_fee(item):
+                    continue
+
+                if reason not in RETRYABLE_REASONS or attempt >= self.max_attempts:
+                    raise
+
+            time.sleep(self._get_backoff(attempt))
+
+    def _is_completed(self, item: SubmissionItem):
+        if self.journal is None:
+            return False
+
+        status, item.attempts = self.journal.get(item.transaction_hash)
+
+        return status == SubmissionJournal.SUCCESS
+
+    def _on_dispatch(self, item: SubmissionItem):
+        if self.journal is not None:
+            self.journal.mark(item.transaction_hash, item.line_number, SubmissionJournal.PENDING, item.attempts)
+
+    def _on_success(self, item: SubmissionItem, response):
+        self.submitted_count += 1
+        self.metrics.increment('submitted')
+        if item.fee_bumped:
+            self.fee_bumped_count += 1
+            self.metrics.increment('fee_bumped')
+
+        if self.journal is not None:
+            self.journal.mark(item.transaction_hash, item.line_number, SubmissionJournal.SUCCESS, item.attempts)
+
+        return SubmissionResult(item.line_number, item.transaction_hash, SubmissionJournal.SUCCESS, None)
+
+    def _on_failure(self, item: SubmissionItem, exc):
+        self.failed_count += 1
+        self.metrics.increment('failed')
+        reason = get_error_reason(exc)
+
+        if self.journal is not None:
+            self.journal.mark(
+                item.transaction_hash, item.line_number, SubmissionJournal.FAILED, item.attempts, error=reason,
+            )
+
+        print("Transaction {0} at line {1} failed: {2}".format(item.transaction_hash, item.line_number, reason))
+        return SubmissionResult(item.line_number, item.transaction_hash, SubmissionJournal.FAILED, reason)
+
+    def _on_skip(self, item: SubmissionItem):
+        self.skipped_count += 1
+        self.metrics.increment('skipped')
+        print("Transaction {0} at line {1} skipped: a previous transaction of {2} failed".format(
+            item.transaction_hash, item.line_number, item.source,
+        ))
+        return SubmissionResult(item.line_number, item.transaction_hash, SKIPPED, None)
+
+    def _print_progress(self, force=False):
+        self.metrics.report(
+            "Submitted {0} transactions ({1} fee bumped), {2} already completed, {3} failed, {4} skipped. "
+            "Window: {5}.",
+            self.submitted_count, self.fee_bumped_count, self.completed_count, self.failed_count,
+            self.skipped_count, self.window, force=force,
+        )
+
+    def submit(self, xdrs: Iterable):
+        for _ in self.iter_submissions(xdrs):
+            pass
+
+    def iter_submissions(self, xdrs: Iterable) -> Iterator[SubmissionResult]:
+        # Yields the outcome of every transaction as soon as it is known, not in file order.
+        xdrs = iter(xdrs)
+        lanes = OrderedDict()
+        lanes_in_flight = {}
+        failed_sources = set()
+        futures = {}
+        buffered_count = 0
+        max_buffered = self.max_in_flight * 10
+        exhausted = False
+        sampled_at = None
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            while True:
+                if sampled_at is None or time.monotonic() - sampled_at >= self.fee_stats_interval:
+                    self._sample_fee_stats()
+                    sampled_at = time.monotonic()
+
+                while not exhausted and buffered_count < max_buffered:
+                    row = next(xdrs, None)
+                    if row is None:
+                        exhausted = True
+                        break
+
+                    item = self._parse(*row)
+                    if self._is_completed(item):
+                        self.completed_count += 1
+                        self.metrics.increment('completed')
+                        yield SubmissionResult(item.line_number, item.transaction_hash, COMPLETED, None)
+                        continue
+
+                    if item.source in failed_sources:
+                        yield self._on_skip(item)
+                        continue
+
+                    lanes.setdefault(item.source, deque()).append(item)
+                    buffered_count += 1
+
+                for source, lane in list(lanes.items()):
+                    while lane and len(futures) < self.window \
+                            and lanes_in_flight.get(source, 0) < self.pipeline_depth:
+                        item = lane.popleft()
+                        buffered_count -= 1
+                        lanes_in_flight[source] = lanes_in_flight.get(source, 0) + 1
+                        self._on_dispatch(item)
+                        futures[executor.submit(self.submit_item, item)] = item
+
+                    if not lane:
+                        del lanes[source]
+
+                if not futures:
+                    if exhausted and not lanes:
+                        break
+                    continue
+
+                done, _ = wait(futures, timeout=self.fee_stats_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = futures.pop(future)
+                    lanes_in_flight[item.source] -= 1
+
+                    try:
+                        response = future.result()
+                    except Exception as exc:
+                        yield self._on_failure(item, exc)
+
+                        # Later transactions of this source would only fail with tx_bad_seq.
+                        failed_sources.add(item.source)
+                        for skipped_item in lanes.pop(item.source, ()):
+                            buffered_count -= 1
+                            yield self._on_skip(skipped_item)
+                    else:
+                        yield self._on_success(item, response)
+
+                self._print_progress()
+
+        self._print_progress(force=True)
@@ -0,0 +1,198 @@
+import base64
+import binascii
+import csv
+
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from .aggregate import close_database, open_database
+from .metrics import Metrics
+
+
+ACCOUNT_ID_VERSION_BYTE = 6 << 3
+ACCOUNT_ID_LENGTH = 56
+DECODED_ACCOUNT_ID_LENGTH = 35
+
+
+def read_accounts(path_to_file) -> Iterator:
+    with open(path_to_file) as csv_file:
+        csv_reader = csv.reader(csv_file, delimiter=',')
+
+        for line_number, row in enumerate(csv_reader):
+            yield line_number, row
+
+
+def _check_decoded_account_id(payload: bytes) -> Optional[bytes]:
+    if payload[0] != ACCOUNT_ID_VERSION_BYTE:
+        return None
+
+    if binascii.crc_hqx(payload[:-2], 0) != int.from_bytes(payload[-2:], 'little'):
+        return None
+
+    return payload[1:-2]
+
+
+def decode_account_id(account_id: str) -> Optional[bytes]:
+    if not isinstance(account_id, str) or len(account_id) != ACCOUNT_ID_LENGTH:
+        return None
+
+    try:
+        payload = base64.b32decode(account_id)
+    except (binascii.Error, ValueError):
+        return None
+
+    return _check_decoded_account_id(payload)
+
+
+def decode_account_ids(account_ids: List[str]) -> List[Optional[bytes]]:
+    # A 56 character StrKey is exactly 35 bytes of base32 without padding, so a batch of keys
+    # can be decoded with a single b32decode call and then checked slice by slice.
+    if not all(isinstance(account_id, str) and len(account_id) == ACCOUNT_ID_LENGTH for account_id in account_ids):
+        return [decode_account_id(account_id) for account_id in account_ids]
+
+    try:
+        payload = base64.b32decode(''.join(account_ids))
+    except (binascii.Error, ValueError):
+        return [decode_account_id(account_id) for account_id in account_ids]
+
+    return [
+        _check_decoded_account_id(payload[offset:offset + DECODED_ACCOUNT_ID_LENGTH])
+        for offset in range(0, len(payload), DECODED_ACCOUNT_ID_LENGTH)
+    ]
+
+
+class AccountsValidator(object):
+    # Duplicate accounts are detected in an on-disk SQLite index, like in the aggregator, so inputs
+    # with millions of rows need no more memory than the SQLite page cache.
+    batch_size = 1000
+    # SQLite limits the number of parameters of a statement.
+    lookup_size = 500
+
+    def __init__(self, rejects_filename=None, progress_interval=5, reject_duplicates=True, metrics=None,
+                 filename=None):
+        self.rejects_filename = rejects_filename
+        self.reject_duplicates = reject_duplicates
+        self.filename = filename
+        self.metrics = metrics or Metrics('validate', progress_interval=progress_interval)
+
+        self.rows_count = 0
+        self.valid_count = 0
+        self.rejected_count = 0
+
+        self._connection = None
+
+    def _open_index(self):
+        connection, temporary_filename = open_database(self.filename, 'airdrop_validate_')
+        connection.execute('DROP TABLE IF EXISTS seen')
+        connection.execute('CREATE TABLE seen (account BLOB PRIMARY KEY, line INTEGER NOT NULL) WITHOUT ROWID')
+        return connection, temporary_filename
+
+    def _get_duplicates(self, candidates: List) -> set:
+        # Lines whose account was already recorded under an earlier line, in this batch or a previous one.
+        connection = self._connection
+        connection.executemany('INSERT OR IGNORE INTO seen (account, line) VALUES (?, ?)', candidates)
+
+        first_lines = {}
+        for offset in range(0, len(candidates), self.lookup_size):
+            account_ids = list({account_id for account_id, _ in candidates[offset:offset + self.lookup_size]})
+            first_lines.update(connection.execute(
+                'SELECT account, line FROM seen WHERE account IN ({0})'.format(', '.join('?' * len(account_ids))),
+                account_ids,
+            ))
+
+        return {line_number for account_id, line_number in candidates if first_lines[account_id] != line_number}
+
+    def _validate_batch(self, batch: List) -> List:
+        account_ids = [row[0] if row else '' for _, row in batch]
+        results = []
+        candidates = []
+
+        for (line_number, row), account_id in zip(batch, decode_account_ids(account_ids)):
+            if len(row) < 2:
+                results.append((line_number, row, None, 'invalid_row'))
+                continue
+
+            if account_id is None:
+                results.append((line_number, row, None, 'invalid_account'))
+                continue
+
+            try:
+                multiplier = int(row[1])
+                if multiplier <= 0:
+                    raise ValueError
+            except ValueError:
+                results.append((line_number, row, None, 'invalid_multiplier'))
+                continue
+
+            results.append((line_number, row, multiplier, None))
+            candidates.append((account_id, line_number))
+
+        if self._connection is None or not candidates:
+            return results
+
+        duplicates = self._get_duplicates(candidates)
+        return [
+            (line_number, row, None, 'duplicate_account') if reason is None and line_number in duplicates
+            else (line_number, row, multiplier, reason)
+            for line_number, row, multiplier, reason in results
+        ]
+
+    def _print_progress(self, force=False):
+        self.metrics.report(
+            "Validated {0} rows: {1} valid, {2} rejected.", self.rows_count, self.valid_count, self.rejected_count,
+            force=force,
+        )
+
+    def _read_batch(self, rows: Iterator) -> List:
+        with self.metrics.timer('parse'):
+            return list(islice(rows, self.batch_size))
+
+    def validate(self, rows: Iterable) -> Iterator:
+        rows = iter(rows)
+        rejects_file = None
+        rejects_writer = None
+        if self.rejects_filename:
+            rejects_file = open(self.rejects_filename, mode='w', newline='')
+            rejects_writer = csv.writer(rejects_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            rejects_writer.writerow(['line', 'account', 'multiplier', 'reason'])
+
+        temporary_filename = None
+        if self.reject_duplicates:
+            self._connection, temporary_filename = self._open_index()
+
+        try:
+            batch = self._read_batch(rows)
+            while batch:
+                with self.metrics.timer('validate'):
+                    results = self._validate_batch(batch)
+
+                valid_count, rejected_count = self.valid_count, self.rejected_count
+                for line_number, row, multiplier, reason in results:
+                    self.rows_count += 1
+
+                    if reason is None:
+                        self.valid_count += 1
+                        yield row[0], multiplier, line_number
+                        continue
+
+                    self.rejected_count += 1
+                    if rejects_writer is not None:
+                        rejects_writer.writerow([
+                            line_number, row[0] if row else '', row[1] if len(row) > 1 else '', reason,
+                        ])
+
+                self.metrics.increment('valid_rows', self.valid_count - valid_count)
+                self.metrics.increment('rejected_rows', self.rejected_count - rejected_count)
+
+                # The last batch is only reported once, by the final report.
+                batch = self._read_batch(rows)
+                if batch:
+                    self._print_progress()
+        finally:
+            if rejects_file is not None:
+                rejects_file.close()
+            if self._connection is not None:
+                close_database(self._connection, temporary_filename)
+                self._connection = None
+
+        self._print_progress(force=True)
@@ -0,0 +1,28 @@
+import csv
+
+from typing import List
+
+from stellar_sdk import Keypair
+
+
+class SecuredWallet(object):
+    def __init__(self, public_key, secret):
+        self.public_key = public_key
+        self.secret = secret
+
+
+def read_channel_accounts(path_to_file) -> List:
+    channels = []
+
+    with open(path_to_file) as csv_file:
+        csv_reader = csv.reader(csv_file, delimiter=',')
+
+        for row in csv_reader:
+            keypair = Keypair.from_secret(row[1])
+            if keypair.public_key != row[0]:
+                raise ValueError('Secret does not match {0}'.format(row[0]))
+
+            sequence_number = int(row[2]) if len(row) > 2 and row[2] else None
+            channels.append((SecuredWallet(row[0], row[1]), sequence_number))
+
+    return channels
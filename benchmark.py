@@ -0,0 +1,305 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from sys import exit
+from decimal import Decimal, ROUND_DOWN
+
+from stellar_sdk import Account, Asset, Claimant, ClaimPredicate, Keypair, Network
+from stellar_sdk.strkey import StrKey
+from stellar_sdk.transaction_builder import TransactionBuilder
+
+from airdrop.generator import AirdropGenerator
+from airdrop.packing import Tier, get_operations
+from airdrop.parallel import chunked
+from airdrop.wallets import SecuredWallet
+from fake_horizon import FakeHorizonState, format_time, start_fake_horizon
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def legacy_build_transaction(generator, accounts, base_amount, sequence_number):
+    # Per-operation work of AirdropGenerator._build_transaction before claimants were precompiled.
+    builder = TransactionBuilder(
+        source_account=Account(generator.distribution_wallet.public_key, sequence_number),
+        network_passphrase=generator.network_passphrase,
+        base_fee=generator.base_fee,
+    ).add_text_memo('{0} airdrop'.format(generator.asset.code))
+
+    for account in accounts:
+        account_claimant = Claimant(
+            destination=account[0],
+            predicate=ClaimPredicate.predicate_and(
+                ClaimPredicate.predicate_not(
+                    ClaimPredicate.predicate_before_absolute_time(generator.claim_allowed_after)
+                ),
+                ClaimPredicate.predicate_before_absolute_time(generator.claim_allowed_before)
+            ),
+        )
+        collector_claimant = Claimant(
+            destination=generator.collector,
+            predicate=ClaimPredicate.predicate_not(
+                ClaimPredicate.predicate_before_absolute_time(generator.claim_allowed_before)
+            ),
+        )
+
+        amount = Decimal(
+            base_amount * account[1]
+        ).quantize(
+            Decimal('.0000001'),
+            rounding=ROUND_DOWN,
+        )
+        builder.append_create_claimable_balance_op(
+            claimants=[account_claimant, collector_claimant],
+            asset=generator.asset,
+            amount=amount,
+        )
+
+    return builder.build(), sequence_number
+
+
+def get_generator():
+    distribution_wallet = Keypair.random()
+
+    return AirdropGenerator(
+        asset=Asset('AQUA', Keypair.random().public_key),
+        distribution_wallet=SecuredWallet(distribution_wallet.public_key, distribution_wallet.secret),
+        network='testnet', collector_public_key=Keypair.random().public_key,
+        claim_allowed_after=1629072000, claim_allowed_before=1631750400,
+        start_sequence=1, base_fee=100,
+    )
+
+
+def get_accounts(count):
+    return [
+        (Keypair.random().public_key, index % 10 + 1, index)
+        for index in range(count)
+    ]
+
+
+def measure(build_transaction, generator, accounts):
+    started_at = time.perf_counter()
+
+    for sequence_number, page in enumerate(chunked(accounts, generator.page_size)):
+        transaction_envelope, _ = build_transaction(page, sequence_number)
+        transaction_envelope.sign(generator.distribution_wallet.secret)
+        transaction_envelope.to_xdr()
+
+    return (time.perf_counter() - started_at) / len(accounts)
+
+
+def benchmark_build(accounts_count):
+    generator = get_generator()
+    accounts = get_accounts(accounts_count)
+    base_amount = Decimal('1.01')
+
+    legacy = measure(
+        lambda page, sequence_number: legacy_build_transaction(generator, page, base_amount, sequence_number),
+        generator, accounts,
+    )
+    generator.tiers = [Tier(generator.asset, base_amount)]
+    current = measure(generator._build_transaction, generator, list(get_operations(accounts, 1)))
+
+    print("Build, sign and encode {0} operations:".format(accounts_count))
+    print("  legacy:  {0:8.1f} us/op".format(legacy * 10 ** 6))
+    print("  current: {0:8.1f} us/op".format(current * 10 ** 6))
+    print("  speedup: {0:8.2f}x".format(legacy / current))
+
+
+def write_recipients(path_to_file, count):
+    with open(path_to_file, mode='w') as recipients:
+        for index in range(count):
+            recipients.write('{0},{1}\n'.format(StrKey.encode_ed25519_public_key(os.urandom(32)), index % 10 + 1))
+
+
+def write_channels(path_to_file, count):
+    with open(path_to_file, mode='w') as channels:
+        for _ in range(count):
+            keypair = Keypair.random()
+            channels.write('{0},{1}\n'.format(keypair.public_key, keypair.secret))
+
+
+def run_stage(command, arguments, log_filename):
+    # Every stage runs in its own interpreter, so its peak RSS can be read from wait4.
+    with open(log_filename, mode='w') as log_file:
+        started_at = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'airdrop', command] + arguments,
+            stdout=log_file, stderr=subprocess.STDOUT, cwd=SCRIPTS_DIR,
+        )
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - started_at
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+    # ru_maxrss is reported in kilobytes on Linux.
+    return process.returncode, elapsed, usage.ru_maxrss / 1024
+
+
+def benchmark_pipeline(
+    accounts_count, latency, timeout_rate, bad_seq_rate, workers, channels_count, max_in_flight,
+):
+    network_passphrase = Network.testnet_network().network_passphrase
+    state = FakeHorizonState(
+        network_passphrase, latency=latency, timeout_rate=timeout_rate, bad_seq_rate=bad_seq_rate,
+    )
+    server, horizon_url = start_fake_horizon(state)
+    working_dir = tempfile.mkdtemp(prefix='airdrop_benchmark_')
+
+    distribution_wallet = Keypair.random()
+    collector = Keypair.random()
+    asset = 'AQUA:{0}'.format(Keypair.random().public_key)
+    now = time.time()
+
+    accounts_file = os.path.join(working_dir, 'accounts.csv')
+    xdr_file = os.path.join(working_dir, 'generated_xdrs.aqtx')
+    signed_xdr_file = os.path.join(working_dir, 'generated_xdrs_signed.aqtx')
+    channels_file = os.path.join(working_dir, 'channels.csv')
+
+    write_recipients(accounts_file, accounts_count)
+    channel_arguments = []
+    if channels_count:
+        write_channels(channels_file, channels_count)
+        channel_arguments = ['--channel_accounts_file={0}'.format(channels_file)]
+
+    transactions_count = -(-accounts_count // AirdropGenerator.page_size)
+    stages = [
+        ('generate', [
+            '--asset={0}'.format(asset),
+            '--distribution_wallet_public={0}'.format(distribution_wallet.public_key),
+            '--distribution_wallet_secret={0}'.format(distribution_wallet.secret),
+            '--network=testnet', '--horizon_url={0}'.format(horizon_url),
+            '--base_amount=1.01', '--accounts_list_file={0}'.format(accounts_file),
+            '--collector_public_key={0}'.format(collector.public_key),
+            # The claim window is already over, so the collect stage can claim every balance back.
+            '--start_date={0}'.format(format_time(now - 7200)),
+            '--end_date={0}'.format(format_time(now - 3600)),
+            '--output_file={0}'.format(xdr_file), '--workers={0}'.format(workers),
+        ] + channel_arguments),
+        ('sign', [
+            '--xdr_list_file={0}'.format(xdr_file), '--network=testnet',
+            '--signer_key={0}'.format(Keypair.random().secret), '--workers={0}'.format(workers),
+        ]),
+        ('submit', [
+            '--xdr_list_file={0}'.format(signed_xdr_file), '--network=testnet',
+            '--horizon_url={0}'.format(horizon_url), '--max_in_flight={0}'.format(max_in_flight),
+        ]),
+        ('collect', [
+            '--asset={0}'.format(asset), '--network=testnet', '--horizon_url={0}'.format(horizon_url),
+            '--collector_secret={0}'.format(collector.secret),
+            '--collector_public={0}'.format(collector.public_key),
+        ] + channel_arguments),
+    ]
+
+    failed = False
+    print("{0} recipients, {1} transactions:".format(accounts_count, transactions_count))
+    print("  {0:<10}{1:>10}{2:>16}{3:>12}{4:>14}".format('stage', 'seconds', 'accounts/sec', 'tx/sec', 'peak RSS MB'))
+
+    try:
+        for name, arguments in stages:
+            log_filename = os.path.join(working_dir, '{0}.log'.format(name))
+            returncode, elapsed, peak_rss = run_stage(name, arguments, log_filename)
+
+            if returncode != 0:
+                print("  {0:<10} failed with exit code {1}, see {2}".format(name, returncode, log_filename))
+                failed = True
+                break
+
+            print("  {0:<10}{1:>10.1f}{2:>16.0f}{3:>12.1f}{4:>14.1f}".format(
+                name, elapsed, accounts_count / elapsed, transactions_count / elapsed, peak_rss,
+            ))
+
+        print("  Horizon: {0} submissions, {1} timeouts, {2} injected tx_bad_seq, {3} balances left".format(
+            state.submitted_count, state.timeout_count, state.bad_seq_count, len(state.balances),
+        ))
+    finally:
+        server.shutdown()
+        if not failed:
+            shutil.rmtree(working_dir)
+
+
+if __name__ == "__main__":
+    '''
+    Example:
+        python benchmark.py --accounts=10000
+
+        python benchmark.py --pipeline
+            --sizes=10000,100000,1000000
+            --latency=0.05 --timeout_rate=0.01 --bad_seq_rate=0.005
+    '''
+
+    parser = argparse.ArgumentParser(
+        description='This script measures the per-operation cost of building airdrop transactions, '
+                    'or runs the whole airdrop pipeline against a local fake Horizon.',
+    )
+
+    parser.add_argument(
+        '--accounts', nargs=1, help='Number of generated recipient accounts. Defaults to 10000.', required=False,
+    )
+    parser.add_argument(
+        '--pipeline', action='store_true',
+        help='Benchmark generate, sign, submit and collect end to end against a local fake Horizon.',
+    )
+    parser.add_argument(
+        '--sizes', nargs=1, required=False,
+        help='Comma separated recipient counts for --pipeline. Defaults to 10000,100000,1000000.',
+    )
+    parser.add_argument(
+        '--latency', nargs=1, help='Average fake Horizon submission latency in seconds. Defaults to 0.05.',
+        required=False,
+    )
+    parser.add_argument(
+        '--timeout_rate', nargs=1, help='Share of submissions answered with 504. Defaults to 0.', required=False,
+    )
+    parser.add_argument(
+        '--bad_seq_rate', nargs=1, help='Share of submissions rejected with tx_bad_seq. Defaults to 0.',
+        required=False,
+    )
+    parser.add_argument(
+        '--workers', nargs=1, help='Generator and signer processes. Defaults to the number of CPUs.', required=False,
+    )
+    parser.add_argument(
+        '--channels', nargs=1, help='Number of channel accounts. Defaults to 10.', required=False,
+    )
+    parser.add_argument(
+        '--max_in_flight', nargs=1, help='Submitter in-flight window. Defaults to 20.', required=False,
+    )
+
+    try:
+        args = parser.parse_args()
+    except argparse.ArgumentError:
+        print('Invalid arguments')
+        exit(1)
+
+    accounts_count = 10000
+    if args.accounts:
+        try:
+            accounts_count = int(args.accounts[0])
+            if accounts_count < 1:
+                raise ValueError
+        except ValueError:
+            print('Invalid --accounts')
+            exit(1)
+
+    if not args.pipeline:
+        benchmark_build(accounts_count)
+        exit(0)
+
+    try:
+        sizes = [int(size) for size in args.sizes[0].split(',')] if args.sizes else [10000, 100000, 1000000]
+        latency = float(args.latency[0]) if args.latency else 0.05
+        timeout_rate = float(args.timeout_rate[0]) if args.timeout_rate else 0.0
+        bad_seq_rate = float(args.bad_seq_rate[0]) if args.bad_seq_rate else 0.0
+        workers = int(args.workers[0]) if args.workers else os.cpu_count() or 1
+        channels_count = int(args.channels[0]) if args.channels else 10
+        max_in_flight = int(args.max_in_flight[0]) if args.max_in_flight else 20
+    except ValueError:
+        print('Invalid arguments')
+        exit(1)
+
+    for size in sizes:
+        benchmark_pipeline(size, latency, timeout_rate, bad_seq_rate, workers, channels_count, max_in_flight)
@@ -0,0 +1,15 @@
+from sys import argv, exit
+
+from airdrop.cli import run_command
+
+
+if __name__ == "__main__":
+    '''
+    Example:
+        python container.py
+            --input_file=generated_xdrs_signed.aqtx
+            --output_file=generated_xdrs_signed.csv
+            --network=testnet
+    '''
+
+    exit(run_command('convert', argv[1:]))
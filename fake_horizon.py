@@ -0,0 +1,444 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from sys import exit
+from urllib.parse import parse_qs, urlparse
+
+from stellar_sdk import FeeBumpTransactionEnvelope, Network, parse_transaction_envelope_from_xdr
+from stellar_sdk.operation import ClaimClaimableBalance, CreateClaimableBalance
+
+
+LEDGER_CLOSE_TIME = 5
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def predicate_to_json(predicate):
+    if predicate.and_predicates is not None:
+        return {'and': [
+            predicate_to_json(predicate.and_predicates.left), predicate_to_json(predicate.and_predicates.right),
+        ]}
+
+    if predicate.or_predicates is not None:
+        return {'or': [
+            predicate_to_json(predicate.or_predicates.left), predicate_to_json(predicate.or_predicates.right),
+        ]}
+
+    if predicate.not_predicate is not None:
+        return {'not': predicate_to_json(predicate.not_predicate)}
+
+    if predicate.abs_before is not None:
+        return {'abs_before': format_time(predicate.abs_before), 'abs_before_epoch': str(predicate.abs_before)}
+
+    if predicate.rel_before is not None:
+        return {'rel_before': str(predicate.rel_before)}
+
+    return {'unconditional': True}
+
+
+def asset_to_string(asset):
+    if asset.is_native():
+        return 'native'
+
+    return '{0}:{1}'.format(asset.code, asset.issuer)
+
+
+class FakeHorizonState(object):
+    # In-memory ledger with just enough of Horizon for the airdrop scripts: accounts, fee stats,
+    # transaction submission and lookup, operations of a transaction and claimable balances.
+
+    def __init__(
+        self, network_passphrase, latency=0.0, timeout_rate=0.0, applied_on_timeout_rate=0.5, bad_seq_rate=0.0,
+        base_fee=100, capacity_usage=0.5, surge_fee=None,
+    ):
+        self.network_passphrase = network_passphrase
+        self.latency = latency
+        self.timeout_rate = timeout_rate
+        self.applied_on_timeout_rate = applied_on_timeout_rate
+        self.bad_seq_rate = bad_seq_rate
+        self.base_fee = base_fee
+        self.capacity_usage = capacity_usage
+        # During surge pricing transactions bidding less than `surge_fee` per operation are never applied.
+        self.surge_fee = surge_fee
+
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.sequences = {}
+        self.transactions = {}
+        self.balances = {}
+        self.balances_count = 0
+        self.operations = {}
+        self.operations_count = 0
+
+        self.submitted_count = 0
+        self.timeout_count = 0
+        self.bad_seq_count = 0
+
+    def get_ledger(self):
+        return int((time.time() - self.started_at) / LEDGER_CLOSE_TIME) + 1
+
+    def get_account(self, account_id):
+        with self.lock:
+            sequence_number = self.sequences.setdefault(account_id, 0)
+
+        return 200, {
+            'id': account_id,
+            'account_id': account_id,
+            'sequence': str(sequence_number),
+            'subentry_count': 0,
+            'balances': [{'asset_type': 'native', 'balance': '100000000.0000000'}],
+            'thresholds': {'low_threshold': 0, 'med_threshold': 0, 'high_threshold': 0},
+            'flags': {},
+            'signers': [{'key': account_id, 'weight': 1, 'type': 'ed25519_public_key'}],
+            'data': {},
+        }
+
+    def get_fee_stats(self):
+        fee = str(self.surge_fee or self.base_fee)
+        distribution = {key: fee for key in ['max', 'min', 'mode', 'p10', 'p20', 'p30', 'p40', 'p50',
+                                             'p60', 'p70', 'p80', 'p90', 'p95', 'p99']}
+
+        return 200, {
+            'last_ledger': str(self.get_ledger()),
+            'last_ledger_base_fee': str(self.base_fee),
+            'ledger_capacity_usage': str(self.capacity_usage),
+            'fee_charged': distribution,
+            'max_fee': distribution,
+        }
+
+    def get_latest_ledger(self):
+        return 200, {'_links': {}, '_embedded': {'records': [{
+            'sequence': self.get_ledger(),
+            'base_fee_in_stroops': self.base_fee,
+            'base_reserve_in_stroops': 5000000,
+            'max_tx_set_size': 1000,
+        }]}}
+
+    def get_transaction(self, transaction_hash):
+        with self.lock:
+            record = self.transactions.get(transaction_hash)
+
+        if record is None:
+            return 404, {'type': 'not_found', 'title': 'Resource Missing', 'status': 404}
+
+        return 200, record
+
+    def _get_error(self, status, transaction_code, operation_codes=None):
+        result_codes = {'transaction': transaction_code}
+        if operation_codes is not None:
+            result_codes['operations'] = operation_codes
+
+        return status, {
+            'type': 'transaction_failed',
+            'title': 'Transaction Failed',
+            'status': status,
+            'extras': {'result_codes': result_codes},
+        }
+
+    def _apply_operations(self, transaction, transaction_hash, ledger):
+        # Operations are checked first so a failed transaction leaves the balances untouched.
+        operation_codes = []
+        for operation in transaction.operations:
+            if isinstance(operation, ClaimClaimableBalance) and operation.balance_id not in self.balances:
+                operation_codes.append('op_does_not_exist')
+            else:
+                operation_codes.append('op_success')
+
+        if any(code != 'op_success' for code in operation_codes):
+            return operation_codes
+
+        records = self.operations[transaction_hash] = []
+        for index, operation in enumerate(transaction.operations):
+            source = (operation.source or transaction.source).account_id
+            self.operations_count += 1
+            record = {
+                'id': str(self.operations_count),
+                'paging_token': '{0:020d}'.format(self.operations_count),
+                'transaction_hash': transaction_hash,
+                'transaction_successful': True,
+                'source_account': source,
+            }
+            records.append(record)
+
+            if isinstance(operation, CreateClaimableBalance):
+                self.balances_count += 1
+                balance_id = '00000000' + hashlib.sha256(
+                    '{0}:{1}'.format(transaction_hash, index).encode()
+                ).hexdigest()
+                self.balances[balance_id] = {
+                    'id': balance_id,
+                    'paging_token': '{0:020d}-{1}'.format(self.balances_count, balance_id),
+                    'asset': asset_to_string(operation.asset),
+                    'amount': operation.amount,
+                    'sponsor': source,
+                    'last_modified_ledger': ledger,
+                    'last_modified_time': format_time(time.time()),
+                    'claimants': [
+                        {'destination': claimant.destination, 'predicate': predicate_to_json(claimant.predicate)}
+                        for claimant in operation.claimants
+                    ],
+                }
+                record.update({
+                    'type': 'create_claimable_balance',
+                    'asset': self.balances[balance_id]['asset'],
+                    'amount': operation.amount,
+                    'claimants': self.balances[balance_id]['claimants'],
+                })
+            elif isinstance(operation, ClaimClaimableBalance):
+                del self.balances[operation.balance_id]
+                record.update({'type': 'claim_claimable_balance', 'balance_id': operation.balance_id})
+
+        return None
+
+    def submit_transaction(self, xdr):
+        if self.latency:
+            time.sleep(random.uniform(self.latency / 2, self.latency * 3 / 2))
+
+        envelope = parse_transaction_envelope_from_xdr(xdr, self.network_passphrase)
+        transaction_hash = envelope.hash_hex()
+        inner_envelope = envelope
+        if isinstance(envelope, FeeBumpTransactionEnvelope):
+            inner_envelope = envelope.transaction.inner_transaction_envelope
+        transaction = inner_envelope.transaction
+        source = transaction.source.account_id
+
+        fee_per_op = transaction.fee // len(transaction.operations)
+        if inner_envelope is not envelope:
+            # The outer fee of a fee bump is only kept per operation.
+            fee_per_op = envelope.transaction.base_fee
+
+        with self.lock:
+            self.submitted_count += 1
+
+            if random.random() < self.bad_seq_rate:
+                self.bad_seq_count += 1
+                return self._get_error(400, 'tx_bad_seq')
+
+            if self.surge_fee is not None and fee_per_op < self.surge_fee:
+                self.timeout_count += 1
+                return 504, {'type': 'timeout', 'title': 'Timeout', 'status': 504}
+
+            timed_out = random.random() < self.timeout_rate
+            if timed_out:
+                self.timeout_count += 1
+                if random.random() >= self.applied_on_timeout_rate:
+                    return 504, {'type': 'timeout', 'title': 'Timeout', 'status': 504}
+
+            if transaction.sequence != self.sequences.setdefault(source, 0) + 1:
+                return self._get_error(400, 'tx_bad_seq')
+
+            ledger = self.get_ledger()
+            self.sequences[source] = transaction.sequence
+            operation_codes = self._apply_operations(transaction, inner_envelope.hash_hex(), ledger)
+
+            record = {
+                'id': transaction_hash,
+                'hash': transaction_hash,
+                'ledger': ledger,
+                'successful': operation_codes is None,
+                'source_account': source,
+                'source_account_sequence': str(transaction.sequence),
+                'operation_count': len(transaction.operations),
+                'envelope_xdr': xdr,
+            }
+            self.transactions[transaction_hash] = record
+            if inner_envelope is not envelope:
+                # Horizon finds fee bump transactions by their inner hash as well.
+                self.transactions[inner_envelope.hash_hex()] = record
+                if operation_codes is None:
+                    self.operations[transaction_hash] = self.operations[inner_envelope.hash_hex()]
+
+        if timed_out:
+            return 504, {'type': 'timeout', 'title': 'Timeout', 'status': 504}
+
+        if operation_codes is not None:
+            return self._get_error(400, 'tx_failed', operation_codes)
+
+        return 200, record
+
+    def get_transaction_operations(self, transaction_hash, query):
+        cursor = query.get('cursor') or ''
+        limit = min(int(query.get('limit') or 10), 200)
+
+        with self.lock:
+            if transaction_hash not in self.transactions:
+                return 404, {'type': 'not_found', 'title': 'Resource Missing', 'status': 404}
+            # Operations of failed transactions are only listed with include_failed, which is not supported.
+            operations = list(self.operations.get(transaction_hash, []))
+
+        records = [operation for operation in operations if operation['paging_token'] > cursor][:limit]
+
+        return 200, {'_links': {}, '_embedded': {'records': records}}
+
+    def get_claimable_balances(self, query):
+        claimant = query.get('claimant')
+        asset = query.get('asset')
+        sponsor = query.get('sponsor')
+        cursor = query.get('cursor') or ''
+        limit = min(int(query.get('limit') or 10), 200)
+
+        with self.lock:
+            balances = sorted(self.balances.values(), key=lambda balance: balance['paging_token'])
+
+        records = []
+        for balance in balances:
+            if balance['paging_token'] <= cursor:
+                continue
+            if asset and balance['asset'] != asset:
+                continue
+            if sponsor and balance['sponsor'] != sponsor:
+                continue
+            if claimant and all(item['destination'] != claimant for item in balance['claimants']):
+                continue
+
+            records.append(balance)
+            if len(records) >= limit:
+                break
+
+        return 200, {'_links': {}, '_embedded': {'records': records}}
+
+
+class FakeHorizonHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/hal+json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split('/') if part]
+
+        if parts == ['fee_stats']:
+            return self._send(*state.get_fee_stats())
+        if parts == ['ledgers']:
+            return self._send(*state.get_latest_ledger())
+        if len(parts) == 2 and parts[0] == 'accounts':
+            return self._send(*state.get_account(parts[1]))
+        if len(parts) == 2 and parts[0] == 'transactions':
+            return self._send(*state.get_transaction(parts[1]))
+        if len(parts) == 3 and parts[0] == 'transactions' and parts[2] == 'operations':
+            return self._send(*state.get_transaction_operations(parts[1], query))
+        if parts == ['claimable_balances']:
+            return self._send(*state.get_claimable_balances(query))
+        if not parts:
+            return self._send(200, {'history_latest_ledger': state.get_ledger()})
+
+        self._send(404, {'type': 'not_found', 'title': 'Resource Missing', 'status': 404})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode())
+
+        if urlparse(self.path).path.rstrip('/') != '/transactions' or 'tx' not in form:
+            return self._send(400, {'type': 'bad_request', 'title': 'Bad Request', 'status': 400})
+
+        self._send(*self.server.state.submit_transaction(form['tx'][0]))
+
+
+def start_fake_horizon(state, host='127.0.0.1', port=0):
+    server = ThreadingHTTPServer((host, port), FakeHorizonHandler)
+    server.daemon_threads = True
+    server.state = state
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    return server, 'http://{0}:{1}'.format(*server.server_address)
+
+
+if __name__ == "__main__":
+    '''
+    Example:
+        python fake_horizon.py
+            --port=8000
+            --network=testnet
+            --latency=0.2
+            --timeout_rate=0.01
+            --bad_seq_rate=0.005
+    '''
+
+    parser = argparse.ArgumentParser(
+        description='This script runs a local stand-in for Horizon to test and benchmark the airdrop scripts.',
+    )
+
+    parser.add_argument(
+        '--port', nargs=1, help='Port to listen on. Defaults to 8000.', required=False,
+    )
+    parser.add_argument(
+        '--network', nargs=1, help='Stellar network: ["testnet", "public"].', required=True,
+    )
+    parser.add_argument(
+        '--latency', nargs=1, help='Average submission latency in seconds. Defaults to 0.', required=False,
+    )
+    parser.add_argument(
+        '--timeout_rate', nargs=1, help='Share of submissions answered with 504. Defaults to 0.', required=False,
+    )
+    parser.add_argument(
+        '--bad_seq_rate', nargs=1, help='Share of submissions rejected with tx_bad_seq. Defaults to 0.', required=False,
+    )
+    parser.add_argument(
+        '--capacity_usage', nargs=1, help='Reported ledger capacity usage. Defaults to 0.5.', required=False,
+    )
+    parser.add_argument(
+        '--surge_fee', nargs=1, required=False,
+        help='Minimum fee per operation of applied transactions, which simulates surge pricing. Defaults to none.',
+    )
+
+    try:
+        args = parser.parse_args()
+    except argparse.ArgumentError:
+        print('Invalid arguments')
+        exit(1)
+
+    network = args.network[0]
+    if network not in ["testnet", "public"]:
+        print('Invalid --network')
+        exit(1)
+
+    if network == 'testnet':
+        network_passphrase = Network.testnet_network().network_passphrase
+    elif network == 'public':
+        network_passphrase = Network.public_network().network_passphrase
+
+    try:
+        port = int(args.port[0]) if args.port else 8000
+        latency = float(args.latency[0]) if args.latency else 0.0
+        timeout_rate = float(args.timeout_rate[0]) if args.timeout_rate else 0.0
+        bad_seq_rate = float(args.bad_seq_rate[0]) if args.bad_seq_rate else 0.0
+        capacity_usage = float(args.capacity_usage[0]) if args.capacity_usage else 0.5
+        surge_fee = int(args.surge_fee[0]) if args.surge_fee else None
+    except ValueError:
+        print('Invalid arguments')
+        exit(1)
+
+    state = FakeHorizonState(
+        network_passphrase, latency=latency, timeout_rate=timeout_rate, bad_seq_rate=bad_seq_rate,
+        capacity_usage=capacity_usage, surge_fee=surge_fee,
+    )
+    server, horizon_url = start_fake_horizon(state, port=port)
+    print("Fake Horizon is listening on {0}".format(horizon_url))
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
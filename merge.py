@@ -0,0 +1,15 @@
+from sys import argv, exit
+
+from airdrop.cli import run_command
+
+
+if __name__ == "__main__":
+    '''
+    Example:
+        python merge.py
+            --input_files generated_xdrs_shard0.aqtx generated_xdrs_shard1.aqtx generated_xdrs_shard2.aqtx
+            --output_file=generated_xdrs.aqtx
+            --network=testnet
+    '''
+
+    exit(run_command('merge', argv[1:]))
@@ -0,0 +1,15 @@
+from sys import argv, exit
+
+from airdrop.cli import run_command
+
+
+if __name__ == "__main__":
+    '''
+    Example:
+        python reconcile.py
+            --asset=XXX:GB5SFF6NUMW3C2RRCYTTVTLUICR5RSPIDHMTFXKCDK5TO3LOUL6IIGGG
+            --network=testnet --base_amount=1.01 --accounts_list_file=accounts.csv
+            --xdr_list_file=generated_xdrs_signed.aqtx
+    '''
+
+    exit(run_command('reconcile', argv[1:]))
@@ -0,0 +1,93 @@
+import warnings
+
+from decimal import Decimal
+
+import pytest
+
+from stellar_sdk import Account, Asset, Keypair, Network
+from stellar_sdk.transaction_builder import TransactionBuilder
+
+from airdrop.generator import AirdropGenerator
+from airdrop.packing import Tier
+from airdrop.wallets import SecuredWallet
+from fake_horizon import FakeHorizonState, start_fake_horizon
+
+
+NETWORK_PASSPHRASE = Network.testnet_network().network_passphrase
+
+CLAIM_ALLOWED_AFTER = 1629072000
+CLAIM_ALLOWED_BEFORE = 1631750400
+
+
+def get_keypair(seed: bytes) -> Keypair:
+    # Fixed keys, so separate runs build and sign byte-identical transactions.
+    return Keypair.from_raw_ed25519_seed(seed.ljust(32, b'\0'))
+
+
+def get_wallet(seed: bytes) -> SecuredWallet:
+    keypair = get_keypair(seed)
+    return SecuredWallet(keypair.public_key, keypair.secret)
+
+
+def get_asset(code='AQUA'):
+    return Asset(code, get_keypair(b'issuer').public_key)
+
+
+def get_accounts(count):
+    # (account, multiplier, line) records as yielded by the validator.
+    return [
+        (get_keypair(b'recipient' + index.to_bytes(4, 'big')).public_key, index % 10 + 1, index)
+        for index in range(count)
+    ]
+
+
+def build_envelope(source=None, sequence=1, memo=None, time_bounds=None, operations_count=1):
+    builder = TransactionBuilder(
+        source_account=Account(source or get_keypair(b'source').public_key, sequence),
+        network_passphrase=NETWORK_PASSPHRASE, base_fee=100,
+    )
+    if memo is not None:
+        builder.add_text_memo(memo)
+    if time_bounds is not None:
+        builder.add_time_bounds(*time_bounds)
+
+    for index in range(operations_count):
+        builder.append_bump_sequence_op(sequence + index + 1)
+
+    with warnings.catch_warnings():
+        # Envelopes without time bounds are built on purpose, like the airdrop transactions.
+        warnings.simplefilter('ignore', UserWarning)
+        return builder.build()
+
+
+def make_generator(tiers=None, channels=None, start_sequence=1000, **kwargs):
+    asset = get_asset()
+
+    return AirdropGenerator(
+        asset=asset, distribution_wallet=get_wallet(b'distribution'), network='testnet',
+        collector_public_key=get_keypair(b'collector').public_key,
+        claim_allowed_after=CLAIM_ALLOWED_AFTER, claim_allowed_before=CLAIM_ALLOWED_BEFORE,
+        start_sequence=start_sequence, base_fee=100, channels=channels,
+        tiers=tiers or [Tier(asset, Decimal('1.01'))], **kwargs
+    )
+
+
+def build_fee_bump_envelope(fee_source=None, **kwargs):
+    inner_envelope = build_envelope(**kwargs)
+    inner_envelope.sign(get_keypair(b'source'))
+
+    return TransactionBuilder.build_fee_bump_transaction(
+        fee_source or get_keypair(b'fee').public_key, 1000, inner_envelope, NETWORK_PASSPHRASE,
+    )
+
+
+@pytest.fixture
+def fake_horizon():
+    # A local Horizon stand-in, yields its state and URL.
+    state = FakeHorizonState(NETWORK_PASSPHRASE)
+    http_server, horizon_url = start_fake_horizon(state)
+    try:
+        yield state, horizon_url
+    finally:
+        http_server.shutdown()
+        http_server.server_close()
@@ -0,0 +1,29 @@
+import pytest
+
+from airdrop.aggregate import AccountsAggregator
+
+
+def get_records():
+    # 150 rows of 120 accounts, the repeated ones listed again at the end.
+    accounts = ['G{0:055d}'.format(index) for index in range(120)]
+    return [(account, 1, line) for line, account in enumerate(accounts + accounts[:30])]
+
+
+def test_merge_keeps_first_position():
+    records = [('A', 1, 0), ('B', 2, 1), ('A', 3, 2), ('C', 1, 3), ('B', 1, 4)]
+
+    assert list(AccountsAggregator().aggregate(records)) == [('A', 4, 0), ('B', 3, 1), ('C', 1, 3)]
+
+
+@pytest.mark.parametrize('operations_per_row,saved_operations,saved_transactions', [
+    (1, 30, 0),
+    (2, 60, 0),
+    (3, 90, 1),
+])
+def test_saved_counts(operations_per_row, saved_operations, saved_transactions):
+    aggregator = AccountsAggregator(page_size=100, operations_per_row=operations_per_row)
+    list(aggregator.aggregate(get_records()))
+
+    assert (aggregator.rows_count, aggregator.accounts_count) == (150, 120)
+    assert aggregator.get_saved_operations() == saved_operations
+    assert aggregator.get_saved_transactions() == saved_transactions
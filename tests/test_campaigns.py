@@ -0,0 +1,47 @@
+import json
+
+from decimal import Decimal
+
+import pytest
+
+from stellar_sdk import Asset
+
+from airdrop.campaigns import read_campaigns
+from airdrop.packing import Tier
+
+from conftest import get_asset
+
+
+def write_campaigns(tmp_path, specs):
+    filename = str(tmp_path / 'campaigns.json')
+    with open(filename, mode='w') as campaigns_file:
+        json.dump(specs, campaigns_file)
+
+    return filename
+
+
+def test_read_campaigns(tmp_path):
+    asset = get_asset()
+    filename = write_campaigns(tmp_path, [
+        {'asset': '{0}:{1}'.format(asset.code, asset.issuer), 'base_amount': '1.01'},
+        {'asset': 'native', 'base_amount': 2, 'start_date': '2021-08-16T00:00:00Z', 'end_date': '2021-09-16T00:00:00Z'},
+        {'asset': 'XLM', 'base_amount': '0.5'},
+    ])
+
+    assert read_campaigns(filename) == [
+        Tier(asset, Decimal('1.01')),
+        Tier(Asset.native(), Decimal('2'), 1629072000, 1631750400),
+        Tier(Asset.native(), Decimal('0.5')),
+    ]
+
+
+@pytest.mark.parametrize('spec', [
+    {'asset': 'AQUA', 'base_amount': '1'},
+    {'asset': 'AQUA:G:X', 'base_amount': '1'},
+    {'asset': ['native'], 'base_amount': '1'},
+    {'asset': 'native', 'base_amount': '0'},
+    {'asset': 'native', 'base_amount': '1', 'amount': '1'},
+])
+def test_invalid_campaign(tmp_path, spec):
+    with pytest.raises(ValueError, match='Invalid campaign 1'):
+        read_campaigns(write_campaigns(tmp_path, [spec]))
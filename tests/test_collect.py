@@ -0,0 +1,119 @@
+import pytest
+
+from stellar_sdk.exceptions import BaseHorizonError
+
+from airdrop.collect import Collector
+from airdrop.horizon import HorizonClient, get_server
+
+from conftest import get_accounts, get_asset, get_keypair, get_wallet, make_generator
+
+
+@pytest.fixture
+def horizon(fake_horizon):
+    state, horizon_url = fake_horizon
+    return state, get_server('testnet', horizon_url, HorizonClient(num_retries=0, cache_ttl=0))
+
+
+def airdrop(state, accounts_count):
+    # Creates one balance per recipient, claimable by the collector since the claim window is over.
+    for entry in make_generator(start_sequence=0, max_operations=10).generate(get_accounts(accounts_count)):
+        status, _ = state.submit_transaction(entry.xdr)
+        assert status == 200
+
+
+def make_collector(server, page_size=10, **kwargs):
+    collector_keypair = get_keypair(b'collector')
+    collector = Collector(
+        get_asset(), 'testnet', collector_keypair.public_key, collector_keypair.secret, server=server, **kwargs
+    )
+    collector.page_size = page_size
+    collector.scan_page_size = 7
+    collector.submitter.backoff_base = 0.01
+    return collector
+
+
+def count_account_loads(state):
+    loads = []
+    get_account = state.get_account
+
+    def load_account(account_id):
+        loads.append(account_id)
+        return get_account(account_id)
+
+    state.get_account = load_account
+    return loads
+
+
+def test_collect(horizon):
+    state, server = horizon
+    airdrop(state, 25)
+    loads = count_account_loads(state)
+
+    # The scanner is held back by a queue of a single page.
+    collector = make_collector(server, prefetch_pages=1)
+    results = list(collector.iter_claims())
+
+    assert [len(result.balance_ids) for result in results] == [10, 10, 5]
+    assert all(result.reason is None for result in results)
+    assert collector.collected_count == 25 and collector.failed_count == 0
+    assert state.balances == {}
+
+    # Sequence numbers are tracked locally across batches, the account is loaded once.
+    collector_public_key = get_keypair(b'collector').public_key
+    assert loads == [collector_public_key]
+    assert state.sequences[collector_public_key] == 3
+
+
+def test_collect_with_channels(horizon):
+    state, server = horizon
+    airdrop(state, 45)
+    channels = [get_wallet('channel{0}'.format(index).encode()) for index in range(2)]
+
+    collector = make_collector(server, channels=channels)
+    results = list(collector.iter_claims())
+
+    assert sum(len(result.balance_ids) for result in results) == collector.collected_count == 45
+    assert state.balances == {}
+    assert sum(state.sequences[channel.public_key] for channel in channels) == 5
+
+
+def test_batch_is_retried_after_bad_sequence(horizon):
+    state, server = horizon
+    airdrop(state, 5)
+    loads = count_account_loads(state)
+    get_account = state.get_account
+
+    def load_stale_account(account_id):
+        # The first load returns a sequence number that is already used.
+        status, record = get_account(account_id)
+        if len(loads) == 1:
+            record['sequence'] = '-1'
+        return status, record
+
+    state.get_account = load_stale_account
+
+    collector = make_collector(server, max_attempts=2)
+    results = list(collector.iter_claims())
+
+    assert [(len(result.balance_ids), result.reason) for result in results] == [(5, None)]
+    assert collector.failed_count == 0
+    # Without a consumed sequence number the account is reloaded before the batch is retried.
+    assert len(loads) == 2
+    assert state.balances == {}
+
+
+def test_scanner_error_reaches_the_consumer(horizon):
+    state, server = horizon
+    airdrop(state, 25)
+    get_claimable_balances = state.get_claimable_balances
+
+    def fail_second_page(query):
+        if query.get('cursor'):
+            return 500, {'type': 'server_error', 'title': 'Internal Server Error', 'status': 500}
+        return get_claimable_balances(query)
+
+    state.get_claimable_balances = fail_second_page
+
+    collector = make_collector(server, page_size=20)
+    with pytest.raises(BaseHorizonError):
+        list(collector.iter_claims())
@@ -0,0 +1,158 @@
+import os
+
+import pytest
+
+from airdrop.container import BINARY_FORMAT, CSV_FORMAT, EnvelopeReader, EnvelopeWriter, get_envelope_entry, \
+    get_file_format, open_envelope_writer, read_envelopes
+
+from conftest import NETWORK_PASSPHRASE, build_envelope, build_fee_bump_envelope, get_keypair
+
+
+def get_entries(count):
+    source = get_keypair(b'source').public_key
+    entries = []
+    for index in range(count):
+        transaction_envelope = build_envelope(source=source, sequence=100 + index, memo='AQUA airdrop')
+        transaction_envelope.sign(get_keypair(b'source'))
+        entries.append(get_envelope_entry(transaction_envelope.to_xdr(), NETWORK_PASSPHRASE))
+
+    return entries
+
+
+def write_entries(filename, entries, file_format=BINARY_FORMAT, close=True):
+    writer = open_envelope_writer(filename, file_format)
+    offsets = []
+    for entry in entries:
+        writer.write(entry)
+        offsets.append(writer.flush())
+
+    if close:
+        writer.close()
+    return writer, offsets
+
+
+def test_envelope_entry_matches_sdk():
+    transaction_envelope = build_envelope(sequence=7)
+    entry = get_envelope_entry(transaction_envelope.to_xdr(), NETWORK_PASSPHRASE)
+
+    assert entry.transaction_hash == transaction_envelope.hash_hex()
+    assert entry.source == transaction_envelope.transaction.source.account_id
+    assert entry.sequence == transaction_envelope.transaction.sequence == 8
+
+
+def test_fee_bump_envelope_entry():
+    # Fee bumps are identified by their own hash and ordered by their inner transaction.
+    fee_bump = build_fee_bump_envelope(sequence=7, memo='AQUA airdrop')
+    entry = get_envelope_entry(fee_bump.to_xdr(), NETWORK_PASSPHRASE)
+
+    assert entry.transaction_hash == fee_bump.hash_hex()
+    assert entry.source == get_keypair(b'source').public_key
+    assert entry.sequence == 8
+
+
+@pytest.mark.parametrize('file_format', [BINARY_FORMAT, CSV_FORMAT])
+def test_round_trip(tmp_path, file_format):
+    filename = str(tmp_path / 'envelopes')
+    entries = get_entries(5)
+    write_entries(filename, entries, file_format)
+
+    assert get_file_format(filename) == file_format
+    assert list(read_envelopes(filename, NETWORK_PASSPHRASE)) == entries
+
+
+def test_lookup_by_position(tmp_path):
+    filename = str(tmp_path / 'envelopes.aqtx')
+    entries = get_entries(4)
+    write_entries(filename, entries)
+
+    reader = EnvelopeReader(filename)
+    try:
+        assert len(reader) == 4
+        assert reader[2] == entries[2]
+        assert reader[-1] == entries[-1]
+    finally:
+        reader.close()
+
+
+def test_empty_container(tmp_path):
+    filename = str(tmp_path / 'envelopes.aqtx')
+    write_entries(filename, [])
+
+    assert list(read_envelopes(filename)) == []
+
+
+@pytest.mark.parametrize('cut', [0, 1, 40])
+def test_truncated_tail_is_recovered(tmp_path, cut):
+    # A crash leaves no index and possibly half a record, the complete records are still read.
+    filename = str(tmp_path / 'envelopes.aqtx')
+    entries = get_entries(4)
+    writer, offsets = write_entries(filename, entries, close=False)
+    writer.envelopes_file.close()
+
+    with open(filename, mode='r+b') as envelopes_file:
+        envelopes_file.truncate(offsets[-1] - cut)
+
+    expected = entries if cut == 0 else entries[:-1]
+    assert list(read_envelopes(filename)) == expected
+
+
+def test_append_after_crash(tmp_path):
+    # Resuming from a checkpoint offset drops the partial record and rebuilds the index on close.
+    filename = str(tmp_path / 'envelopes.aqtx')
+    entries = get_entries(5)
+    writer, offsets = write_entries(filename, entries[:3], close=False)
+    writer.envelopes_file.close()
+    with open(filename, mode='r+b') as envelopes_file:
+        envelopes_file.truncate(offsets[-1] - 10)
+
+    writer = EnvelopeWriter(filename, offsets[1])
+    for entry in entries[2:]:
+        writer.write(entry)
+    writer.close()
+
+    assert list(read_envelopes(filename)) == entries
+
+
+def test_append_to_closed_container(tmp_path):
+    filename = str(tmp_path / 'envelopes.aqtx')
+    entries = get_entries(3)
+    _, offsets = write_entries(filename, entries[:2])
+
+    writer = EnvelopeWriter(filename, offsets[-1])
+    writer.write(entries[2])
+    writer.close()
+
+    assert list(read_envelopes(filename)) == entries
+    assert os.path.getsize(filename) > offsets[-1]
+
+
+def test_not_a_container(tmp_path):
+    filename = str(tmp_path / 'envelopes.aqtx')
+    with open(filename, mode='wb') as envelopes_file:
+        envelopes_file.write(b'AQTX' + bytes(30))
+
+    with pytest.raises(ValueError):
+        EnvelopeReader(filename)
+
+
+@pytest.mark.parametrize('file_format', [BINARY_FORMAT, CSV_FORMAT])
+def test_append_past_the_end(tmp_path, file_format):
+    filename = str(tmp_path / 'envelopes')
+    write_entries(filename, get_entries(2), file_format)
+    size = os.path.getsize(filename)
+
+    with pytest.raises(ValueError):
+        open_envelope_writer(filename, file_format, size + 1)
+    assert os.path.getsize(filename) == size
+
+
+def test_zero_padding_is_not_recovered(tmp_path):
+    # Zeros after the last record, e.g. from a file extended before a crash, end the recovery.
+    filename = str(tmp_path / 'envelopes.aqtx')
+    entries = get_entries(2)
+    writer, offsets = write_entries(filename, entries, close=False)
+    writer.envelopes_file.close()
+    with open(filename, mode='r+b') as envelopes_file:
+        envelopes_file.truncate(offsets[-1] + 1000)
+
+    assert list(read_envelopes(filename)) == entries
@@ -0,0 +1,87 @@
+import base64
+
+import pytest
+
+from stellar_sdk import MuxedAccount
+from stellar_sdk.exceptions import SignatureExistError
+
+from airdrop.envelope import MAX_SIGNATURES, RawEnvelope, get_network_id
+
+from conftest import NETWORK_PASSPHRASE, build_envelope, get_keypair
+
+
+SIGNERS = [get_keypair('signer{0}'.format(index).encode()) for index in range(MAX_SIGNATURES)]
+
+ENVELOPES = {
+    'plain': {},
+    'memo': {'memo': 'AQUA airdrop'},
+    'time_bounds': {'time_bounds': (1629072000, 1631750400)},
+    'memo_time_bounds': {'memo': 'AQUA airdrop', 'time_bounds': (0, 1631750400), 'operations_count': 100},
+}
+
+
+def get_network_hash():
+    return get_network_id(NETWORK_PASSPHRASE)
+
+
+@pytest.mark.parametrize('options', ENVELOPES.values(), ids=list(ENVELOPES))
+@pytest.mark.parametrize('signatures_count', [0, 1, 2, MAX_SIGNATURES - 1])
+def test_sign_matches_sdk(options, signatures_count):
+    transaction_envelope = build_envelope(sequence=41, **options)
+    for signer in SIGNERS[:signatures_count]:
+        transaction_envelope.sign(signer)
+
+    raw_envelope = RawEnvelope.parse(transaction_envelope.to_xdr_object().to_xdr_bytes())
+    assert raw_envelope is not None
+    assert raw_envelope.signatures_count == signatures_count
+    assert raw_envelope.source == transaction_envelope.transaction.source.account_id
+    assert raw_envelope.sequence == transaction_envelope.transaction.sequence
+    assert raw_envelope.hash(get_network_hash()) == transaction_envelope.hash()
+
+    signed = raw_envelope.sign(get_network_hash(), [SIGNERS[-1]])
+    transaction_envelope.sign(SIGNERS[-1])
+    assert signed == transaction_envelope.to_xdr_object().to_xdr_bytes()
+
+
+def test_sign_several_keys_in_one_pass():
+    transaction_envelope = build_envelope(memo='AQUA airdrop')
+    raw_envelope = RawEnvelope.parse(transaction_envelope.to_xdr_object().to_xdr_bytes())
+
+    signed = raw_envelope.sign(get_network_hash(), SIGNERS[:3])
+    for signer in SIGNERS[:3]:
+        transaction_envelope.sign(signer)
+
+    assert signed == transaction_envelope.to_xdr_object().to_xdr_bytes()
+
+
+def test_sign_twice_with_the_same_key():
+    transaction_envelope = build_envelope()
+    transaction_envelope.sign(SIGNERS[0])
+    raw_envelope = RawEnvelope.parse(transaction_envelope.to_xdr_object().to_xdr_bytes())
+
+    with pytest.raises(SignatureExistError):
+        raw_envelope.sign(get_network_hash(), [SIGNERS[0]])
+
+
+def test_too_many_signatures():
+    transaction_envelope = build_envelope()
+    for signer in SIGNERS:
+        transaction_envelope.sign(signer)
+    raw_envelope = RawEnvelope.parse(transaction_envelope.to_xdr_object().to_xdr_bytes())
+
+    with pytest.raises(ValueError):
+        raw_envelope.sign(get_network_hash(), [get_keypair(b'extra')])
+
+
+def test_muxed_source_is_left_to_the_sdk():
+    source = MuxedAccount(get_keypair(b'source').public_key, 7).account_muxed
+    transaction_envelope = build_envelope(source=source)
+
+    assert RawEnvelope.parse(base64.b64decode(transaction_envelope.to_xdr())) is None
+
+
+def test_truncated_envelope_is_left_to_the_sdk():
+    raw = build_envelope().to_xdr_object().to_xdr_bytes()
+
+    assert RawEnvelope.parse(raw[:20]) is None
+    assert RawEnvelope.parse(raw[:-1]) is None
@@ -0,0 +1,108 @@
+import json
+import os
+
+from decimal import Decimal
+
+import pytest
+
+from stellar_sdk import parse_transaction_envelope_from_xdr
+
+from airdrop.container import read_envelopes
+from airdrop.generator import CheckpointError
+from airdrop.packing import Tier
+
+from conftest import CLAIM_ALLOWED_BEFORE, NETWORK_PASSPHRASE, get_accounts, get_asset, make_generator
+
+
+TIERS = [Tier(get_asset('AQUA'), Decimal('1.01')), Tier(get_asset('ICE'), Decimal('2.5'), 1630000000, 1640000000)]
+
+
+def interrupted(accounts, count):
+    for index, account in enumerate(accounts):
+        if index == count:
+            raise KeyboardInterrupt
+        yield account
+
+
+def read_bytes(filename):
+    with open(filename, mode='rb') as envelopes_file:
+        return envelopes_file.read()
+
+
+def test_resume_matches_uninterrupted_run(tmp_path):
+    accounts = get_accounts(45)
+    filename = str(tmp_path / 'single.aqtx')
+    make_generator(tiers=TIERS, max_operations=10).generate_payments(iter(accounts), None, filename)
+
+    resumed_filename = str(tmp_path / 'resumed.aqtx')
+    make_generator(tiers=TIERS, max_operations=10).generate_payments(
+        interrupted(accounts, 23), None, resumed_filename,
+    )
+    assert len(list(read_envelopes(resumed_filename))) < len(list(read_envelopes(filename)))
+
+    # Packing parameters come from the checkpoint.
+    make_generator(tiers=TIERS).generate_payments(iter(accounts), None, resumed_filename, resume=True)
+    assert read_bytes(resumed_filename) == read_bytes(filename)
+
+
+@pytest.mark.parametrize('tiers', [
+    TIERS[:1],
+    TIERS + [Tier(get_asset('AQUA2'), Decimal('1'))],
+    [TIERS[0], TIERS[1]._replace(base_amount=Decimal('2.6'))],
+    [TIERS[0], TIERS[1]._replace(claim_allowed_before=1650000000)],
+    [TIERS[0], TIERS[1]._replace(claim_allowed_after=None)],
+])
+def test_resume_with_other_tiers(tmp_path, tiers):
+    accounts = get_accounts(45)
+    filename = str(tmp_path / 'envelopes.aqtx')
+    make_generator(tiers=TIERS, max_operations=10).generate_payments(interrupted(accounts, 23), None, filename)
+    size = len(read_bytes(filename))
+
+    with pytest.raises(CheckpointError):
+        make_generator(tiers=tiers).generate_payments(iter(accounts), None, filename, resume=True)
+    assert len(read_bytes(filename)) == size
+
+
+def test_resume_with_the_same_amount_written_differently(tmp_path):
+    accounts = get_accounts(45)
+    filename = str(tmp_path / 'envelopes.aqtx')
+    make_generator(tiers=TIERS, max_operations=10).generate_payments(interrupted(accounts, 23), None, filename)
+
+    tiers = [TIERS[0]._replace(base_amount=Decimal('1.0100')), TIERS[1]]
+    make_generator(tiers=tiers).generate_payments(iter(accounts), None, filename, resume=True)
+    assert len(list(read_envelopes(filename))) == 9
+
+
+def test_zero_claim_window_timestamp():
+    # An explicit timestamp of 0 is not replaced by the window of the generator.
+    tiers = [Tier(get_asset('AQUA'), Decimal('1'), 0, CLAIM_ALLOWED_BEFORE)]
+    generator = make_generator(tiers=tiers)
+    entry = next(generator.generate(get_accounts(1)))
+
+    te = parse_transaction_envelope_from_xdr(entry.xdr, NETWORK_PASSPHRASE)
+    claimant = te.transaction.operations[0].claimants[0]
+    assert claimant.predicate.and_predicates.left.not_predicate.abs_before == 0
+
+
+def test_new_run_drops_the_old_checkpoint(tmp_path):
+    accounts = get_accounts(45)
+    filename = str(tmp_path / 'envelopes.aqtx')
+    make_generator(tiers=TIERS, max_operations=10).generate_payments(interrupted(accounts, 23), None, filename)
+
+    # Interrupted before its first checkpoint, the new run leaves nothing to resume from.
+    make_generator(tiers=TIERS, max_operations=10).generate_payments(interrupted(accounts, 0), None, filename)
+    assert not os.path.exists(filename + '.checkpoint')
+
+
+def test_resume_with_a_shorter_output_file(tmp_path):
+    accounts = get_accounts(45)
+    filename = str(tmp_path / 'envelopes.aqtx')
+    make_generator(tiers=TIERS, max_operations=10).generate_payments(interrupted(accounts, 23), None, filename)
+    with open(filename + '.checkpoint') as checkpoint_file:
+        size = json.load(checkpoint_file)['output_offset'] - 1
+    with open(filename, mode='r+b') as envelopes_file:
+        envelopes_file.truncate(size)
+
+    with pytest.raises(CheckpointError):
+        make_generator(tiers=TIERS).generate_payments(iter(accounts), None, filename, resume=True)
+    assert len(read_bytes(filename)) == size
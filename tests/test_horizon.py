@@ -0,0 +1,53 @@
+import threading
+import time
+
+from airdrop.horizon import HorizonClient, get_endpoint, get_server
+
+from conftest import build_envelope, get_keypair
+
+
+def get_client():
+    return HorizonClient(num_retries=0, cache_ttl=60)
+
+
+def test_endpoints():
+    assert get_endpoint('GET', 'https://horizon.stellar.org/accounts/GABC') == 'accounts'
+    assert get_endpoint('GET', 'https://horizon.stellar.org/transactions/abc123/operations') == 'operations'
+    assert get_endpoint('POST', 'https://horizon.stellar.org/transactions') == 'submit'
+
+
+def test_latest_ledger_is_cached(fake_horizon):
+    _, horizon_url = fake_horizon
+    client = get_client()
+    server = get_server('testnet', horizon_url, client)
+
+    assert server.fetch_base_fee() == server.fetch_base_fee() == 100
+    assert client.metrics.counters['horizon_cache_hits'] == 1
+
+    # Other ledger queries always go to Horizon.
+    server.ledgers().limit(5).call()
+    server.ledgers().limit(5).call()
+    assert client.metrics.counters['horizon_cache_hits'] == 1
+
+
+def test_account_loaded_during_submission_is_not_cached(fake_horizon):
+    state, horizon_url = fake_horizon
+    state.latency = 0.5
+    client = get_client()
+    server = get_server('testnet', horizon_url, client)
+
+    source = get_keypair(b'source')
+    assert server.load_account(source.public_key).sequence == 0
+    transaction_envelope = build_envelope(source=source.public_key, sequence=0)
+    transaction_envelope.sign(source)
+
+    submission = threading.Thread(target=server.submit_transaction, args=(transaction_envelope,))
+    submission.start()
+    time.sleep(0.1)
+    # Read while the transaction is in flight, before Horizon applies it.
+    assert server.load_account(source.public_key).sequence == 0
+    submission.join()
+
+    assert server.load_account(source.public_key).sequence == 1
+    assert server.load_account(source.public_key).sequence == 1
+    assert client.metrics.counters['horizon_cache_hits'] == 1
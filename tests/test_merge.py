@@ -0,0 +1,111 @@
+import os
+
+from decimal import Decimal
+
+import pytest
+
+from airdrop.cli import main
+from airdrop.container import BINARY_FORMAT, CSV_FORMAT, open_envelope_writer, read_envelopes
+from airdrop.merge import MergeError, ShardMerger
+from airdrop.packing import Tier
+
+from conftest import NETWORK_PASSPHRASE, get_accounts, get_asset, get_wallet, make_generator
+
+
+MAX_OPERATIONS = 10
+
+TIERS = [Tier(get_asset('AQUA'), Decimal('1.01')), Tier(get_asset('ICE'), Decimal('2.5'))]
+
+
+def get_channels(count):
+    return [(get_wallet('channel{0}'.format(index).encode()), 5000 + index * 100) for index in range(count)]
+
+
+def generate(filename, accounts, channels_count, output_format, shard=None):
+    generator = make_generator(tiers=TIERS, channels=get_channels(channels_count), max_operations=MAX_OPERATIONS)
+    generator.generate_payments(iter(accounts), None, filename, output_format=output_format, shard=shard)
+
+
+def merge(filenames, filename, output_format):
+    merger = ShardMerger(NETWORK_PASSPHRASE)
+    writer = open_envelope_writer(filename, output_format)
+    try:
+        for entry in merger.merge([read_envelopes(shard_filename) for shard_filename in filenames]):
+            writer.write(entry)
+    finally:
+        writer.close()
+
+    return merger
+
+
+def read_bytes(filename):
+    with open(filename, mode='rb') as envelopes_file:
+        return envelopes_file.read()
+
+
+@pytest.mark.parametrize('output_format', [BINARY_FORMAT, CSV_FORMAT])
+@pytest.mark.parametrize('shards_count,channels_count,accounts_count', [
+    (2, 0, 60), (3, 0, 45), (3, 3, 60), (2, 3, 33), (4, 0, 8),
+])
+def test_sharded_run_matches_single_run(tmp_path, output_format, shards_count, channels_count, accounts_count):
+    accounts = get_accounts(accounts_count)
+
+    single_filename = str(tmp_path / 'single')
+    generate(single_filename, accounts, channels_count, output_format)
+
+    shard_filenames = []
+    for shard_index in range(shards_count):
+        shard_filename = str(tmp_path / 'shard{0}'.format(shard_index))
+        generate(shard_filename, accounts, channels_count, output_format, (shard_index, shards_count))
+        shard_filenames.append(shard_filename)
+
+    merged_filename = str(tmp_path / 'merged')
+    merger = merge(shard_filenames, merged_filename, output_format)
+
+    assert merger.merged_count == -(-accounts_count * len(TIERS) // MAX_OPERATIONS)
+    assert read_bytes(merged_filename) == read_bytes(single_filename)
+
+
+def test_missing_shard(tmp_path):
+    accounts = get_accounts(60)
+    shard_filenames = []
+    for shard_index in [0, 2]:
+        shard_filename = str(tmp_path / 'shard{0}'.format(shard_index))
+        generate(shard_filename, accounts, 0, BINARY_FORMAT, (shard_index, 3))
+        shard_filenames.append(shard_filename)
+
+    with pytest.raises(MergeError):
+        merge(shard_filenames, str(tmp_path / 'merged'), BINARY_FORMAT)
+
+
+def test_duplicated_shard(tmp_path):
+    shard_filename = str(tmp_path / 'shard0')
+    generate(shard_filename, get_accounts(60), 0, BINARY_FORMAT, (0, 2))
+
+    with pytest.raises(MergeError):
+        merge([shard_filename, shard_filename], str(tmp_path / 'merged'), BINARY_FORMAT)
+
+
+def test_incomplete_shard(tmp_path):
+    accounts = get_accounts(60)
+    shard_filenames = []
+    for shard_index, shard_accounts in enumerate([accounts, accounts[:20]]):
+        shard_filename = str(tmp_path / 'shard{0}'.format(shard_index))
+        generate(shard_filename, shard_accounts, 0, BINARY_FORMAT, (shard_index, 2))
+        shard_filenames.append(shard_filename)
+
+    with pytest.raises(MergeError):
+        merge(shard_filenames, str(tmp_path / 'merged'), BINARY_FORMAT)
+
+
+def test_failed_merge_leaves_no_output(tmp_path):
+    shard_filename = str(tmp_path / 'shard0')
+    generate(shard_filename, get_accounts(60), 0, BINARY_FORMAT, (0, 2))
+    merged_filename = str(tmp_path / 'merged')
+
+    with pytest.raises(SystemExit):
+        main([
+            'merge', '--input_files', shard_filename, shard_filename, '--output_file', merged_filename,
+            '--network', 'testnet',
+        ])
+    assert not os.path.exists(merged_filename)
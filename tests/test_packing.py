@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+import pytest
+
+from airdrop.commands.generate import print_plan
+from airdrop.horizon import HorizonClient, get_server
+from airdrop.packing import MAX_SIGNATURES, SIGNATURE_SIZE, Tier, TransactionPacker, format_stroops, \
+    get_operations, to_stroops
+
+from conftest import get_accounts, get_asset, get_wallet, make_generator
+
+
+def test_stroops():
+    assert to_stroops('1.0100000') == 10100000
+    assert to_stroops('0.00000019') == 1
+    assert format_stroops(10100000) == '1.0100000'
+    assert format_stroops(1) == '0.0000001'
+
+
+def test_operations_of_every_tier():
+    accounts = [('A', 2, 0), ('B', 3, 1)]
+
+    assert list(get_operations(accounts, 2)) == [('A', 2, 0, 0), ('A', 2, 0, 1), ('B', 3, 1, 0), ('B', 3, 1, 1)]
+
+
+def test_pack_operation_limit():
+    operations = list(get_operations(get_accounts(250), 1))
+    pages = list(TransactionPacker(100).pack(operations))
+
+    assert [len(page) for page in pages] == [100, 100, 50]
+    assert [operation for page in pages for operation in page] == operations
+
+
+def test_pack_size_limit():
+    operations = [('A', 1, line, line % 2) for line in range(10)]
+    packer = TransactionPacker(100, max_size=100, envelope_size=40, operation_sizes=[10, 20])
+
+    assert [len(page) for page in packer.pack(operations)] == [4, 4, 2]
+
+
+def test_operation_larger_than_transaction():
+    with pytest.raises(ValueError):
+        TransactionPacker(100, max_size=50, envelope_size=40, operation_sizes=[10, 20])
+
+
+@pytest.mark.parametrize('max_transaction_size', [4000, 10000, 100000])
+def test_size_accounting(max_transaction_size):
+    # The projected size of every transaction is its exact encoded size with every signature added.
+    tiers = [
+        Tier(get_asset('AQUA'), Decimal('1.01')),
+        Tier(get_asset('LONGCODE'), Decimal('2.5'), 1629072000, 1631750400),
+    ]
+    generator = make_generator(tiers=tiers, max_transaction_size=max_transaction_size)
+    packer = generator.get_packer()
+
+    pages = list(packer.pack(get_operations(get_accounts(150), len(tiers))))
+    assert sum(len(page) for page in pages) == 300
+
+    for page in pages:
+        transaction_envelope, _ = generator._build_transaction(page, 1)
+        size = len(transaction_envelope.to_xdr_object().to_xdr_bytes()) + MAX_SIGNATURES * SIGNATURE_SIZE
+        assert size == packer.envelope_size + sum(packer.operation_sizes[operation[3]] for operation in page)
+        assert size <= max_transaction_size
+        assert len(page) <= generator.max_operations
+
+
+def test_report():
+    tiers = [Tier(get_asset('AQUA'), Decimal('1.01')), Tier(get_asset('ICE'), Decimal('0.5'))]
+    generator = make_generator(tiers=tiers, max_operations=50)
+    report = generator.plan(get_accounts(30))
+
+    assert (report.transactions_count, report.operations_count, report.full_count) == (2, 60, 1)
+    assert report.get_fee(100) == 6000
+    multipliers = sum(index % 10 + 1 for index in range(30))
+    assert report.amounts == [10100000 * multipliers, 5000000 * multipliers]
+
+
+@pytest.mark.parametrize('channels_count', [0, 2])
+def test_print_plan(fake_horizon, capsys, channels_count):
+    _, horizon_url = fake_horizon
+    tiers = [Tier(get_asset('AQUA'), Decimal('1.01')), Tier(get_asset('ICE'), Decimal('0.5'))]
+    channels = [(get_wallet('channel{0}'.format(index).encode()), 0) for index in range(channels_count)]
+    generator = make_generator(
+        tiers=tiers, channels=channels, max_operations=50,
+        server=get_server('testnet', horizon_url, HorizonClient(num_retries=0, cache_ttl=0)),
+    )
+
+    print_plan(generator, get_accounts(30), None, 10)
+
+    # 60 operations at 100 stroops, 2 base reserves per balance, 165 multipliers per tier.
+    # Channels pay the fees, so the distribution wallet only needs the reserve in XLM.
+    lines = [
+        'Would pack 60 operations into 2 transactions (1 full): fee 0.0006000 XLM, reserve 60.0000000 XLM.',
+        '  166.6500000 AQUA',
+        '  82.5000000 ICE',
+        'Submission takes at least 1 ledgers, about 0:00:05, at 10 transactions per ledger.',
+    ]
+    if channels_count:
+        lines.append('Channel accounts pay 0.0006000 XLM in fees, about 0.0003000 XLM each.')
+    lines += [
+        'Distribution wallet {0} needs:'.format(generator.distribution_wallet.public_key),
+        '  {0} XLM, available 99999999.0000000'.format('60.0000000' if channels_count else '60.0006000'),
+        '  166.6500000 AQUA, no trustline',
+        '  82.5000000 ICE, no trustline',
+    ]
+    assert capsys.readouterr().out.splitlines() == lines
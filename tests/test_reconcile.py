@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+import pytest
+
+from airdrop.horizon import HorizonClient, get_server
+from airdrop.packing import Tier
+from airdrop.reconcile import Reconciler, get_claim_window
+
+from conftest import CLAIM_ALLOWED_AFTER, CLAIM_ALLOWED_BEFORE, get_accounts, get_asset, get_wallet, make_generator
+
+
+TIERS = [Tier(get_asset('AQUA'), Decimal('1.01')), Tier(get_asset('ICE'), Decimal('2.5'), 1630000000, 1640000000)]
+
+
+@pytest.fixture
+def horizon(fake_horizon):
+    state, horizon_url = fake_horizon
+    return state, get_server('testnet', horizon_url, HorizonClient(num_retries=0, cache_ttl=0))
+
+
+def airdrop(state, accounts, tiers=TIERS, start_sequence=0):
+    # Applies the generated transactions to the fake ledger and returns their hashes.
+    transaction_hashes = []
+    for entry in make_generator(tiers=tiers, start_sequence=start_sequence, max_operations=10).generate(accounts):
+        status, _ = state.submit_transaction(entry.xdr)
+        assert status == 200
+        transaction_hashes.append(entry.transaction_hash)
+
+    return transaction_hashes
+
+
+def reconcile(server, accounts, transaction_hashes=None, tiers=TIERS, **kwargs):
+    reconciler = Reconciler(
+        server, tiers, claim_allowed_after=CLAIM_ALLOWED_AFTER, claim_allowed_before=CLAIM_ALLOWED_BEFORE, **kwargs
+    )
+    try:
+        reconciler.load_recipients(accounts)
+        if transaction_hashes is None:
+            reconciler.load_claimable_balances(get_wallet(b'distribution').public_key)
+        else:
+            reconciler.load_transactions(iter(transaction_hashes))
+        return list(reconciler.get_issues())
+    finally:
+        reconciler.close()
+
+
+def test_claim_window():
+    predicate = {'and': [
+        {'not': {'abs_before': '2021-08-16T00:00:00Z', 'abs_before_epoch': '1629072000'}},
+        {'abs_before': '2021-09-16T00:00:00Z'},
+    ]}
+
+    assert get_claim_window(predicate) == (1629072000, 1631750400)
+    assert get_claim_window({'unconditional': True}) == (None, None)
+
+
+@pytest.mark.parametrize('from_transactions', [True, False])
+def test_every_campaign_received(horizon, from_transactions):
+    state, server = horizon
+    accounts = get_accounts(25)
+    transaction_hashes = airdrop(state, accounts)
+
+    assert reconcile(server, accounts, transaction_hashes if from_transactions else None) == []
+
+
+def test_without_claim_windows(horizon):
+    state, server = horizon
+    accounts = get_accounts(5)
+    transaction_hashes = airdrop(state, accounts)
+
+    reconciler = Reconciler(server, [tier._replace(claim_allowed_after=None) for tier in TIERS])
+    try:
+        reconciler.load_recipients(accounts)
+        reconciler.load_transactions(iter(transaction_hashes))
+        assert list(reconciler.get_issues()) == []
+    finally:
+        reconciler.close()
+
+
+def test_issues(horizon):
+    state, server = horizon
+    accounts = get_accounts(6)
+    transaction_hashes = airdrop(state, accounts[:5])
+    # The first recipient gets both balances a second time.
+    transaction_hashes += airdrop(state, accounts[:1], start_sequence=1)
+
+    aqua, ice = 'AQUA:' + TIERS[0].asset.issuer, 'ICE:' + TIERS[1].asset.issuer
+    expected = [
+        (accounts[0][0], 0, aqua, 10100000, 10100000, 2, 'duplicated'),
+        (accounts[0][0], 0, ice, 25000000, 25000000, 2, 'duplicated'),
+        (accounts[5][0], 5, aqua, 60600000, None, 0, 'missing'),
+        (accounts[5][0], 5, ice, 150000000, None, 0, 'missing'),
+        (accounts[4][0], None, aqua, None, 50500000, 1, 'unexpected'),
+        (accounts[4][0], None, ice, None, 125000000, 1, 'unexpected'),
+    ]
+    recipients = accounts[:4] + accounts[5:]
+    assert sorted(reconcile(server, recipients, transaction_hashes), key=str) == sorted(expected, key=str)
+
+
+def test_wrong_amount_and_window(horizon):
+    state, server = horizon
+    accounts = get_accounts(3)
+    transaction_hashes = airdrop(state, accounts)
+
+    tiers = [TIERS[0]._replace(base_amount=Decimal('1.02')), TIERS[1]._replace(claim_allowed_before=1650000000)]
+    issues = reconcile(server, accounts, transaction_hashes, tiers=tiers)
+
+    assert [issue[-1] for issue in issues] == ['wrong_amount', 'missing', 'unexpected'] * 3
+    assert issues[0][3:5] == (10200000, 10100000)
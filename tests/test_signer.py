@@ -0,0 +1,53 @@
+import pytest
+
+from stellar_sdk import parse_transaction_envelope_from_xdr
+
+from airdrop.container import EnvelopeEntry
+from airdrop.signer import Signer
+
+from conftest import NETWORK_PASSPHRASE, build_envelope, build_fee_bump_envelope, get_keypair
+
+
+SIGNERS = [get_keypair(b'signer0'), get_keypair(b'signer1')]
+
+
+def get_signer():
+    return Signer(NETWORK_PASSPHRASE, [signer.secret for signer in SIGNERS])
+
+
+def test_sign_plain_envelope():
+    transaction_envelope = build_envelope(sequence=7, memo='AQUA airdrop')
+    entry = get_signer().sign_xdr(transaction_envelope.to_xdr())
+
+    for signer in SIGNERS:
+        transaction_envelope.sign(signer)
+    assert entry.xdr == transaction_envelope.to_xdr()
+    assert entry.transaction_hash == transaction_envelope.hash_hex()
+    assert (entry.source, entry.sequence) == (transaction_envelope.transaction.source.account_id, 8)
+
+
+@pytest.mark.parametrize('fee_source', [None, get_keypair(b'source').public_key])
+def test_sign_fee_bump_envelope(fee_source):
+    # Fee bumps are not handled by the raw fast path, they are signed and hashed through the SDK.
+    fee_bump = build_fee_bump_envelope(fee_source, sequence=7, memo='AQUA airdrop')
+    entry = get_signer().sign_xdr(fee_bump.to_xdr())
+
+    for signer in SIGNERS:
+        fee_bump.sign(signer)
+    assert entry.xdr == fee_bump.to_xdr()
+    assert entry.transaction_hash == fee_bump.hash_hex()
+    assert (entry.source, entry.sequence) == (get_keypair(b'source').public_key, 8)
+
+    signed = parse_transaction_envelope_from_xdr(entry.xdr, NETWORK_PASSPHRASE)
+    assert len(signed.signatures) == len(SIGNERS)
+    assert len(signed.transaction.inner_transaction_envelope.signatures) == 1
+
+
+def test_sign_stream_keeps_order():
+    entries = [
+        EnvelopeEntry(build_envelope(sequence=sequence).to_xdr(), None, None, None) for sequence in range(10, 130)
+    ]
+
+    signer = get_signer()
+    assert list(signer.sign(iter(entries))) == [get_signer().sign_xdr(entry.xdr) for entry in entries]
+    assert signer.signed_count == len(entries)
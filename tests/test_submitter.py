@@ -0,0 +1,162 @@
+import pytest
+
+from airdrop.horizon import HorizonClient, get_server
+from airdrop.journal import SubmissionJournal
+from airdrop.submitter import COMPLETED, SKIPPED, Submitter
+
+from conftest import NETWORK_PASSPHRASE, get_accounts, get_keypair, get_wallet, make_generator
+
+
+@pytest.fixture
+def horizon(fake_horizon):
+    state, horizon_url = fake_horizon
+    return state, get_server('testnet', horizon_url, HorizonClient(num_retries=0, cache_ttl=0))
+
+
+def get_entries(accounts_count=25, **kwargs):
+    return list(make_generator(start_sequence=0, max_operations=10, **kwargs).generate(get_accounts(accounts_count)))
+
+
+def get_channels(count):
+    return [(get_wallet('channel{0}'.format(index).encode()), 0) for index in range(count)]
+
+
+def make_submitter(server, **kwargs):
+    kwargs.setdefault('backoff_base', 0.01)
+    return Submitter(server, NETWORK_PASSPHRASE, **kwargs)
+
+
+def test_surge_fee_bump(horizon):
+    state, server = horizon
+    state.surge_fee = 1000
+    entries = get_entries(5)
+
+    submitter = make_submitter(server, fee_account=get_keypair(b'fee'), max_fee_per_op=2000)
+    results = list(submitter.iter_submissions(enumerate(entries)))
+
+    assert [result.status for result in results] == ['success']
+    assert (submitter.submitted_count, submitter.fee_bumped_count) == (1, 1)
+    record = state.transactions[entries[0].transaction_hash]
+    assert record['successful'] and record['hash'] != entries[0].transaction_hash
+
+
+def test_submit(horizon):
+    state, server = horizon
+    entries = get_entries(45, channels=get_channels(2))
+
+    submitter = make_submitter(server)
+    results = list(submitter.iter_submissions(enumerate(entries)))
+
+    assert sorted(result.line_number for result in results if result.status == 'success') == list(range(5))
+    assert state.submitted_count == submitter.submitted_count == 5
+    assert all(entry.transaction_hash in state.transactions for entry in entries)
+
+
+def test_retries_until_max_attempts(horizon):
+    state, server = horizon
+    state.bad_seq_rate = 1
+    entries = get_entries(5)
+
+    submitter = make_submitter(server, max_attempts=3, backoff_cap=0.02)
+    attempts = []
+    get_backoff = submitter._get_backoff
+
+    def record_backoff(attempt):
+        delay = get_backoff(attempt)
+        attempts.append((attempt, delay))
+        return delay
+
+    submitter._get_backoff = record_backoff
+    results = list(submitter.iter_submissions(enumerate(entries)))
+
+    assert [(result.status, result.reason) for result in results] == [('failed', 'tx_bad_seq')]
+    assert state.submitted_count == 3
+    # Exponential backoff with jitter, capped at backoff_cap.
+    assert [attempt for attempt, _ in attempts] == [1, 2]
+    assert 0.005 <= attempts[0][1] <= 0.01 and 0.01 <= attempts[1][1] <= 0.02
+
+
+def test_applied_timeout_is_not_resubmitted(horizon):
+    state, server = horizon
+    state.timeout_rate = 1
+    state.applied_on_timeout_rate = 1
+    entries = get_entries(25)
+
+    submitter = make_submitter(server)
+    results = list(submitter.iter_submissions(enumerate(entries)))
+
+    assert [result.status for result in results] == ['success'] * 3
+    assert state.submitted_count == state.timeout_count == 3
+    assert submitter.metrics.counters['errors_timeout'] == 3
+
+
+def test_rerun_with_journal(horizon, tmp_path):
+    state, server = horizon
+    entries = get_entries(25)
+    journal_filename = str(tmp_path / 'envelopes.journal')
+
+    for _ in range(2):
+        journal = SubmissionJournal(journal_filename)
+        submitter = make_submitter(server, journal=journal)
+        try:
+            results = list(submitter.iter_submissions(enumerate(entries)))
+        finally:
+            journal.close()
+
+    assert [result.status for result in results] == [COMPLETED] * 3
+    assert (submitter.submitted_count, submitter.completed_count) == (0, 3)
+    assert state.submitted_count == 3
+
+    journal = SubmissionJournal(journal_filename)
+    try:
+        assert journal.get_counts() == {SubmissionJournal.SUCCESS: 3}
+    finally:
+        journal.close()
+
+
+def test_failed_source_is_skipped(horizon, tmp_path):
+    state, server = horizon
+    channels = get_channels(2)
+    entries = get_entries(85, channels=channels)
+    # The first channel is ahead of the file, its transactions fail with tx_bad_seq.
+    state.sequences[channels[0][0].public_key] = 100
+
+    journal = SubmissionJournal(str(tmp_path / 'envelopes.journal'))
+    submitter = make_submitter(server, journal=journal, max_attempts=2)
+    try:
+        results = sorted(submitter.iter_submissions(enumerate(entries)))
+    finally:
+        journal.close()
+
+    assert [(result.line_number, result.status) for result in results] == [
+        (0, 'failed'), (1, 'success'), (2, SKIPPED), (3, 'success'), (4, SKIPPED), (5, 'success'),
+        (6, SKIPPED), (7, 'success'), (8, SKIPPED),
+    ]
+    assert (submitter.submitted_count, submitter.failed_count, submitter.skipped_count) == (4, 1, 4)
+    assert state.submitted_count == 6
+
+
+def test_fee_account_requires_max_fee(horizon):
+    _, server = horizon
+
+    with pytest.raises(ValueError):
+        make_submitter(server, fee_account=get_keypair(b'fee'))
+
+
+def test_window_follows_capacity_usage(horizon):
+    state, server = horizon
+    submitter = make_submitter(server, max_in_flight=8)
+
+    state.capacity_usage = 0.95
+    windows = []
+    for _ in range(4):
+        submitter._sample_fee_stats()
+        windows.append(submitter.window)
+
+    state.capacity_usage = 0.5
+    for _ in range(8):
+        submitter._sample_fee_stats()
+        windows.append(submitter.window)
+
+    assert windows == [4, 2, 1, 1, 2, 3, 4, 5, 6, 7, 8, 8]
+    assert submitter.metrics.gauges['ledger_capacity_usage'] == 0.5
@@ -0,0 +1,123 @@
+import csv
+import random
+
+from stellar_sdk import MuxedAccount
+from stellar_sdk.strkey import StrKey
+
+from airdrop.validator import AccountsValidator, decode_account_id, decode_account_ids
+
+from conftest import get_keypair
+
+
+def get_account_ids():
+    # Valid keys and near misses: other key types, broken checksums, wrong lengths and characters.
+    random_generator = random.Random(1)
+    keypair = get_keypair(b'account')
+    account_id = keypair.public_key
+    account_ids = [get_keypair('valid{0}'.format(index).encode()).public_key for index in range(20)]
+
+    account_ids += [
+        keypair.secret,
+        StrKey.encode_pre_auth_tx(bytes(32)),
+        StrKey.encode_sha256_hash(bytes(32)),
+        MuxedAccount(account_id, 1).account_muxed,
+        account_id.lower(),
+        account_id[:-1],
+        account_id + 'A',
+        account_id[:-1] + '=',
+        account_id[:10] + '1' + account_id[11:],
+        account_id[:-4] + '====',
+        ' ' + account_id[1:],
+        '',
+    ]
+
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ234567'
+    for _ in range(200):
+        position = random_generator.randrange(len(account_id))
+        character = random_generator.choice(alphabet)
+        account_ids.append(account_id[:position] + character + account_id[position + 1:])
+
+    return account_ids
+
+
+def test_decode_matches_sdk():
+    for account_id in get_account_ids():
+        assert (decode_account_id(account_id) is not None) == StrKey.is_valid_ed25519_public_key(account_id), \
+            account_id
+
+
+def test_batch_decode_matches_sdk():
+    account_ids = get_account_ids()
+    decoded = decode_account_ids(account_ids)
+    assert [value is not None for value in decoded] == [
+        StrKey.is_valid_ed25519_public_key(account_id) for account_id in account_ids
+    ]
+
+    valid_ids = [account_id for account_id in account_ids if StrKey.is_valid_ed25519_public_key(account_id)]
+    assert decode_account_ids(valid_ids) == [StrKey.decode_ed25519_public_key(value) for value in valid_ids]
+
+
+def test_validate_rejects(tmp_path):
+    valid = [get_keypair('valid{0}'.format(index).encode()).public_key for index in range(3)]
+    rows = [
+        [valid[0], '1'],
+        [valid[1], '0'],
+        [valid[1], 'x'],
+        [valid[0][:-1] + 'A', '1'],
+        [valid[1]],
+        [],
+        [valid[0], '2'],
+        [valid[2], '3'],
+    ]
+    rejects_filename = str(tmp_path / 'rejects.csv')
+    validator = AccountsValidator(rejects_filename=rejects_filename)
+    validator.batch_size = 3
+
+    accounts = list(validator.validate(enumerate(rows)))
+
+    assert accounts == [(valid[0], 1, 0), (valid[2], 3, 7)]
+    assert (validator.rows_count, validator.valid_count, validator.rejected_count) == (8, 2, 6)
+
+    with open(rejects_filename) as rejects_file:
+        rejects = list(csv.reader(rejects_file))
+    assert rejects == [
+        ['line', 'account', 'multiplier', 'reason'],
+        ['1', valid[1], '0', 'invalid_multiplier'],
+        ['2', valid[1], 'x', 'invalid_multiplier'],
+        ['3', valid[0][:-1] + 'A', '1', 'invalid_account'],
+        ['4', valid[1], '', 'invalid_row'],
+        ['5', '', '', 'invalid_row'],
+        ['6', valid[0], '2', 'duplicate_account'],
+    ]
+
+
+def test_validate_keeps_duplicates_for_merging():
+    account_id = get_keypair(b'valid').public_key
+    validator = AccountsValidator(reject_duplicates=False)
+
+    assert list(validator.validate(enumerate([[account_id, '1'], [account_id, '2']]))) == [
+        (account_id, 1, 0), (account_id, 2, 1),
+    ]
+
+
+def test_validate_rejects_duplicates_across_batches(tmp_path):
+    account_ids = [get_keypair('valid{0}'.format(index).encode()).public_key for index in range(4)]
+    rows = [[account_ids[index], '1'] for index in [0, 1, 1, 2, 0, 3, 2, 3, 0]]
+
+    for filename in [None, str(tmp_path / 'seen.sqlite')]:
+        validator = AccountsValidator(filename=filename)
+        validator.batch_size = 2
+        validator.lookup_size = 1
+
+        assert list(validator.validate(enumerate(rows))) == [
+            (account_ids[0], 1, 0), (account_ids[1], 1, 1), (account_ids[2], 1, 3), (account_ids[3], 1, 5),
+        ]
+        assert validator.rejected_count == 5
+
+
+def test_validate_reports_the_last_batch_once(capsys):
+    account_id = get_keypair(b'valid').public_key
+
+    list(AccountsValidator().validate(enumerate([[account_id, '1']])))
+
+    assert capsys.readouterr().out == 'Validated 1 rows: 1 valid, 0 rejected.\n'